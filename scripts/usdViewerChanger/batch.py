@@ -0,0 +1,202 @@
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+from pxr import Usd, Sdf
+from .usdUtils import (
+    CHILD_PRIM_PREDICATE, PrimPurpose, set_prims_kind, set_prims_purpose, set_variant_selections,
+    set_prims_attribute_values
+)
+
+USD_EXTENSIONS = ('.usd', '.usda', '.usdc')
+
+
+@dataclass
+class EditRule:
+    pattern: str
+    type_name: Optional[str] = None
+    kind: Optional[str] = None
+    purpose: Optional[PrimPurpose] = None
+    variants: Dict[str, str] = field(default_factory=dict)
+    attributes: Dict[str, object] = field(default_factory=dict)
+    # Sdf value type names ("string", "float3", ...) for attributes that are created where missing.
+    attribute_types: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EditRule':
+        purpose = data.get('purpose')
+        attributes = {}
+        attribute_types = {}
+        # {"name": value} edits existing attributes only; {"name": {"type": "string", "value": value}} creates them.
+        for name, value in data.get('attributes', {}).items():
+            if isinstance(value, dict) and 'value' in value:
+                if 'type' in value:
+                    if not Sdf.ValueTypeNames.Find(value['type']):
+                        raise ValueError(f"Unknown attribute type {value['type']!r} for {name}")
+                    attribute_types[name] = value['type']
+                value = value['value']
+            attributes[name] = value
+        return cls(pattern=data['match'],
+                   type_name=data.get('type'),
+                   kind=data.get('kind'),
+                   purpose=PrimPurpose(purpose) if purpose else None,
+                   variants=dict(data.get('variants', {})),
+                   attributes=attributes,
+                   attribute_types=attribute_types)
+
+    def matches(self, prim: Usd.Prim, path_text: str) -> bool:
+        if self.type_name and prim.GetTypeName() != self.type_name:
+            return False
+        return fnmatch.fnmatchcase(path_text, self.pattern)
+
+
+@dataclass
+class FileReport:
+    path: str
+    matched: int = 0
+    edits: int = 0
+    seconds: float = 0.0
+    saved: bool = False
+    error: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+
+def load_rules(path: str) -> List[EditRule]:
+    # {"rules": [{"match": "/World/*/Car*", "type": "Xform", "kind": "component", "purpose": "render",
+    #             "variants": {"look": "red"},
+    #             "attributes": {"primvars:tag": {"type": "string", "value": "car"}, "radius": 2.0}}]}
+    with open(path) as f:
+        data = json.load(f)
+    return [EditRule.from_dict(rule) for rule in data.get('rules', [])]
+
+
+def match_rules(stage: Usd.Stage, rules: List[EditRule]) -> List[List[Sdf.Path]]:
+    # One traversal for all rules.
+    matches = [[] for _ in rules]
+    for prim in Usd.PrimRange(stage.GetPseudoRoot(), CHILD_PRIM_PREDICATE):
+        if prim.IsPseudoRoot():
+            continue
+        path_text = str(prim.GetPath())
+        for rule, paths in zip(rules, matches):
+            if rule.matches(prim, path_text):
+                paths.append(prim.GetPath())
+    return matches
+
+
+def apply_rules(stage: Usd.Stage, rules: List[EditRule],
+                warnings: Optional[List[str]] = None) -> Tuple[int, int]:
+    matched = set()
+    edits = 0
+    for rule, paths in zip(rules, match_rules(stage, rules)):
+        if not paths:
+            continue
+        matched.update(paths)
+        if rule.kind is not None:
+            edits += set_prims_kind(stage, paths, rule.kind)
+        if rule.purpose is not None:
+            edits += set_prims_purpose(stage, paths, rule.purpose)
+        for variant_set, variant in rule.variants.items():
+            edits += set_variant_selections(stage, [path for path in paths if stage.GetPrimAtPath(path)
+                                                    .GetVariantSets().HasVariantSet(variant_set)],
+                                            variant_set, variant)
+        for name, value in rule.attributes.items():
+            type_name = rule.attribute_types.get(name)
+            count = set_prims_attribute_values(stage, paths, name, value,
+                                               Sdf.ValueTypeNames.Find(type_name) if type_name else None)
+            edits += count
+            if count < len(paths) and warnings is not None:
+                warnings.append(f"{rule.pattern}: {name} is missing on {len(paths) - count} of {len(paths)} "
+                                f"matched prims; give it a type to create it")
+    return len(matched), edits
+
+
+def process_file(path: str, rules: List[EditRule], save: bool = True, load_payloads: bool = False) -> FileReport:
+    report = FileReport(path)
+    start = time.perf_counter()
+    try:
+        stage = Usd.Stage.Open(path, Usd.Stage.LoadAll if load_payloads else Usd.Stage.LoadNone)
+        if not stage:
+            raise RuntimeError("Could not open stage")
+        stage.SetEditTarget(stage.GetRootLayer())
+        report.matched, report.edits = apply_rules(stage, rules, report.warnings)
+        root_layer = stage.GetRootLayer()
+        if save and root_layer.dirty:
+            report.saved = root_layer.Save()
+    except Exception as e:
+        report.error = str(e)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def collect_files(inputs: List[str]) -> List[str]:
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(os.path.join(directory, name) for name in sorted(names)
+                             if name.lower().endswith(USD_EXTENSIONS))
+        else:
+            files.append(path)
+    return files
+
+
+def run(files: List[str], rules: List[EditRule], jobs: int, save: bool, load_payloads: bool) -> List[FileReport]:
+    reports = []
+    if jobs <= 1:
+        for path in files:
+            reports.append(process_file(path, rules, save, load_payloads))
+            print_report(reports[-1])
+        return reports
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(process_file, path, rules, save, load_payloads) for path in files]
+        for future in as_completed(futures):
+            reports.append(future.result())
+            print_report(reports[-1])
+    return reports
+
+
+def print_report(report: FileReport) -> None:
+    if report.error:
+        print(f"FAILED {report.path}: {report.error}", file=sys.stderr)
+        return
+    for warning in report.warnings:
+        print(f"Warning: {report.path}: {warning}", file=sys.stderr)
+    status = "saved" if report.saved else "unchanged"
+    print(f"{report.path}: {report.edits} edits on {report.matched} prims in {report.seconds:.3f} s ({status})")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m usdViewerChanger.batch',
+                                     description="Apply kind/purpose/variant/attribute rules to many USD layers.")
+    parser.add_argument('inputs', nargs='+', help="USD files or directories to search for them.")
+    parser.add_argument('--rules', required=True, help="JSON rules file.")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--dry-run', action='store_true', help="Apply the rules without saving any layer.")
+    parser.add_argument('--load-payloads', action='store_true', help="Match prims inside payloads as well.")
+    parser.add_argument('--report', help="Write per-file results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    rules = load_rules(args.rules)
+    files = collect_files(args.inputs)
+    start = time.perf_counter()
+    reports = run(files, rules, args.jobs, not args.dry_run, args.load_payloads)
+    elapsed = time.perf_counter() - start
+
+    failed = [report for report in reports if report.error]
+    print(f"{len(reports)} files, {sum(report.edits for report in reports)} edits, "
+          f"{len(failed)} failed in {elapsed:.3f} s")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump([asdict(report) for report in reports], f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import argparse
+import time
+
+from pxr import Usd, UsdGeom, Sdf, Gf
+
+from ..usdEditJournal import EditJournal
+from ..usdUtils import CHILD_PRIM_PREDICATE
+from .stageGenerators import StageSpec, generate_stage
+
+
+def layer_contents(layer: Sdf.Layer) -> dict:
+    # Spec fields and time samples by path. Restored specs are appended to their parent, so the exported text is
+    # not compared: sibling order may differ after undoing a removal.
+    contents = {}
+
+    def visit(path):
+        spec = layer.GetObjectAtPath(path)
+        if spec:
+            contents[path] = {key: spec.GetInfo(key) for key in spec.ListInfoKeys() if key != 'timeSamples'}
+            contents[path]['timeSamples'] = [(time, layer.QueryTimeSample(path, time))
+                                             for time in layer.ListTimeSamplesForPath(path)]
+
+    layer.Traverse(Sdf.Path.absoluteRootPath, visit)
+    return contents
+
+
+def record_session(stage: Usd.Stage, journal: EditJournal, edit_count: int) -> int:
+    # A mix of the editor's operations, one transaction each, spread over the stage's meshes.
+    meshes = [prim for prim in Usd.PrimRange(stage.GetPseudoRoot(), CHILD_PRIM_PREDICATE) if prim.IsA(UsdGeom.Mesh)]
+    for index in range(edit_count):
+        prim = meshes[index % len(meshes)]
+        operation = index % 5
+        if operation == 0:
+            journal.set_attribute_value(prim.GetAttribute('xformOp:translate'), Gf.Vec3d(index, 0, 0), index % 24)
+        elif operation == 1:
+            journal.add_attribute(prim, f"note{index}", Sdf.ValueTypeNames.String, str(index))
+        elif operation == 2:
+            journal.set_prims_kind(stage, [prim.GetPath()], 'subcomponent')
+        elif operation == 3:
+            journal.remove_property(prim, 'primvars:st')
+        else:
+            journal.set_attribute_value(prim.GetAttribute('points'), prim.GetAttribute('points').Get())
+    return len(journal.undo_stack)
+
+
+def coalesce_session(stage: Usd.Stage, journal: EditJournal, edit_count: int) -> int:
+    # Rapid edits of a single attribute, as dragging a value would produce; these should end up as one transaction.
+    prim = next(prim for prim in stage.Traverse() if prim.IsA(UsdGeom.Mesh))
+    for index in range(edit_count):
+        journal.set_attribute_value(prim.GetAttribute('xformOp:translate'), Gf.Vec3d(index, 0, 0), 0)
+    return len(journal.undo_stack)
+
+
+def timed_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recording, undoing and replaying an edit journal session.")
+    parser.add_argument('--edits', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--breadth', type=int, default=8)
+    parser.add_argument('--max-seconds', type=float, default=2.0,
+                        help="Fail if undoing or replaying the whole session takes longer.")
+    args = parser.parse_args()
+
+    spec = StageSpec(depth=args.depth, breadth=args.breadth, array_size=100, time_samples=24)
+    stage = generate_stage(spec)
+    before = layer_contents(stage.GetRootLayer())
+
+    journal = EditJournal(coalesce_window=0.0, max_transactions=args.edits)
+    transactions, record_seconds = timed_call(record_session, stage, journal, args.edits)
+    edited = layer_contents(stage.GetRootLayer())
+    undone, undo_seconds = timed_call(journal.undo_all)
+    restored = layer_contents(stage.GetRootLayer()) == before
+    replayed, replay_seconds = timed_call(journal.replay)
+    reapplied = layer_contents(stage.GetRootLayer()) == edited
+
+    print(f"{'record':<10} {record_seconds:8.3f} s  {transactions} transactions")
+    print(f"{'undo all':<10} {undo_seconds:8.3f} s  {undone} transactions  restored: {restored}")
+    print(f"{'replay':<10} {replay_seconds:8.3f} s  {replayed} transactions  matches: {reapplied}")
+
+    coalesced = coalesce_session(generate_stage(spec), EditJournal(), args.edits)
+    print(f"{'coalesce':<10} {args.edits} edits of one attribute -> {coalesced} transaction(s)")
+
+    slowest = max(undo_seconds, replay_seconds)
+    if not restored or not reapplied or slowest > args.max_seconds:
+        print(f"FAILED: slowest pass {slowest:.3f} s (limit {args.max_seconds:.3f} s)")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
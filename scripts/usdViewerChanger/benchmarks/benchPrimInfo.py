@@ -0,0 +1,50 @@
+import argparse
+import time
+import tracemalloc
+
+from pxr import Usd
+
+from ..usdUtils import CHILD_PRIM_PREDICATE, PrimInfoCache, get_prim_info, get_variant_sets, has_payload
+from .stageGenerators import StageSpec, generate_stage
+
+
+def extract_per_prim(stage: Usd.Stage) -> list:
+    results = []
+    for prim in Usd.PrimRange(stage.GetPseudoRoot(), CHILD_PRIM_PREDICATE):
+        results.append((get_prim_info(prim), get_variant_sets(prim), has_payload(prim)))
+    return results
+
+
+def extract_cached(stage: Usd.Stage) -> PrimInfoCache:
+    cache = PrimInfoCache(stage)
+    cache.populate()
+    return cache
+
+
+def measure(label: str, func, stage: Usd.Stage, prim_count: int) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(stage)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<12} {elapsed:8.3f} s  {elapsed / prim_count * 1e6:8.2f} us/prim  "
+          f"{retained / prim_count:8.1f} B/prim retained")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-prim PrimInfo extraction cost, before and after PrimInfoCache.")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--breadth', type=int, default=10)
+    args = parser.parse_args()
+
+    stage = generate_stage(StageSpec(depth=args.depth, breadth=args.breadth, array_size=0, time_samples=0))
+    prim_count = sum(1 for _ in Usd.PrimRange(stage.GetPseudoRoot(), CHILD_PRIM_PREDICATE))
+    print(f"Synthetic stage: {prim_count} prims")
+    measure("per-prim", extract_per_prim, stage, prim_count)
+    measure("cached", extract_cached, stage, prim_count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PACKAGE = __package__.rpartition('.')[0]
+# Directory the top-level package is importable from, for the child interpreters.
+IMPORT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *(['..'] * (PACKAGE.count('.') + 2))))
+
+MODULES = ['usdUtils', 'usdTreeModel', 'usdPrimEditorUI']
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('PySide2', 'maya', 'mayaUsd') if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def measure_import(module: str, repeat: int):
+    # Each import runs in a fresh interpreter so nothing is already cached in sys.modules.
+    timings = []
+    heavy = ''
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(module=module)], cwd=IMPORT_ROOT,
+                                check=True, capture_output=True, text=True).stdout.split()
+        timings.append(float(output[0]))
+        heavy = output[1] if len(output) > 1 else ''
+    return min(timings), heavy
+
+
+def measure_window_open(repeat: int) -> float:
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide2 import QtWidgets
+    from ..usdPrimEditorUI import UsdPrimEditorWindow
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        window = UsdPrimEditorWindow()
+        window.show()
+        app.processEvents()
+        timings.append(time.perf_counter() - start)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the editor modules and time to open the window.")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        elapsed, heavy = measure_import(f"{PACKAGE}.{module}", args.repeat)
+        print(f"import {module:<16} {elapsed * 1000:8.1f} ms  pulls in: {heavy or '-'}")
+    print(f"open window          {measure_window_open(args.repeat) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import sys
+from typing import Optional
+
+from pxr import Usd, Sdf
+
+from ..usdEditJournal import EditJournal
+from ..usdUtils import delete_samples_in_range, retime_samples
+
+# Headless check that bulk sample edits on a sublayer authored with an offset and scale select and write samples in
+# stage time, both through usdUtils and through the edit journal.
+
+ATTR_PATH = Sdf.Path('/World.value')
+# Layer time t is stage time 10 + 2 * t.
+SUBLAYER_OFFSET = Sdf.LayerOffset(offset=10, scale=2)
+LAYER_TIMES = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def offset_sublayer_stage():
+    # Samples at stage times 10, 12, ..., 20, each holding its layer time; the sublayer is the edit target.
+    sublayer = Sdf.Layer.CreateAnonymous('offsetSublayer')
+    prim_spec = Sdf.CreatePrimInLayer(sublayer, ATTR_PATH.GetPrimPath())
+    prim_spec.specifier = Sdf.SpecifierDef
+    Sdf.AttributeSpec(prim_spec, ATTR_PATH.name, Sdf.ValueTypeNames.Double)
+    for time in LAYER_TIMES:
+        sublayer.SetTimeSample(ATTR_PATH, time, time)
+
+    root_layer = Sdf.Layer.CreateAnonymous('root')
+    root_layer.subLayerPaths.append(sublayer.identifier)
+    root_layer.SetSubLayerOffset(SUBLAYER_OFFSET, 0)
+    stage = Usd.Stage.Open(root_layer)
+    stage.SetEditTarget(stage.GetEditTargetForLocalLayer(sublayer))
+    return stage, sublayer
+
+
+def layer_samples(layer: Sdf.Layer) -> dict:
+    return {time: layer.QueryTimeSample(ATTR_PATH, time) for time in layer.ListTimeSamplesForPath(ATTR_PATH)}
+
+
+def check(name: str, layer: Sdf.Layer, expected: dict, count: Optional[int] = None,
+          expected_count: Optional[int] = None) -> list:
+    errors = []
+    if count != expected_count:
+        errors.append(f"{name}: edited {count} samples, expected {expected_count}")
+    samples = layer_samples(layer)
+    if samples != expected:
+        errors.append(f"{name}: sublayer samples {samples}, expected {expected}")
+    return errors
+
+
+# Stage frames 12-16 are layer times 1-3; moving them 4 frames later lands on layer times 3-5.
+RETIMED = {0.0: 0.0, 3.0: 1.0, 4.0: 2.0, 5.0: 3.0}
+DELETED = {0.0: 0.0, 4.0: 4.0, 5.0: 5.0}
+
+
+def check_usd_utils() -> list:
+    stage, sublayer = offset_sublayer_stage()
+    errors = check("usdUtils retime", sublayer, RETIMED, retime_samples(stage, [ATTR_PATH], 12, 16, offset=4), 3)
+    stage, sublayer = offset_sublayer_stage()
+    errors += check("usdUtils delete", sublayer, DELETED, delete_samples_in_range(stage, [ATTR_PATH], 12, 16), 3)
+    return errors
+
+
+def check_journal() -> list:
+    original = dict(zip(LAYER_TIMES, LAYER_TIMES))
+    journal = EditJournal(coalesce_window=0.0)
+    stage, sublayer = offset_sublayer_stage()
+    count = journal.retime_samples(stage, [ATTR_PATH], 12, 16, offset=4)
+    errors = check("journal retime", sublayer, RETIMED, count, 3)
+    journal.undo()
+    errors += check("journal retime undo", sublayer, original)
+
+    stage, sublayer = offset_sublayer_stage()
+    count = journal.delete_samples_in_range(stage, [ATTR_PATH], 12, 16)
+    errors += check("journal delete", sublayer, DELETED, count, 3)
+    journal.undo()
+    errors += check("journal delete undo", sublayer, original)
+    return errors
+
+
+def main() -> int:
+    errors = check_usd_utils() + check_journal()
+    for error in errors:
+        print(f"FAILED: {error}")
+    if not errors:
+        print("Bulk sample edits follow the edit target's layer offset.")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2 import QtGui, QtWidgets
+from pxr import Sdf
+
+from ..usdStageTextPanel import StageTextPanel
+from ..usdUtils import update_stage_from_text
+from .stageGenerators import StageSpec, generate_stage
+
+# Headless check that edits typed into the stage text panel reach the root layer through "Update Stage", including
+# edits on a later page and in Selected Prim mode.
+
+
+def replace_in_page(panel: StageTextPanel, old: str, new: str, backward: bool = False) -> bool:
+    # Edits the shown page the way typing would, so the document is marked modified.
+    document = panel.text_edit.document()
+    if backward:
+        cursor = document.find(old, document.characterCount(), QtGui.QTextDocument.FindBackward)
+    else:
+        cursor = document.find(old)
+    if cursor.isNull():
+        return False
+    cursor.insertText(new)
+    return True
+
+
+def purpose_values(layer: Sdf.Layer) -> dict:
+    values = {}
+
+    def visit(path):
+        if path.IsPropertyPath() and path.name == 'purpose':
+            values[path] = layer.GetAttributeAtPath(path).default
+
+    layer.Traverse(Sdf.Path.absoluteRootPath, visit)
+    return values
+
+
+def check_layer_mode(panel: StageTextPanel) -> list:
+    stage = generate_stage(StageSpec(depth=3, breadth=5, array_size=4, time_samples=0))
+    layer = stage.GetRootLayer()
+    panel.set_stage(stage)
+    if panel.page_count() < 2:
+        return ["layer text fits on one page; paging is not exercised"]
+
+    errors = []
+    panel.show_page(0)
+    if not replace_in_page(panel, 'kind = "assembly"', 'kind = "group"'):
+        errors.append("kind not found on the first page")
+    # The last purpose opinion in the layer, on a later page.
+    edited_page = None
+    for page in reversed(range(1, panel.page_count())):
+        panel.show_page(page)
+        if replace_in_page(panel, 'token purpose = "render"', 'token purpose = "proxy"', backward=True):
+            edited_page = page
+            break
+    if edited_page is None:
+        errors.append("no purpose opinion found after the first page")
+
+    diff = update_stage_from_text(stage, panel.text(), panel.text_root_path())
+    if diff.is_empty():
+        errors.append("layer mode: the edited text produced no diff")
+    if layer.GetPrimAtPath('/World').kind != 'group':
+        errors.append("layer mode: kind edit did not reach the root layer")
+    proxies = [path for path, value in purpose_values(layer).items() if value == 'proxy']
+    if len(proxies) != 1:
+        errors.append(f"layer mode: expected one purpose edit on page {edited_page}, found {len(proxies)}")
+    return errors
+
+
+def check_prim_mode(panel: StageTextPanel) -> list:
+    stage = generate_stage(StageSpec(depth=2, breadth=4, array_size=4, time_samples=0))
+    layer = stage.GetRootLayer()
+    prim_path = Sdf.Path('/World/prim_1')
+    panel.set_stage(stage)
+    panel.set_prim_path(prim_path)
+    panel.mode_combo.setCurrentText(StageTextPanel.MODE_PRIM)
+
+    errors = []
+    if not replace_in_page(panel, 'kind = "component"', 'kind = "subcomponent"'):
+        errors.append("prim mode: kind not found")
+    update_stage_from_text(stage, panel.text(), panel.text_root_path())
+    if layer.GetPrimAtPath(prim_path).kind != 'subcomponent':
+        errors.append("prim mode: kind edit did not reach the root layer")
+    if layer.GetPrimAtPath('/World').kind != 'assembly':
+        errors.append("prim mode: specs outside the prim were changed")
+    return errors
+
+
+def main() -> int:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    panel = StageTextPanel()
+    panel.PAGE_SIZE = 2000
+    panel.show()
+
+    errors = check_layer_mode(panel) + check_prim_mode(panel)
+    panel.set_stage(None)
+    app.processEvents()
+    for error in errors:
+        print(f"FAILED: {error}")
+    if not errors:
+        print("Stage text edits reach the root layer.")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
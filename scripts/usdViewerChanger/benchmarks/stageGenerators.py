@@ -0,0 +1,99 @@
+from dataclasses import dataclass, asdict
+
+from pxr import Usd, Sdf, Vt, Gf
+
+
+@dataclass
+class StageSpec:
+    depth: int = 4
+    breadth: int = 10
+    variant_sets: int = 1
+    variants_per_set: int = 3
+    # Every n-th Xform gets a payload; 0 disables payloads.
+    payload_every: int = 0
+    array_size: int = 100
+    time_samples: int = 24
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# Anonymous layers only live as long as something references them; the payload layers are kept here.
+_payload_layers = []
+
+
+def prim_count(spec: StageSpec) -> int:
+    return sum(spec.breadth ** level for level in range(1, spec.depth + 1)) + 1
+
+
+def _author_mesh(parent: Sdf.PrimSpec, name: str, spec: StageSpec, index: int) -> Sdf.PrimSpec:
+    mesh = Sdf.PrimSpec(parent, name, Sdf.SpecifierDef, 'Mesh')
+    points = Sdf.AttributeSpec(mesh, 'points', Sdf.ValueTypeNames.Point3fArray)
+    points.default = Vt.Vec3fArray([Gf.Vec3f(i, index, i * 0.5) for i in range(spec.array_size)])
+    st = Sdf.AttributeSpec(mesh, 'primvars:st', Sdf.ValueTypeNames.TexCoord2fArray)
+    st.default = Vt.Vec2fArray([Gf.Vec2f(i / max(spec.array_size, 1), 0.5) for i in range(spec.array_size)])
+    if spec.time_samples:
+        translate = Sdf.AttributeSpec(mesh, 'xformOp:translate', Sdf.ValueTypeNames.Double3)
+        for frame in range(spec.time_samples):
+            mesh.layer.SetTimeSample(translate.path, frame, Gf.Vec3d(frame, index, 0))
+    return mesh
+
+
+def _author_variants(prim: Sdf.PrimSpec, spec: StageSpec) -> None:
+    for set_index in range(spec.variant_sets):
+        set_name = f"set{set_index}"
+        variant_set = Sdf.VariantSetSpec(prim, set_name)
+        for variant_index in range(spec.variants_per_set):
+            Sdf.VariantSpec(variant_set, f"v{variant_index}")
+        prim.variantSetNameList.prependedItems.append(set_name)
+        prim.variantSelections[set_name] = "v0"
+
+
+def _payload_layer(spec: StageSpec) -> Sdf.Layer:
+    layer = Sdf.Layer.CreateAnonymous('payload.usda')
+    with Sdf.ChangeBlock():
+        root = Sdf.PrimSpec(layer, 'Payload', Sdf.SpecifierDef, 'Xform')
+        for i in range(spec.breadth):
+            _author_mesh(root, f"payloadMesh_{i}", spec, i)
+    layer.defaultPrim = 'Payload'
+    _payload_layers.append(layer)
+    return layer
+
+
+def generate_layer(spec: StageSpec) -> Sdf.Layer:
+    layer = Sdf.Layer.CreateAnonymous('synthetic.usda')
+    payload_layer = _payload_layer(spec) if spec.payload_every else None
+    with Sdf.ChangeBlock():
+        world = Sdf.PrimSpec(layer, 'World', Sdf.SpecifierDef, 'Xform')
+        world.kind = 'assembly'
+        frontier = [world]
+        count = 0
+        for level in range(1, spec.depth + 1):
+            is_leaf_level = level == spec.depth
+            next_frontier = []
+            for parent in frontier:
+                for i in range(spec.breadth):
+                    count += 1
+                    name = f"prim_{count}"
+                    if is_leaf_level:
+                        _author_mesh(parent, name, spec, count)
+                        continue
+                    prim = Sdf.PrimSpec(parent, name, Sdf.SpecifierDef, 'Xform')
+                    if i % 4 == 0:
+                        prim.kind = 'component'
+                    if i % 5 == 0:
+                        purpose = Sdf.AttributeSpec(prim, 'purpose', Sdf.ValueTypeNames.Token,
+                                                    Sdf.VariabilityUniform)
+                        purpose.default = 'render'
+                    if spec.variant_sets and i % 2 == 0:
+                        _author_variants(prim, spec)
+                    if payload_layer and count % spec.payload_every == 0:
+                        prim.payloadList.prependedItems.append(Sdf.Payload(payload_layer.identifier))
+                    next_frontier.append(prim)
+            frontier = next_frontier
+    layer.defaultPrim = 'World'
+    return layer
+
+
+def generate_stage(spec: StageSpec, load=Usd.Stage.LoadAll) -> Usd.Stage:
+    return Usd.Stage.Open(generate_layer(spec), load)
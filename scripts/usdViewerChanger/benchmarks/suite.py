@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2 import QtCore, QtWidgets
+from pxr import Usd
+
+from ..usdUtils import (
+    CHILD_PRIM_PREDICATE, GeometryStatsCache, get_prim_info, get_variant_sets, get_stage_as_text, update_stage_from_text
+)
+from ..usdTreeModel import UsdTreeModel
+from .stageGenerators import StageSpec, generate_stage, prim_count
+
+BENCHMARKS: Dict[str, Callable[[Usd.Stage, 'BenchContext'], object]] = {}
+
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+class BenchContext:
+    def __init__(self, editor):
+        self.editor = editor
+
+
+def _all_prims(stage: Usd.Stage) -> List[Usd.Prim]:
+    return [prim for prim in Usd.PrimRange(stage.GetPseudoRoot(), CHILD_PRIM_PREDICATE) if not prim.IsPseudoRoot()]
+
+
+def _meshes(stage: Usd.Stage, limit: int = 1000) -> List[Usd.Prim]:
+    return [prim for prim in _all_prims(stage) if prim.GetTypeName() == 'Mesh'][:limit]
+
+
+def _fetch_all(model: QtCore.QAbstractItemModel, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+    while model.canFetchMore(parent):
+        model.fetchMore(parent)
+    rows = model.rowCount(parent)
+    count = rows
+    for row in range(rows):
+        count += _fetch_all(model, model.index(row, 0, parent))
+    return count
+
+
+@benchmark('tree_model_build')
+def bench_tree_model_build(stage, context):
+    # Construction plus fetching every row, which is what browsing the whole tree costs.
+    model = UsdTreeModel(stage)
+    return _fetch_all(model)
+
+
+@benchmark('get_prim_info')
+def bench_get_prim_info(stage, context):
+    return len([get_prim_info(prim) for prim in _all_prims(stage)])
+
+
+@benchmark('get_variant_sets')
+def bench_get_variant_sets(stage, context):
+    return len([get_variant_sets(prim) for prim in _all_prims(stage)])
+
+
+@benchmark('get_stage_as_text')
+def bench_get_stage_as_text(stage, context):
+    return len(get_stage_as_text(stage))
+
+
+@benchmark('update_stage_from_text')
+def bench_update_stage_from_text(stage, context):
+    text = get_stage_as_text(stage).replace('kind = "component"', 'kind = "subcomponent"', 1)
+    return update_stage_from_text(stage, text).edit_count()
+
+
+@benchmark('update_attr_primvar_list')
+def bench_update_attr_primvar_list(stage, context):
+    # Setting the prim and resolving every row's value column, as painting the panel would.
+    editor = context.editor
+    count = 0
+    for prim in _meshes(stage):
+        editor.update_attr_primvar_list(prim)
+        model = editor.attr_model
+        for row in range(model.rowCount()):
+            model.index(row, 2).data()
+            count += 1
+    return count
+
+
+@benchmark('update_time_samples')
+def bench_update_time_samples(stage, context):
+    editor = context.editor
+    if not editor.time_sample_model:
+        editor.build_time_samples_panel()
+    count = 0
+    for prim in _meshes(stage):
+        editor.update_time_samples(prim)
+        count += _fetch_all(editor.time_sample_model)
+    return count
+
+
+@benchmark('geometry_stats')
+def bench_geometry_stats(stage, context):
+    # First pass, then sorting by subtree points over every prim, which should only hit the cache.
+    stats = GeometryStatsCache(stage)
+    count = stats.compute()
+    sorted(_all_prims(stage), key=lambda prim: stats.subtree_stats(prim.GetPath()).point_count)
+    return count
+
+
+def run_benchmark(func, spec: StageSpec, context: BenchContext, repeat: int) -> dict:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        # A fresh stage per run, so edits made by one run cannot skew the next.
+        stage = generate_stage(spec)
+        context.editor.stage = stage
+        start = time.perf_counter()
+        result = func(stage, context)
+        timings.append(time.perf_counter() - start)
+    return {'seconds': min(timings), 'median': statistics.median(timings), 'result': result}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            continue
+        limit = previous['seconds'] * (1 + tolerance)
+        if current['seconds'] > limit:
+            regressions.append(f"{name}: {current['seconds']:.4f} s > {previous['seconds']:.4f} s "
+                               f"(+{(current['seconds'] / previous['seconds'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    defaults = StageSpec()
+    parser = argparse.ArgumentParser(description="Time the editor's hot paths on synthetic stages.")
+    parser.add_argument('--depth', type=int, default=defaults.depth)
+    parser.add_argument('--breadth', type=int, default=defaults.breadth)
+    parser.add_argument('--variant-sets', type=int, default=defaults.variant_sets)
+    parser.add_argument('--variants-per-set', type=int, default=defaults.variants_per_set)
+    parser.add_argument('--payload-every', type=int, default=defaults.payload_every)
+    parser.add_argument('--array-size', type=int, default=defaults.array_size)
+    parser.add_argument('--time-samples', type=int, default=defaults.time_samples)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--baseline', help="Fail if any benchmark is slower than in this results file.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown against the baseline.")
+    args = parser.parse_args(argv)
+
+    spec = StageSpec(args.depth, args.breadth, args.variant_sets, args.variants_per_set, args.payload_every,
+                     args.array_size, args.time_samples)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from ..usdPrimEditorUI import UsdPrimEditor
+    context = BenchContext(UsdPrimEditor())
+
+    results = {'spec': spec.to_dict(), 'prims': prim_count(spec), 'benchmarks': {}}
+    for name in args.only or BENCHMARKS:
+        results['benchmarks'][name] = run_benchmark(BENCHMARKS[name], spec, context, args.repeat)
+        print(f"{name:<26} {results['benchmarks'][name]['seconds']:9.4f} s")
+        app.processEvents()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('spec') != results['spec']:
+            print("Warning: baseline was recorded with a different stage spec.", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Optional
+
+import numpy
+from PySide2 import QtWidgets, QtCore
+from pxr import Usd
+from .usdArrayUtils import (
+    ArrayStats, ArrayWriter, read_array_view, compute_array_stats, parse_slice, apply_array_edit, write_array
+)
+
+
+class ArrayTableModel(QtCore.QAbstractTableModel):
+    # Rows are served straight from the NumPy view, one page at a time.
+    PAGE_ROWS = 10000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view: Optional[numpy.ndarray] = None
+        self.selection = slice(None)
+        self.indices = numpy.arange(0)
+        self.page = 0
+
+    def set_view(self, view: Optional[numpy.ndarray], selection: slice = slice(None)):
+        self.beginResetModel()
+        self.view = view
+        self.selection = selection
+        # Original element numbers of the sliced rows, for the vertical header.
+        self.indices = numpy.arange(len(view))[selection] if view is not None else numpy.arange(0)
+        self.page = 0
+        self.endResetModel()
+
+    def page_count(self) -> int:
+        return max(1, -(-len(self.indices) // self.PAGE_ROWS))
+
+    def set_page(self, page: int):
+        self.beginResetModel()
+        self.page = max(0, min(page, self.page_count() - 1))
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return max(0, min(self.PAGE_ROWS, len(self.indices) - self.page * self.PAGE_ROWS))
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or self.view is None:
+            return 0
+        return 1 if self.view.ndim == 1 else int(numpy.prod(self.view.shape[1:]))
+
+    def element_index(self, row: int) -> int:
+        return int(self.indices[self.page * self.PAGE_ROWS + row])
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Vertical:
+            return str(self.element_index(section))
+        return "xyzw"[section] if self.columnCount() <= 4 and self.columnCount() > 1 else str(section)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        element = self.view[self.element_index(index.row())]
+        value = element.flat[index.column()] if element.ndim else element
+        return f"{value:.6g}" if numpy.issubdtype(self.view.dtype, numpy.floating) else str(value)
+
+
+class ArrayInspectorDialog(QtWidgets.QDialog):
+    # Emitted right before the attribute is written, so the owner can stop stage readers.
+    aboutToEdit = QtCore.Signal()
+
+    def __init__(self, attr: Usd.Attribute, edit_context: Callable[[], ContextManager] = nullcontext,
+                 write: ArrayWriter = write_array, parent=None):
+        super().__init__(parent)
+        self.attr = attr
+        # Entered around each write, e.g. to author on the editor's chosen edit target.
+        self.edit_context = edit_context
+        # Authors the edited array; the editor records it in its edit journal.
+        self.write = write
+        self.view: Optional[numpy.ndarray] = None
+        self.setWindowTitle(f"Array Inspector - {attr.GetPath()}")
+        self.setMinimumSize(500, 600)
+        self.setup_ui()
+        self.reload()
+
+    def setup_ui(self):
+        self.stats_label = QtWidgets.QLabel()
+        self.stats_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+
+        slice_layout = QtWidgets.QHBoxLayout()
+        self.slice_edit = QtWidgets.QLineEdit()
+        self.slice_edit.setPlaceholderText("Slice, e.g. 0:1000 or ::10")
+        self.prev_page_button = QtWidgets.QPushButton("<")
+        self.next_page_button = QtWidgets.QPushButton(">")
+        self.page_label = QtWidgets.QLabel()
+        slice_layout.addWidget(QtWidgets.QLabel("Slice:"))
+        slice_layout.addWidget(self.slice_edit)
+        slice_layout.addWidget(self.prev_page_button)
+        slice_layout.addWidget(self.page_label)
+        slice_layout.addWidget(self.next_page_button)
+
+        self.table_model = ArrayTableModel(self)
+        self.table_view = QtWidgets.QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+
+        edit_layout = QtWidgets.QHBoxLayout()
+        self.scale_edit = QtWidgets.QLineEdit("1")
+        self.offset_edit = QtWidgets.QLineEdit("0")
+        self.clamp_edit = QtWidgets.QLineEdit()
+        self.clamp_edit.setPlaceholderText("min, max")
+        self.apply_edit_button = QtWidgets.QPushButton("Apply to Slice")
+        edit_layout.addWidget(QtWidgets.QLabel("Scale:"))
+        edit_layout.addWidget(self.scale_edit)
+        edit_layout.addWidget(QtWidgets.QLabel("Offset:"))
+        edit_layout.addWidget(self.offset_edit)
+        edit_layout.addWidget(QtWidgets.QLabel("Clamp:"))
+        edit_layout.addWidget(self.clamp_edit)
+        edit_layout.addWidget(self.apply_edit_button)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.stats_label)
+        layout.addLayout(slice_layout)
+        layout.addWidget(self.table_view)
+        layout.addLayout(edit_layout)
+
+        self.slice_edit.editingFinished.connect(self.apply_slice)
+        self.prev_page_button.clicked.connect(lambda: self.show_page(self.table_model.page - 1))
+        self.next_page_button.clicked.connect(lambda: self.show_page(self.table_model.page + 1))
+        self.apply_edit_button.clicked.connect(self.apply_edit)
+
+    def reload(self):
+        try:
+            self.view = read_array_view(self.attr)
+        except (TypeError, ValueError) as e:
+            self.view = None
+            self.stats_label.setText(str(e))
+            self.apply_edit_button.setEnabled(False)
+            self.table_model.set_view(None)
+            self.show_page(0)
+            return
+
+        self.show_stats(compute_array_stats(self.view))
+        self.apply_slice()
+
+    def show_stats(self, stats: ArrayStats):
+        lines = [f"{self.attr.GetTypeName()}: {stats.length} elements x {stats.components} components"]
+        if stats.minimum is not None:
+            lines.append(f"Min: {self.format_tuple(stats.minimum)}")
+            lines.append(f"Max: {self.format_tuple(stats.maximum)}")
+            lines.append(f"Bounds: {self.format_tuple(stats.bounds_size())}")
+        lines.append(f"NaN: {stats.nan_count}")
+        self.stats_label.setText("\n".join(lines))
+
+    @staticmethod
+    def format_tuple(values) -> str:
+        return "(" + ", ".join(f"{value:.6g}" for value in values) + ")"
+
+    def current_slice(self) -> slice:
+        return parse_slice(self.slice_edit.text())
+
+    def apply_slice(self):
+        if self.view is None:
+            return
+        try:
+            selection = self.current_slice()
+        except ValueError:
+            print(f"Warning: Invalid slice '{self.slice_edit.text()}'")
+            return
+        self.table_model.set_view(self.view, selection)
+        self.show_page(0)
+
+    def show_page(self, page: int):
+        self.table_model.set_page(page)
+        page = self.table_model.page
+        page_count = self.table_model.page_count()
+        self.page_label.setText(f"Page {page + 1} / {page_count}")
+        self.prev_page_button.setEnabled(page > 0)
+        self.next_page_button.setEnabled(page < page_count - 1)
+
+    def parse_components(self, text: str):
+        values = [float(value) for value in text.replace('(', '').replace(')', '').split(',') if value.strip()]
+        return values[0] if len(values) == 1 else values
+
+    def apply_edit(self):
+        if self.view is None:
+            return
+        try:
+            scale = self.parse_components(self.scale_edit.text() or "1")
+            offset = self.parse_components(self.offset_edit.text() or "0")
+            clamp = self.parse_components(self.clamp_edit.text()) if self.clamp_edit.text().strip() else None
+            if clamp is not None and (not isinstance(clamp, list) or len(clamp) != 2):
+                print("Warning: Clamp expects 'min, max'.")
+                return
+            selection = self.current_slice()
+
+            self.aboutToEdit.emit()
+            with self.edit_context():
+                stats = apply_array_edit(self.attr, scale, offset, clamp, selection, write=self.write)
+        except Exception as e:
+            print(f"Error editing array: {str(e)}")
+            return
+
+        # The stage now holds a new array; re-wrap it rather than keeping a view of the old one.
+        page = self.table_model.page
+        self.view = read_array_view(self.attr)
+        self.show_stats(stats)
+        self.table_model.set_view(self.view, selection)
+        self.show_page(page)
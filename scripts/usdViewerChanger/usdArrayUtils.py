@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple, Union
+
+import numpy
+from pxr import Usd
+
+
+@dataclass
+class ArrayStats:
+    length: int
+    components: int
+    minimum: Optional[Tuple[float, ...]]
+    maximum: Optional[Tuple[float, ...]]
+    nan_count: int
+
+    def bounds_size(self) -> Optional[Tuple[float, ...]]:
+        if self.minimum is None:
+            return None
+        return tuple(high - low for low, high in zip(self.minimum, self.maximum))
+
+
+def array_view(value) -> numpy.ndarray:
+    # Vt arrays of numeric and Gf vector types expose the buffer protocol, so this wraps the array's memory
+    # without copying. The view is read-only: writing through it would bypass Vt's copy-on-write.
+    try:
+        buffer = memoryview(value)
+    except TypeError:
+        raise TypeError(f"{type(value).__name__} does not expose a numeric buffer.")
+    view = numpy.asarray(buffer)
+    view.flags.writeable = False
+    return view
+
+
+def read_array_view(attr: Usd.Attribute, time: Usd.TimeCode = Usd.TimeCode.Default()) -> numpy.ndarray:
+    value = attr.Get(time)
+    if value is None:
+        raise ValueError(f"{attr.GetPath()} has no value.")
+    return array_view(value)
+
+
+def _components(view: numpy.ndarray) -> numpy.ndarray:
+    return view.reshape(len(view), -1)
+
+
+def compute_array_stats(view: numpy.ndarray) -> ArrayStats:
+    components = _components(view)
+    is_float = numpy.issubdtype(view.dtype, numpy.floating)
+    nan_count = int(numpy.count_nonzero(numpy.isnan(components))) if is_float else 0
+    if len(components) == 0 or nan_count == components.size:
+        return ArrayStats(len(view), components.shape[1], None, None, nan_count)
+
+    minimum = numpy.nanmin(components, axis=0) if is_float else components.min(axis=0)
+    maximum = numpy.nanmax(components, axis=0) if is_float else components.max(axis=0)
+    return ArrayStats(len(view), components.shape[1], tuple(minimum.tolist()), tuple(maximum.tolist()), nan_count)
+
+
+def parse_slice(text: str) -> slice:
+    text = text.strip()
+    if not text:
+        return slice(None)
+    parts = [int(part) if part.strip() else None for part in text.split(':')]
+    if len(parts) == 1:
+        return slice(parts[0], parts[0] + 1 if parts[0] != -1 else None)
+    return slice(*parts[:3])
+
+
+Scalars = Union[float, Sequence[float]]
+
+
+def transform_array(view: numpy.ndarray, scale: Scalars = 1.0, offset: Scalars = 0.0,
+                    clamp: Optional[Tuple[float, float]] = None, selection: slice = slice(None)) -> numpy.ndarray:
+    # One copy of the source for the result; scale/offset broadcast per component.
+    result = numpy.array(view, copy=True)
+    region = _components(result)[selection]
+    numpy.multiply(region, numpy.asarray(scale), out=region, casting='unsafe')
+    numpy.add(region, numpy.asarray(offset), out=region, casting='unsafe')
+    if clamp is not None:
+        numpy.clip(region, clamp[0], clamp[1], out=region, casting='unsafe')
+    return result
+
+
+def to_vt_array(attr: Usd.Attribute, array: numpy.ndarray):
+    vt_type = attr.GetTypeName().type.pythonClass
+    return vt_type.FromNumpy(numpy.ascontiguousarray(array))
+
+
+def write_array(attr: Usd.Attribute, array: numpy.ndarray, time: Usd.TimeCode = Usd.TimeCode.Default()) -> bool:
+    return attr.Set(to_vt_array(attr, array), time)
+
+
+ArrayWriter = Callable[[Usd.Attribute, numpy.ndarray, Usd.TimeCode], bool]
+
+
+def apply_array_edit(attr: Usd.Attribute, scale: Scalars = 1.0, offset: Scalars = 0.0,
+                     clamp: Optional[Tuple[float, float]] = None, selection: slice = slice(None),
+                     time: Usd.TimeCode = Usd.TimeCode.Default(), write: ArrayWriter = write_array) -> ArrayStats:
+    result = transform_array(read_array_view(attr, time), scale, offset, clamp, selection)
+    if not write(attr, result, time):
+        raise RuntimeError(f"Could not write {attr.GetPath()}")
+    return compute_array_stats(result)
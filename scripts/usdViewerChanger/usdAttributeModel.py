@@ -0,0 +1,182 @@
+from typing import List, Optional
+
+from PySide2 import QtCore, QtGui
+from pxr import Usd, Sdf
+
+
+class _AttributeRow:
+    __slots__ = ('row', 'attr', 'name', 'type_name', 'is_primvar', 'is_array', 'value_text', 'array',
+                 'element_count', 'elements')
+
+    def __init__(self, row: int, attr: Usd.Attribute):
+        self.row = row
+        self.attr = attr
+        self.name = attr.GetName()
+        self.type_name = attr.GetTypeName()
+        self.is_primvar = self.name.startswith('primvars:') and not self.name.endswith(':indices')
+        self.is_array = self.type_name.isArray
+        # Resolved on first paint.
+        self.value_text: Optional[str] = None
+        self.array = None
+        self.element_count = 0
+        self.elements = _ArrayElements(self)
+
+
+class _ArrayElements:
+    # Internal pointer shared by the element rows of one array attribute.
+    __slots__ = ('owner', 'fetched')
+
+    def __init__(self, owner: _AttributeRow):
+        self.owner = owner
+        self.fetched = 0
+
+
+class UsdAttributeModel(QtCore.QAbstractItemModel):
+    HEADERS = ['Name', 'Type', 'Value']
+    PREVIEW_LENGTH = 8
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.prim = None
+        self._rows: List[_AttributeRow] = []
+
+    def set_prim(self, prim: Optional[Usd.Prim]):
+        self.beginResetModel()
+        self.prim = prim
+        # Primvars are attributes too, so listing attributes once shows each primvar exactly once.
+        self._rows = [_AttributeRow(row, attr) for row, attr in enumerate(prim.GetAttributes())] if prim else []
+        self.endResetModel()
+
+    def attribute(self, index: QtCore.QModelIndex) -> Optional[Usd.Attribute]:
+        row = self._attribute_row(index)
+        return row.attr if row else None
+
+    def is_array_index(self, index: QtCore.QModelIndex) -> bool:
+        row = self._attribute_row(index)
+        return bool(row and row.is_array)
+
+    def _attribute_row(self, index: QtCore.QModelIndex) -> Optional[_AttributeRow]:
+        if not index.isValid():
+            return None
+        pointer = index.internalPointer()
+        return pointer.owner if isinstance(pointer, _ArrayElements) else pointer
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if column < 0 or column >= len(self.HEADERS):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            if 0 <= row < len(self._rows):
+                return self.createIndex(row, column, self._rows[row])
+            return QtCore.QModelIndex()
+
+        pointer = parent.internalPointer()
+        if isinstance(pointer, _AttributeRow) and 0 <= row < pointer.elements.fetched:
+            return self.createIndex(row, column, pointer.elements)
+        return QtCore.QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        pointer = index.internalPointer()
+        if isinstance(pointer, _ArrayElements):
+            return self.createIndex(pointer.owner.row, 0, pointer.owner)
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._rows)
+        pointer = parent.internalPointer()
+        if parent.column() == 0 and isinstance(pointer, _AttributeRow):
+            return pointer.elements.fetched
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return bool(self._rows)
+        pointer = parent.internalPointer()
+        # Arrays are expandable without resolving their value; an empty one simply fetches no rows.
+        return isinstance(pointer, _AttributeRow) and pointer.is_array
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return False
+        pointer = parent.internalPointer()
+        if not isinstance(pointer, _AttributeRow) or not pointer.is_array:
+            return False
+        self._resolve(pointer)
+        return pointer.elements.fetched < pointer.element_count
+
+    def fetchMore(self, parent):
+        pointer = parent.internalPointer()
+        first = pointer.elements.fetched
+        last = min(first + self.PAGE_SIZE, pointer.element_count) - 1
+        if last < first:
+            return
+        self.beginInsertRows(parent, first, last)
+        pointer.elements.fetched = last + 1
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        pointer = index.internalPointer()
+        attr_row = self._attribute_row(index)
+        if role == QtCore.Qt.UserRole:
+            return {'color': self.attribute_color(attr_row)}
+        if role != QtCore.Qt.DisplayRole:
+            return None
+
+        if isinstance(pointer, _ArrayElements):
+            if index.column() == 0:
+                return f"[{index.row()}]"
+            if index.column() == 2:
+                return str(attr_row.array[index.row()])
+            return ""
+
+        if index.column() == 0:
+            return attr_row.name
+        if index.column() == 1:
+            return str(attr_row.type_name)
+        self._resolve(attr_row)
+        return attr_row.value_text
+
+    def _resolve(self, attr_row: _AttributeRow):
+        if attr_row.value_text is not None:
+            return
+
+        value = attr_row.attr.Get()
+        if not attr_row.is_array:
+            attr_row.value_text = str(value)
+            return
+
+        # Arrays are never stringified whole: keep the value for paging and show a short preview.
+        attr_row.array = value
+        attr_row.element_count = len(value) if value is not None else 0
+        preview = ", ".join(str(value[i]) for i in range(min(attr_row.element_count, self.PREVIEW_LENGTH)))
+        if attr_row.element_count > self.PREVIEW_LENGTH:
+            preview += ", ..."
+        attr_row.value_text = f"[{preview}] ({attr_row.element_count} items)"
+
+    @staticmethod
+    def attribute_color(attr_row: _AttributeRow) -> QtGui.QColor:
+        if attr_row.is_primvar:
+            return QtGui.QColor(0, 255, 255)  # Cyan for primvars
+        elif attr_row.attr.IsCustom():
+            return QtGui.QColor(255, 255, 0)  # Yellow for custom attributes
+        elif attr_row.name.startswith('xformOp:'):
+            return QtGui.QColor(200, 200, 255)  # Light blue for transform attributes
+        elif attr_row.type_name == Sdf.ValueTypeNames.TimeCode:
+            return QtGui.QColor(0, 255, 0)  # Green for time samples
+        elif attr_row.type_name == Sdf.ValueTypeNames.Token:
+            return QtGui.QColor(217, 157, 52)  # Orange for tokens
+        return QtGui.QColor(142, 211, 245)  # Default color
@@ -0,0 +1,121 @@
+from typing import Dict, Optional
+
+from PySide2 import QtWidgets
+from pxr import Usd, Sdf
+from .usdUtils import (
+    CompositionQueryCache, get_layer_stack_info, get_prim_stack, get_property_stack, measure_layer_load_time
+)
+
+
+class CompositionPanel(QtWidgets.QWidget):
+    HEADERS = ['Layer', 'Path / Arc', 'Details']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stage = None
+        self.composition_cache: Optional[CompositionQueryCache] = None
+        self.prim = None
+        self.attr = None
+        # Load times are only measured on request, and kept per layer identifier.
+        self.load_times: Dict[str, Optional[float]] = {}
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setHeaderLabels(self.HEADERS)
+        self.tree.setUniformRowHeights(True)
+        self.measure_button = QtWidgets.QPushButton("Measure Load Times")
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.tree)
+        layout.addWidget(self.measure_button)
+
+        self.measure_button.clicked.connect(self.measure_load_times)
+
+    def set_stage(self, stage: Optional[Usd.Stage], composition_cache: Optional[CompositionQueryCache]):
+        self.stage = stage
+        self.composition_cache = composition_cache
+        self.prim = None
+        self.attr = None
+        self.refresh()
+
+    def set_prim(self, prim: Optional[Usd.Prim], attr: Optional[Usd.Attribute] = None):
+        self.prim = prim
+        self.attr = attr
+        self.refresh()
+
+    def measure_load_times(self):
+        if not self.stage:
+            return
+        for layer in self.stage.GetLayerStack(includeSessionLayers=True):
+            self.load_times[layer.identifier] = measure_layer_load_time(layer)
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+
+        self.tree.clear()
+        if not self.stage:
+            return
+
+        layer_stack_item = self.add_group("Layer Stack")
+        for info in get_layer_stack_info(self.stage):
+            size = f"{info.file_size / 1024:.1f} KB" if info.file_size is not None else "in memory"
+            details = [size]
+            if info.identifier in self.load_times:
+                load_time = self.load_times[info.identifier]
+                details.append(f"{load_time * 1000:.1f} ms" if load_time is not None else "-")
+            if info.is_session:
+                details.append("session")
+            self.add_row(layer_stack_item, info.display_name, "", ", ".join(details), info.identifier)
+
+        if self.prim:
+            prim_stack_item = self.add_group(f"Prim Stack: {self.prim.GetPath()}")
+            for opinion in get_prim_stack(self.prim):
+                self.add_row(prim_stack_item, self.layer_name(opinion.layer_identifier), str(opinion.spec_path), "",
+                             opinion.layer_identifier)
+
+            arcs_item = self.add_group("Composition Arcs")
+            for arc in self.composition_cache.get_arcs(self.prim.GetPath()):
+                details = f"introduced in {self.layer_name(arc.introducing_layer)}" if arc.introducing_layer else ""
+                self.add_row(arcs_item, self.layer_name(arc.target_layer), f"{arc.arc_type} {arc.target_path}",
+                             details, arc.target_layer)
+
+        if self.attr:
+            property_item = self.add_group(f"Property Stack: {self.attr.GetName()}")
+            for opinion in get_property_stack(self.attr):
+                details = []
+                if opinion.has_default:
+                    details.append("default")
+                if opinion.time_sample_count:
+                    details.append(f"{opinion.time_sample_count} samples")
+                self.add_row(property_item, self.layer_name(opinion.layer_identifier), str(opinion.spec_path),
+                             ", ".join(details), opinion.layer_identifier)
+
+        self.tree.expandAll()
+        self.tree.resizeColumnToContents(0)
+
+    def add_group(self, title: str) -> QtWidgets.QTreeWidgetItem:
+        item = QtWidgets.QTreeWidgetItem(self.tree)
+        item.setText(0, title)
+        item.setFirstColumnSpanned(True)
+        return item
+
+    def add_row(self, parent, layer_name: str, path: str, details: str, tooltip: str):
+        item = QtWidgets.QTreeWidgetItem(parent)
+        item.setText(0, layer_name)
+        item.setText(1, path)
+        item.setText(2, details)
+        item.setToolTip(0, tooltip)
+        return item
+
+    @staticmethod
+    def layer_name(identifier: str) -> str:
+        layer = Sdf.Layer.Find(identifier)
+        return layer.GetDisplayName() if layer else identifier
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
@@ -0,0 +1,589 @@
+import itertools
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from pxr import Usd, UsdGeom, Sdf
+from .usdProfiling import timed
+from .usdUtils import (LayerDiff, PrimPurpose, compute_layer_diff, edit_target_sample_times, parse_layer_text,
+                       retimed_layer_time)
+
+# Pure USD: edits are recorded as Sdf-level operations that know their previous value, so every transaction can be
+# reverted and re-applied without the stage or Maya. Hosts hook in through EditJournal.listeners.
+
+
+class _Unset:
+    def __repr__(self):
+        return 'UNSET'
+
+
+UNSET = _Unset()
+
+
+class SpecOperation:
+    def key(self) -> Optional[Hashable]:
+        # Operations with equal keys inside one transaction are merged: the first old value and the last new one.
+        return None
+
+    def apply(self) -> None:
+        raise NotImplementedError
+
+    def revert(self) -> None:
+        raise NotImplementedError
+
+
+@dataclass
+class InfoEdit(SpecOperation):
+    layer: Sdf.Layer
+    spec_path: Sdf.Path
+    info_key: str
+    old: object
+    new: object
+
+    def key(self):
+        return 'info', self.layer.identifier, self.spec_path, self.info_key
+
+    def _set(self, value) -> None:
+        spec = self.layer.GetObjectAtPath(self.spec_path)
+        if not spec:
+            return
+        if self.info_key == 'default':
+            # Goes through the attribute's value type rather than SetInfo's generic conversion.
+            if value is UNSET:
+                spec.ClearDefaultValue()
+            else:
+                spec.default = value
+        elif value is UNSET:
+            if spec.HasInfo(self.info_key):
+                spec.ClearInfo(self.info_key)
+        else:
+            spec.SetInfo(self.info_key, value)
+
+    def apply(self):
+        self._set(self.new)
+
+    def revert(self):
+        self._set(self.old)
+
+
+@dataclass
+class TimeSampleEdit(SpecOperation):
+    layer: Sdf.Layer
+    spec_path: Sdf.Path
+    time: float
+    old: object
+    new: object
+
+    def key(self):
+        return 'sample', self.layer.identifier, self.spec_path, self.time
+
+    def _set(self, value) -> None:
+        if value is UNSET:
+            self.layer.EraseTimeSample(self.spec_path, self.time)
+        else:
+            self.layer.SetTimeSample(self.spec_path, self.time, value)
+
+    def apply(self):
+        self._set(self.new)
+
+    def revert(self):
+        self._set(self.old)
+
+
+@dataclass
+class VariantSelectionEdit(SpecOperation):
+    layer: Sdf.Layer
+    prim_path: Sdf.Path
+    variant_set: str
+    old: object
+    new: object
+
+    def key(self):
+        return 'variant', self.layer.identifier, self.prim_path, self.variant_set
+
+    def _set(self, value) -> None:
+        spec = self.layer.GetPrimAtPath(self.prim_path)
+        if not spec:
+            return
+        if value is UNSET:
+            if self.variant_set in spec.variantSelections:
+                del spec.variantSelections[self.variant_set]
+        else:
+            spec.variantSelections[self.variant_set] = value
+
+    def apply(self):
+        self._set(self.new)
+
+    def revert(self):
+        self._set(self.old)
+
+
+@dataclass
+class SpecStateEdit(SpecOperation):
+    # Creating or removing a whole spec. States are copies kept in the journal's backup layer (None: no spec).
+    layer: Sdf.Layer
+    spec_path: Sdf.Path
+    backup_layer: Sdf.Layer
+    before: Optional[Sdf.Path]
+    after: Optional[Sdf.Path]
+
+    def _restore(self, state: Optional[Sdf.Path]) -> None:
+        _remove_spec(self.layer, self.spec_path)
+        if state is None:
+            return
+        owner_path = self.spec_path.GetParentPath() if self.spec_path.IsPrimPath() else self.spec_path.GetPrimPath()
+        if owner_path != Sdf.Path.absoluteRootPath:
+            Sdf.CreatePrimInLayer(self.layer, owner_path)
+        Sdf.CopySpec(self.backup_layer, state, self.layer, self.spec_path)
+
+    def apply(self):
+        self._restore(self.after)
+
+    def revert(self):
+        self._restore(self.before)
+
+
+@dataclass
+class LoadRulesEdit(SpecOperation):
+    # Payload loading is stage state rather than a layer edit, but undoing it belongs with the rest.
+    stages: Sequence[Usd.Stage]
+    old: Sequence[Usd.StageLoadRules]
+    new: Sequence[Usd.StageLoadRules]
+
+    def apply(self):
+        for stage, rules in zip(self.stages, self.new):
+            stage.SetLoadRules(rules)
+
+    def revert(self):
+        for stage, rules in zip(self.stages, self.old):
+            stage.SetLoadRules(rules)
+
+
+def _remove_spec(layer: Sdf.Layer, spec_path: Sdf.Path) -> bool:
+    spec = layer.GetObjectAtPath(spec_path)
+    if not spec:
+        return False
+    if spec_path.IsPropertyPath():
+        layer.GetPrimAtPath(spec_path.GetPrimPath()).RemoveProperty(spec)
+    else:
+        parent = layer.GetPrimAtPath(spec_path.GetParentPath()) or layer.pseudoRoot
+        parent.RemoveNameChild(spec)
+    return True
+
+
+@dataclass(eq=False)
+class Transaction:
+    label: str
+    coalesce_key: Optional[Hashable] = None
+    operations: List[SpecOperation] = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+    updated: float = field(default_factory=time.monotonic)
+    _by_key: Dict[Hashable, SpecOperation] = field(default_factory=dict, repr=False)
+    # (operation, its previous new value) for each merge in the open block, so a failed block can undo the merge.
+    _merged: List[Tuple[SpecOperation, object]] = field(default_factory=list, repr=False)
+
+    def add(self, operation: SpecOperation) -> None:
+        key = operation.key()
+        existing = self._by_key.get(key) if key is not None else None
+        if existing is not None:
+            self._merged.append((existing, existing.new))
+            existing.new = operation.new
+            return
+        if key is not None:
+            self._by_key[key] = operation
+        self.operations.append(operation)
+
+    def apply(self) -> None:
+        for operation in self.operations:
+            operation.apply()
+
+    def revert(self) -> None:
+        for operation in reversed(self.operations):
+            operation.revert()
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+
+class EditJournal:
+    # Undo/redo over recorded transactions. A transaction opened with the same coalesce_key as the last one, within
+    # coalesce_window seconds of its last edit, continues it instead of starting a new undo step. Every transaction
+    # is authored, reverted and re-applied inside one Sdf.ChangeBlock, so the stage recomposes once per step.
+    COALESCE_WINDOW = 0.5
+    MAX_TRANSACTIONS = 1000
+
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW,
+                 max_transactions: Optional[int] = MAX_TRANSACTIONS):
+        self.coalesce_window = coalesce_window
+        # None keeps every transaction; older ones are released from the history once it is longer.
+        self.max_transactions = max_transactions
+        self.undo_stack: "deque[Transaction]" = deque()
+        self.redo_stack: List[Transaction] = []
+        # Called with each new (not coalesced) transaction once it is committed.
+        self.listeners: List[Callable[[Transaction], None]] = []
+        # Called before undo, redo and replay author anything, e.g. to stop readers of the stage.
+        self.before_change: List[Callable[[], None]] = []
+        self.backup_layer = Sdf.Layer.CreateAnonymous('editJournalBackup')
+        self._backup_ids = itertools.count()
+        self._current: Optional[Transaction] = None
+
+    def set_max_transactions(self, max_transactions: Optional[int]) -> None:
+        # Lets a host keep the history as long as its own undo queue; shrinking drops the oldest transactions.
+        self.max_transactions = max_transactions
+        self._trim_undo_stack()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    @contextmanager
+    def transaction(self, label: str, coalesce_key: Optional[Hashable] = None):
+        if self._current is not None:
+            # Nested calls join the open transaction.
+            yield self._current
+            return
+
+        now = time.monotonic()
+        last = self.undo_stack[-1] if self.undo_stack else None
+        coalesced = (coalesce_key is not None and last is not None and not self.redo_stack
+                     and last.coalesce_key == coalesce_key and now - last.updated <= self.coalesce_window)
+        transaction = last if coalesced else Transaction(label, coalesce_key)
+        first_new = len(transaction.operations)
+
+        self._current = transaction
+        try:
+            with Sdf.ChangeBlock():
+                yield transaction
+        except Exception:
+            # Roll back what this block authored; a coalesced transaction keeps its earlier edits, including the
+            # values this block merged into them.
+            discarded = transaction.operations[first_new:]
+            discarded_ids = {id(operation) for operation in discarded}
+            with Sdf.ChangeBlock():
+                for operation in reversed(discarded):
+                    operation.revert()
+                for operation, previous in reversed(transaction._merged):
+                    if id(operation) not in discarded_ids:
+                        operation.new = previous
+                        operation.apply()
+            del transaction.operations[first_new:]
+            transaction._by_key = {op.key(): op for op in transaction.operations if op.key() is not None}
+            self._release_backups(discarded)
+            raise
+        finally:
+            transaction._merged.clear()
+            self._current = None
+
+        transaction.updated = time.monotonic()
+        if coalesced or not transaction.operations:
+            return
+        self._push_undo(transaction)
+        self._clear_redo_stack()
+        for listener in self.listeners:
+            listener(transaction)
+
+    def _release_backups(self, operations: Iterable[SpecOperation]) -> None:
+        # Removes the backup specs of operations that can no longer be undone or redone.
+        with Sdf.ChangeBlock():
+            for operation in operations:
+                if isinstance(operation, SpecStateEdit):
+                    for state in (operation.before, operation.after):
+                        if state is not None:
+                            _remove_spec(self.backup_layer, state.GetPrimPath())
+
+    def _trim_undo_stack(self) -> None:
+        while self.max_transactions is not None and len(self.undo_stack) > self.max_transactions:
+            self._release_backups(self.undo_stack.popleft().operations)
+
+    def _push_undo(self, transaction: Transaction) -> None:
+        self.undo_stack.append(transaction)
+        self._trim_undo_stack()
+
+    def _clear_redo_stack(self) -> None:
+        for transaction in self.redo_stack:
+            self._release_backups(transaction.operations)
+        self.redo_stack.clear()
+
+    def _notify_before_change(self) -> None:
+        for callback in self.before_change:
+            callback()
+
+    def _require_transaction(self) -> Transaction:
+        if self._current is None:
+            raise RuntimeError("Journal edits must be made inside EditJournal.transaction()")
+        return self._current
+
+    def _record(self, operation: SpecOperation) -> None:
+        operation.apply()
+        self._require_transaction().add(operation)
+
+    def _backup(self, layer: Sdf.Layer, spec_path: Sdf.Path) -> Sdf.Path:
+        backup_path = Sdf.Path(f"/Backup_{next(self._backup_ids)}")
+        if spec_path.IsPropertyPath():
+            Sdf.CreatePrimInLayer(self.backup_layer, backup_path)
+            backup_path = backup_path.AppendProperty(spec_path.name)
+        Sdf.CopySpec(layer, spec_path, self.backup_layer, backup_path)
+        return backup_path
+
+    # Sdf-level edits. Each one authors immediately and records how to revert it.
+
+    def ensure_prim_spec(self, layer: Sdf.Layer, prim_path: Sdf.Path) -> Sdf.PrimSpec:
+        self._require_transaction()
+        spec = layer.GetPrimAtPath(prim_path)
+        if spec:
+            return spec
+        # The top-most missing ancestor is recorded; removing it also removes the overs created below it.
+        created_root = prim_path
+        while (created_root.GetParentPath() != Sdf.Path.absoluteRootPath
+               and not layer.GetPrimAtPath(created_root.GetParentPath())):
+            created_root = created_root.GetParentPath()
+        spec = Sdf.CreatePrimInLayer(layer, prim_path)
+        self._require_transaction().add(
+            SpecStateEdit(layer, created_root, self.backup_layer, None, self._backup(layer, created_root)))
+        return spec
+
+    def set_info(self, layer: Sdf.Layer, spec_path: Sdf.Path, info_key: str, value) -> None:
+        spec = layer.GetObjectAtPath(spec_path)
+        if info_key == 'default':
+            old = spec.default if spec.HasDefaultValue() else UNSET
+        else:
+            old = spec.GetInfo(info_key) if spec.HasInfo(info_key) else UNSET
+        self._record(InfoEdit(layer, spec_path, info_key, old, value))
+
+    def set_time_sample(self, layer: Sdf.Layer, spec_path: Sdf.Path, time_code: float, value) -> None:
+        old = layer.QueryTimeSample(spec_path, time_code)
+        self._record(TimeSampleEdit(layer, spec_path, time_code, UNSET if old is None else old, value))
+
+    def erase_time_sample(self, layer: Sdf.Layer, spec_path: Sdf.Path, time_code: float) -> None:
+        self.set_time_sample(layer, spec_path, time_code, UNSET)
+
+    def set_variant_selection(self, layer: Sdf.Layer, prim_path: Sdf.Path, variant_set: str, variant) -> None:
+        spec = self.ensure_prim_spec(layer, prim_path)
+        old = spec.variantSelections[variant_set] if variant_set in spec.variantSelections else UNSET
+        self._record(VariantSelectionEdit(layer, prim_path, variant_set, old, variant))
+
+    def ensure_attribute_spec(self, layer: Sdf.Layer, attr_path: Sdf.Path, type_name: Sdf.ValueTypeName,
+                              variability=Sdf.VariabilityVarying, custom: bool = False) -> Sdf.AttributeSpec:
+        attr_spec = layer.GetAttributeAtPath(attr_path)
+        if attr_spec:
+            return attr_spec
+        prim_spec = self.ensure_prim_spec(layer, attr_path.GetPrimPath())
+        attr_spec = Sdf.AttributeSpec(prim_spec, attr_path.name, type_name, variability, custom)
+        self._require_transaction().add(
+            SpecStateEdit(layer, attr_path, self.backup_layer, None, self._backup(layer, attr_path)))
+        return attr_spec
+
+    def copy_spec(self, source_layer: Sdf.Layer, spec_path: Sdf.Path, layer: Sdf.Layer) -> None:
+        # The spec must not exist in layer yet; remove_spec it first to replace it.
+        owner_path = spec_path.GetPrimPath() if spec_path.IsPropertyPath() else spec_path.GetParentPath()
+        if owner_path != Sdf.Path.absoluteRootPath:
+            self.ensure_prim_spec(layer, owner_path)
+        Sdf.CopySpec(source_layer, spec_path, layer, spec_path)
+        self._require_transaction().add(
+            SpecStateEdit(layer, spec_path, self.backup_layer, None, self._backup(layer, spec_path)))
+
+    @contextmanager
+    def load_rules_change(self, label: str, stages: Sequence[Usd.Stage]):
+        # Records whatever the block does to the stages' load rules as one operation.
+        with self.transaction(label):
+            old = [stage.GetLoadRules() for stage in stages]
+            yield
+            new = [stage.GetLoadRules() for stage in stages]
+            if new != old:
+                self._require_transaction().add(LoadRulesEdit(list(stages), old, new))
+
+    def remove_spec(self, layer: Sdf.Layer, spec_path: Sdf.Path) -> bool:
+        if not layer.GetObjectAtPath(spec_path):
+            return False
+        self._record(SpecStateEdit(layer, spec_path, self.backup_layer, self._backup(layer, spec_path), None))
+        return True
+
+    # Stage-level edits on the stage's edit target, mirroring the editor's operations.
+
+    def set_prims_kind(self, stage: Usd.Stage, paths: Iterable[Sdf.Path], kind: str) -> int:
+        paths = list(paths)
+        layer = stage.GetEditTarget().GetLayer()
+        with self.transaction("Set Kind", ('kind', tuple(paths))):
+            for path in paths:
+                spec_path = stage.GetEditTarget().MapToSpecPath(path)
+                self.ensure_prim_spec(layer, spec_path)
+                self.set_info(layer, spec_path, 'kind', kind or UNSET)
+        return len(paths)
+
+    def set_prims_purpose(self, stage: Usd.Stage, paths: Iterable[Sdf.Path], purpose: PrimPurpose) -> int:
+        imageable_paths = [path for path in paths if stage.GetPrimAtPath(path).IsA(UsdGeom.Imageable)]
+        layer = stage.GetEditTarget().GetLayer()
+        with self.transaction("Set Purpose", ('purpose', tuple(imageable_paths))):
+            for path in imageable_paths:
+                attr_path = stage.GetEditTarget().MapToSpecPath(path).AppendProperty(UsdGeom.Tokens.purpose)
+                self.ensure_attribute_spec(layer, attr_path, Sdf.ValueTypeNames.Token, Sdf.VariabilityUniform)
+                self.set_info(layer, attr_path, 'default', purpose.value)
+        return len(imageable_paths)
+
+    def set_variant_selections(self, stage: Usd.Stage, paths: Iterable[Sdf.Path], variant_set: str,
+                               variant: str) -> int:
+        paths = list(paths)
+        layer = stage.GetEditTarget().GetLayer()
+        with self.transaction("Set Variant", ('variant', tuple(paths), variant_set)):
+            for path in paths:
+                self.set_variant_selection(layer, stage.GetEditTarget().MapToSpecPath(path), variant_set, variant)
+        return len(paths)
+
+    def set_attribute_value(self, attr: Usd.Attribute, value, time_code: Optional[float] = None) -> None:
+        # Successive edits of the same attribute (and time) coalesce into one undo step. time_code is in stage time
+        # and is mapped through the edit target's layer offset, as Usd.Attribute.Set does.
+        stage = attr.GetStage()
+        edit_target = stage.GetEditTarget()
+        layer = edit_target.GetLayer()
+        attr_path = edit_target.MapToSpecPath(attr.GetPath())
+        with self.transaction(f"Set {attr.GetName()}", ('value', attr_path, time_code)):
+            self.ensure_attribute_spec(layer, attr_path, attr.GetTypeName(), attr.GetVariability(), attr.IsCustom())
+            if time_code is None:
+                self.set_info(layer, attr_path, 'default', value)
+            else:
+                layer_time = edit_target.GetMapFunction().timeOffset.GetInverse() * time_code
+                self.set_time_sample(layer, attr_path, layer_time, value)
+
+    def retime_samples(self, stage: Usd.Stage, attr_paths: Iterable[Sdf.Path], start: float, end: float,
+                       scale: float = 1.0, offset: float = 0.0) -> int:
+        # Same mapping as usdUtils.retime_samples, on the edit target's samples.
+        count = 0
+        with self.transaction("Retime Samples"):
+            for attr_path in attr_paths:
+                layer, spec_path, layer_to_stage, times = edit_target_sample_times(stage, attr_path, start, end)
+                samples = [(time, layer.QueryTimeSample(spec_path, time)) for time in times]
+                for time, _ in samples:
+                    self.erase_time_sample(layer, spec_path, time)
+                for time, value in samples:
+                    new_time = retimed_layer_time(layer_to_stage, time, start, scale, offset)
+                    self.set_time_sample(layer, spec_path, new_time, value)
+                count += len(samples)
+        return count
+
+    def delete_samples_in_range(self, stage: Usd.Stage, attr_paths: Iterable[Sdf.Path], start: float,
+                                end: float) -> int:
+        count = 0
+        with self.transaction("Delete Samples"):
+            for attr_path in attr_paths:
+                layer, spec_path, _, times = edit_target_sample_times(stage, attr_path, start, end)
+                for time in times:
+                    self.erase_time_sample(layer, spec_path, time)
+                count += len(times)
+        return count
+
+    def apply_layer_diff(self, layer: Sdf.Layer, source_layer: Sdf.Layer, diff: LayerDiff) -> None:
+        # usdUtils.apply_layer_diff, with every spec removal, copy and field edit recorded.
+        with self.transaction("Update Stage From Text"):
+            for path in diff.removed + diff.replaced:
+                self.remove_spec(layer, path)
+            for path in diff.replaced + diff.added:
+                self.copy_spec(source_layer, path, layer)
+            for path, key, value in diff.field_changes:
+                self.set_info(layer, path, key, value)
+            for path, key in diff.field_clears:
+                self.set_info(layer, path, key, UNSET)
+
+    def update_stage_from_text(self, stage: Usd.Stage, text: str,
+                               root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> LayerDiff:
+        layer = stage.GetRootLayer()
+        edited_layer = parse_layer_text(text)
+        diff = compute_layer_diff(layer, edited_layer, root_path)
+        if not diff.is_empty():
+            self.apply_layer_diff(layer, edited_layer, diff)
+        return diff
+
+    def add_attribute(self, prim: Usd.Prim, name: str, type_name: Sdf.ValueTypeName, value,
+                      custom: bool = True) -> None:
+        stage = prim.GetStage()
+        layer = stage.GetEditTarget().GetLayer()
+        attr_path = stage.GetEditTarget().MapToSpecPath(prim.GetPath()).AppendProperty(name)
+        with self.transaction(f"Add {name}"):
+            self.ensure_attribute_spec(layer, attr_path, type_name, custom=custom)
+            self.set_info(layer, attr_path, 'default', value)
+
+    def remove_property(self, prim: Usd.Prim, name: str) -> bool:
+        # Primvars take their indices attribute with them, as UsdGeom.PrimvarsAPI.RemovePrimvar does.
+        stage = prim.GetStage()
+        layer = stage.GetEditTarget().GetLayer()
+        prim_spec_path = stage.GetEditTarget().MapToSpecPath(prim.GetPath())
+        names = [name]
+        if UsdGeom.Primvar.IsPrimvarName(name):
+            names.append(f"{name}:indices")
+        with self.transaction(f"Remove {name}"):
+            removed = [self.remove_spec(layer, prim_spec_path.AppendProperty(n)) for n in names]
+        return any(removed)
+
+    # Undo, redo and replay.
+
+    @timed(count=len)
+    def undo(self, transaction: Optional[Transaction] = None) -> Optional[Transaction]:
+        if transaction is None:
+            if not self.undo_stack:
+                return None
+            transaction = self.undo_stack.pop()
+        elif transaction in self.undo_stack:
+            self.undo_stack.remove(transaction)
+        else:
+            # Already dropped from the history (or handled by the journal directly).
+            return None
+        self._notify_before_change()
+        with Sdf.ChangeBlock():
+            transaction.revert()
+        self.redo_stack.append(transaction)
+        return transaction
+
+    @timed(count=len)
+    def redo(self, transaction: Optional[Transaction] = None) -> Optional[Transaction]:
+        if transaction is None:
+            if not self.redo_stack:
+                return None
+            transaction = self.redo_stack.pop()
+        elif transaction in self.redo_stack:
+            self.redo_stack.remove(transaction)
+        else:
+            # Already dropped from the history (or handled by the journal directly).
+            return None
+        self._notify_before_change()
+        with Sdf.ChangeBlock():
+            transaction.apply()
+        self._push_undo(transaction)
+        return transaction
+
+    @timed(count=int)
+    def undo_all(self) -> int:
+        count = len(self.undo_stack)
+        self._notify_before_change()
+        with Sdf.ChangeBlock():
+            while self.undo_stack:
+                transaction = self.undo_stack.pop()
+                transaction.revert()
+                self.redo_stack.append(transaction)
+        return count
+
+    @timed(count=int)
+    def replay(self, transactions: Optional[Iterable[Transaction]] = None) -> int:
+        # Re-applies transactions (by default everything undone, oldest first) in a single change block.
+        replay_history = transactions is None
+        if replay_history:
+            transactions = list(reversed(self.redo_stack))
+            self.redo_stack.clear()
+        count = 0
+        self._notify_before_change()
+        with Sdf.ChangeBlock():
+            for transaction in transactions:
+                transaction.apply()
+                count += 1
+        if replay_history:
+            # Trimmed only once everything is applied, as trimming releases the oldest transactions' backups.
+            self.undo_stack.extend(transactions)
+            self._trim_undo_stack()
+        return count
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.backup_layer.Clear()
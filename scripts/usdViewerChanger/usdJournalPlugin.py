@@ -0,0 +1,58 @@
+import sys
+
+import maya.api.OpenMaya as om
+
+# Maya plugin with one undoable command per journal transaction. The edit is already authored when the command runs,
+# so doIt only picks up the transaction usdMayaBridge.register_undo_chunk handed over; Maya's undo and redo then drive
+# the journal.
+
+# Must match usdMayaBridge.JOURNAL_COMMAND and usdMayaBridge.JOURNAL_BRIDGE_MODULE.
+COMMAND_NAME = 'usdViewerChangerJournal'
+BRIDGE_MODULE = 'usdViewerChanger_journalBridge'
+
+
+def maya_useNewAPI():
+    pass
+
+
+def _bridge():
+    # Registered by the bridge itself, so this talks to the module instance the editor uses even when the package
+    # was imported under another name (e.g. scripts.usdViewerChanger).
+    return sys.modules.get(BRIDGE_MODULE)
+
+
+class JournalCommand(om.MPxCommand):
+    def __init__(self):
+        super().__init__()
+        self.journal = None
+        self.transaction = None
+
+    @staticmethod
+    def creator():
+        return JournalCommand()
+
+    def isUndoable(self):
+        return self.transaction is not None
+
+    def doIt(self, args):
+        bridge = _bridge()
+        pending = bridge.take_pending_undo_chunk() if bridge else None
+        if pending is not None:
+            self.journal, self.transaction = pending
+            self.setResult(self.transaction.label)
+
+    def undoIt(self):
+        if self.journal.undo(self.transaction) is None:
+            om.MGlobal.displayWarning(f"{self.transaction.label} is no longer in the USD edit journal; not undone.")
+
+    def redoIt(self):
+        if self.journal.redo(self.transaction) is None:
+            om.MGlobal.displayWarning(f"{self.transaction.label} is no longer in the USD edit journal; not redone.")
+
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin).registerCommand(COMMAND_NAME, JournalCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
@@ -0,0 +1,73 @@
+import os
+import sys
+from typing import Callable, Optional
+
+from pxr import Usd
+
+# Maya modules are imported on first use, so the editor and everything it imports load without Maya.
+
+JOURNAL_PLUGIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'usdJournalPlugin.py')
+# Both must match the names in usdJournalPlugin.py, which Maya loads from its file path and so cannot import this
+# module by package name.
+JOURNAL_COMMAND = 'usdViewerChangerJournal'
+JOURNAL_BRIDGE_MODULE = 'usdViewerChanger_journalBridge'
+
+_pending_undo_chunk = None
+
+
+def _cmds():
+    import maya.cmds as cmds
+    return cmds
+
+
+def selected_proxy_shape() -> Optional[str]:
+    selected = _cmds().ls(sl=1, ufe=1)
+    if not selected:
+        return None
+    return selected[0].split(',')[0]
+
+
+def get_stage(proxy_shape: str) -> Usd.Stage:
+    import mayaUsd.ufe
+    return mayaUsd.ufe.getStage(proxy_shape)
+
+
+def warning(message: str) -> None:
+    _cmds().warning(message)
+
+
+def watch_selection(callback: Callable[[], None]) -> int:
+    return _cmds().scriptJob(event=['SelectionChanged', callback])
+
+
+def kill_job(job: int) -> None:
+    _cmds().scriptJob(kill=job, force=True)
+
+
+def register_undo_chunk(journal, transaction) -> None:
+    # Puts an already authored journal transaction on Maya's undo queue as one command.
+    global _pending_undo_chunk
+    cmds = _cmds()
+    # The plugin finds this module here, whichever package name the editor was imported under.
+    sys.modules[JOURNAL_BRIDGE_MODULE] = sys.modules[__name__]
+    if not cmds.pluginInfo(JOURNAL_PLUGIN, query=True, loaded=True):
+        cmds.loadPlugin(JOURNAL_PLUGIN, quiet=True)
+    _pending_undo_chunk = (journal, transaction)
+    try:
+        getattr(cmds, JOURNAL_COMMAND)()
+    finally:
+        _pending_undo_chunk = None
+
+
+def take_pending_undo_chunk():
+    global _pending_undo_chunk
+    pending, _pending_undo_chunk = _pending_undo_chunk, None
+    return pending
+
+
+def undo_queue_length() -> Optional[int]:
+    # Number of undo steps Maya keeps, or None when the queue is unlimited.
+    cmds = _cmds()
+    if cmds.undoInfo(query=True, infinity=True):
+        return None
+    return cmds.undoInfo(query=True, length=True)
@@ -1,13 +1,20 @@
+import os
+import threading
+import time
+
 from PySide2 import QtWidgets, QtCore, QtGui
-from .usdTreeModel import UsdTreeModel
+from .usdTreeModel import InstanceListModel, PrimFilterProxyModel, UsdTreeModel
+from .usdStageSessions import StageSession, StageSessionCache
+from .usdTraversalWorker import PrimTraversalThread, TraversalCacheValidator
+from .usdTraversalCache import cache_file_path, layer_stamps, load_traversal_cache, save_traversal_cache
+from .usdAttributeModel import UsdAttributeModel
+from .usdEditJournal import EditJournal
+from . import usdMayaBridge
+from .usdProfiling import PROFILER, measure
 from .usdUtils import (
-    PrimPurpose, set_prim_kind, set_prim_purpose, get_stage_as_text,
-    update_stage_from_text, get_variant_sets, set_variant_selection,
-    has_payload, load_payload, unload_payload
+    PrimPurpose, PrimSearchIndex, StageScope, get_variant_sets, has_payload
 )
 from pxr import Usd, Sdf, UsdGeom, Gf
-import maya.cmds as cmds
-import mayaUsd
 
 
 class ColorCodedItemDelegate(QtWidgets.QStyledItemDelegate):
@@ -22,9 +29,40 @@ class ColorCodedItemDelegate(QtWidgets.QStyledItemDelegate):
 
 
 class UsdPrimEditor(QtWidgets.QWidget):
+    MAX_FILTER_RESULTS = 2000
+
     def __init__(self, parent=None):
         super(UsdPrimEditor, self).__init__(parent)
         self.stage = None
+        self.sessions = StageSessionCache()
+        self.session = None
+        self.scope = StageScope()
+        self.tree_model = None
+        self.search_index = None
+        self.proxy_shape = None
+        self.payload_manager = None
+        self.traversal_thread = None
+        self.traversal_started = 0.0
+        # Records and layer stamps collected for the on-disk traversal cache while a traversal runs.
+        self.traversal_records = None
+        self.traversal_stamps = None
+        self.traversal_cache_path = None
+        self.cache_validator = None
+        self.resume_traversal = False
+        self.selection_job = None
+        # Editor edits are recorded so they can be undone; in Maya each transaction is one undo step.
+        self.journal = EditJournal()
+        self.journal.listeners.append(self.register_undo_chunk)
+        self.journal.before_change.append(self.prepare_stage_edit)
+        # Built the first time they are shown.
+        self.stage_text_panel = None
+        self.time_sample_model = None
+        self.profiling_panel = None
+        self.composition_panel = None
+        self.variant_explorer_panel = None
+        self.instance_model = None
+        # Expanding everything forces the lazy tree model to visit the whole stage.
+        self.expand_all_on_refresh = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -34,15 +72,22 @@ class UsdPrimEditor(QtWidgets.QWidget):
         treeLayout = QtWidgets.QVBoxLayout()
 
         self.setup_tree_view()
+        self.setup_filter_bar(treeLayout)
+        self.setup_scope_controls(treeLayout)
+        self.setup_stats_controls(treeLayout)
+        self.setup_traversal_progress(treeLayout)
         self.setup_property_editors(treeLayout)
         self.setup_buttons(treeLayout)
         self.setup_stage_text_editor(treeLayout)
         self.setup_variant_sets(treeLayout)
         self.setup_payload_controls(treeLayout)
+        self.setup_profiling_panel(treeLayout)
 
         propertiesLayout = QtWidgets.QVBoxLayout()
         self.setup_attr_primvar_editor(propertiesLayout)
         self.setup_time_samples_editor(propertiesLayout)
+        self.setup_composition_panel(propertiesLayout)
+        self.setup_instances_panel(propertiesLayout)
 
         mainLayout = QtWidgets.QHBoxLayout(self)
         mainLayout.addLayout(treeLayout)
@@ -53,8 +98,134 @@ class UsdPrimEditor(QtWidgets.QWidget):
     def setup_tree_view(self):
         self.tree_view = QtWidgets.QTreeView()
         self.tree_view.setAlternatingRowColors(True)
-        self.tree_view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.tree_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.tree_view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.tree_view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.filter_model = PrimFilterProxyModel(self)
+        self.filter_model.setSortRole(UsdTreeModel.SORT_ROLE)
+        self.tree_view.setModel(self.filter_model)
+        # No sort column until a header is clicked, so rows keep stage order.
+        self.tree_view.header().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.tree_view.setSortingEnabled(True)
+
+    def setup_filter_bar(self, layout):
+        filter_layout = QtWidgets.QHBoxLayout()
+        self.filter_edit = QtWidgets.QLineEdit()
+        self.filter_edit.setPlaceholderText("Search, e.g. type:Mesh kind:component name:*door*")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_status_label = QtWidgets.QLabel()
+        filter_layout.addWidget(self.filter_edit)
+        filter_layout.addWidget(self.filter_status_label)
+        layout.addLayout(filter_layout)
+
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(200)
+
+    def setup_scope_controls(self, layout):
+        scope_layout = QtWidgets.QHBoxLayout()
+        self.scope_mask_edit = QtWidgets.QLineEdit()
+        self.scope_mask_edit.setPlaceholderText("Scope to paths, e.g. /World/Set_A /World/Set_B")
+        self.scope_from_selection_button = QtWidgets.QPushButton("Use Selection")
+        self.apply_scope_button = QtWidgets.QPushButton("Apply Scope")
+        scope_layout.addWidget(self.scope_mask_edit)
+        scope_layout.addWidget(self.scope_from_selection_button)
+        scope_layout.addWidget(self.apply_scope_button)
+        layout.addLayout(scope_layout)
+
+        predicate_layout = QtWidgets.QHBoxLayout()
+        self.include_inactive_check = QtWidgets.QCheckBox("Inactive")
+        self.instance_proxies_check = QtWidgets.QCheckBox("Instance Proxies")
+        self.loaded_only_check = QtWidgets.QCheckBox("Loaded Only")
+        self.defined_only_check = QtWidgets.QCheckBox("Defined Only")
+        self.instancing_check = QtWidgets.QCheckBox("Group Instances")
+        self.instancing_check.setToolTip("List each prototype once and expand instances on demand.")
+        for check in (self.include_inactive_check, self.instance_proxies_check, self.loaded_only_check,
+                      self.defined_only_check, self.instancing_check):
+            predicate_layout.addWidget(check)
+        predicate_layout.addStretch()
+        layout.addLayout(predicate_layout)
+
+    def scope_from_controls(self):
+        return StageScope(StageScope.parse_mask(self.scope_mask_edit.text()),
+                          self.include_inactive_check.isChecked(), self.instance_proxies_check.isChecked(),
+                          self.loaded_only_check.isChecked(), self.defined_only_check.isChecked(),
+                          self.instancing_check.isChecked())
+
+    def use_selection_as_scope(self):
+        self.scope_mask_edit.setText(" ".join(str(path) for path in self.get_selected_paths()))
+
+    def apply_scope(self):
+        scope = self.scope_from_controls()
+        if scope == self.scope:
+            return
+        self.scope = scope
+        if self.session:
+            self.activate_stage(self.session.source_stage)
+
+    def setup_stats_controls(self, layout):
+        stats_layout = QtWidgets.QHBoxLayout()
+        self.stats_toggle = QtWidgets.QPushButton("Show Geometry Stats")
+        self.stats_toggle.setCheckable(True)
+        self.stats_time_spin = QtWidgets.QDoubleSpinBox()
+        self.stats_time_spin.setRange(-1e6, 1e6)
+        self.stats_time_spin.setValue(-1e6)
+        self.stats_time_spin.setSpecialValueText("Default Time")
+        stats_layout.addWidget(self.stats_toggle)
+        stats_layout.addWidget(self.stats_time_spin)
+        stats_layout.addStretch()
+        layout.addLayout(stats_layout)
+
+        # Edits arrive in bursts; recompute once they settle.
+        self.stats_timer = QtCore.QTimer(self)
+        self.stats_timer.setSingleShot(True)
+        self.stats_timer.setInterval(300)
+
+    def stats_time_code(self):
+        if self.stats_time_spin.value() == self.stats_time_spin.minimum():
+            return Usd.TimeCode.Default()
+        return Usd.TimeCode(self.stats_time_spin.value())
+
+    def update_stats_columns(self):
+        visible = self.stats_toggle.isChecked()
+        for column in range(UsdTreeModel.FIRST_STATS_COLUMN, len(UsdTreeModel.HEADERS)):
+            self.tree_view.setColumnHidden(column, not visible)
+        self.stats_time_spin.setEnabled(visible)
+
+    def toggle_geometry_stats(self, visible):
+        self.update_stats_columns()
+        if visible:
+            self.compute_geometry_stats()
+
+    def compute_geometry_stats(self):
+        if not self.session or not self.stats_toggle.isChecked():
+            return
+        with measure('editor.compute_geometry_stats') as record:
+            stats = self.session.geometry_stats
+            stats.set_time(self.stats_time_code())
+            try:
+                count = stats.compute()
+            except Exception as e:
+                print(f"Error computing geometry stats: {str(e)}")
+                return
+            if record:
+                record.count = count
+            self.tree_model.stats_changed()
+
+    def setup_traversal_progress(self, layout):
+        self.traversal_widget = QtWidgets.QWidget()
+        progress_layout = QtWidgets.QHBoxLayout(self.traversal_widget)
+        progress_layout.setContentsMargins(0, 0, 0, 0)
+        self.traversal_progress = QtWidgets.QProgressBar()
+        self.traversal_progress.setRange(0, 0)
+        self.traversal_progress.setTextVisible(False)
+        self.traversal_label = QtWidgets.QLabel()
+        self.cancel_traversal_button = QtWidgets.QPushButton("Cancel")
+        progress_layout.addWidget(self.traversal_label)
+        progress_layout.addWidget(self.traversal_progress)
+        progress_layout.addWidget(self.cancel_traversal_button)
+        self.traversal_widget.setVisible(False)
+        layout.addWidget(self.traversal_widget)
 
     def setup_property_editors(self, layout):
         property_layout = QtWidgets.QHBoxLayout()
@@ -76,25 +247,93 @@ class UsdPrimEditor(QtWidgets.QWidget):
         button_layout = QtWidgets.QHBoxLayout()
         self.refresh_button = QtWidgets.QPushButton("Refresh")
         self.apply_button = QtWidgets.QPushButton("Apply Changes")
+        self.edit_target_combo = QtWidgets.QComboBox()
+        self.edit_target_combo.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToContents)
+        self.traversal_cache_check = QtWidgets.QCheckBox("Cache Traversal")
+        self.traversal_cache_check.setToolTip("Keep traversals on disk and reuse them while the layers are unchanged.")
+        self.traversal_cache_check.setChecked(bool(os.environ.get('USD_VIEWER_CHANGER_TRAVERSAL_CACHE')))
         button_layout.addWidget(self.refresh_button)
         button_layout.addWidget(self.apply_button)
+        button_layout.addWidget(self.traversal_cache_check)
         button_layout.addStretch()
+        button_layout.addWidget(QtWidgets.QLabel("Edit Target:"))
+        button_layout.addWidget(self.edit_target_combo)
         layout.addLayout(button_layout)
 
+    def update_edit_targets(self):
+        self.edit_target_combo.clear()
+        if not self.stage:
+            return
+        current = self.stage.GetEditTarget().GetLayer()
+        for layer in self.stage.GetLayerStack(includeSessionLayers=True):
+            self.edit_target_combo.addItem(layer.GetDisplayName(), layer.identifier)
+            self.edit_target_combo.setItemData(self.edit_target_combo.count() - 1, layer.identifier,
+                                               QtCore.Qt.ToolTipRole)
+            if layer == current:
+                self.edit_target_combo.setCurrentIndex(self.edit_target_combo.count() - 1)
+
+    def selected_edit_target(self):
+        identifier = self.edit_target_combo.currentData()
+        layer = Sdf.Layer.Find(identifier) if identifier else None
+        # Carries the layer's offset, so time-sampled edits on an offset sublayer land at the intended times.
+        return self.stage.GetEditTargetForLocalLayer(layer) if layer else self.stage.GetEditTarget()
+
+    def edit_context(self):
+        # Edits go to the layer picked in the editor, without changing the stage's own edit target.
+        return Usd.EditContext(self.stage, self.selected_edit_target())
+
     def setup_stage_text_editor(self, layout):
-        self.stage_text_edit = QtWidgets.QPlainTextEdit()
-        self.stage_text_edit.setReadOnly(True)
-        self.update_stage_button = QtWidgets.QPushButton("Update Stage")
-        layout.addWidget(self.stage_text_edit)
-        layout.addWidget(self.update_stage_button)
+        self.stage_text_toggle = QtWidgets.QPushButton("Show Stage Text")
+        self.stage_text_toggle.setCheckable(True)
+        self.stage_text_layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.stage_text_toggle)
+        layout.addLayout(self.stage_text_layout)
+
+    def build_stage_text_panel(self):
+        from .usdStageTextPanel import StageTextPanel
+        self.stage_text_panel = StageTextPanel()
+        self.stage_text_panel.setVisible(False)
+        self.stage_text_panel.update_stage_button.clicked.connect(self.update_stage_from_text)
+        self.stage_text_layout.addWidget(self.stage_text_panel)
+        self.stage_text_panel.set_stage(self.stage, self.scope.root_path())
+        prim = self.get_selected_prim()
+        self.stage_text_panel.set_prim_path(prim.GetPath() if prim else None)
+
+    def toggle_stage_text_panel(self, visible):
+        if visible and not self.stage_text_panel:
+            self.build_stage_text_panel()
+        if self.stage_text_panel:
+            self.stage_text_panel.setVisible(visible)
 
     def setup_variant_sets(self, layout):
         self.variant_set_layout = QtWidgets.QVBoxLayout()
         self.variant_set_layout.addWidget(QtWidgets.QLabel("Variant Sets:"))
+        self.variant_combos = {}
+        self.variant_rows_layout = QtWidgets.QVBoxLayout()
+        self.variant_set_layout.addLayout(self.variant_rows_layout)
+        self.variant_explorer_toggle = QtWidgets.QPushButton("Explore Variants")
+        self.variant_explorer_toggle.setCheckable(True)
+        self.variant_set_layout.addWidget(self.variant_explorer_toggle)
+        self.variant_explorer_layout = QtWidgets.QVBoxLayout()
+        self.variant_set_layout.addLayout(self.variant_explorer_layout)
         self.variant_set_widget = QtWidgets.QWidget()
         self.variant_set_widget.setLayout(self.variant_set_layout)
         layout.addWidget(self.variant_set_widget)
 
+    def toggle_variant_explorer(self, visible):
+        if visible and not self.variant_explorer_panel:
+            from .usdVariantExplorer import VariantExplorerPanel
+            self.variant_explorer_panel = VariantExplorerPanel()
+            self.variant_explorer_panel.variantChosen.connect(
+                lambda variant_set, variant: self.set_variant(self.get_selected_prim(), variant_set, variant))
+            self.variant_explorer_layout.addWidget(self.variant_explorer_panel)
+            if self.session:
+                self.variant_explorer_panel.set_explorer(self.session.variant_explorer)
+        if self.variant_explorer_panel:
+            self.variant_explorer_panel.setVisible(visible)
+            if visible:
+                self.variant_explorer_panel.set_prim(self.get_selected_prim())
+
     def setup_payload_controls(self, layout):
         payload_layout = QtWidgets.QHBoxLayout()
         self.load_payload_button = QtWidgets.QPushButton("Load")
@@ -102,11 +341,53 @@ class UsdPrimEditor(QtWidgets.QWidget):
         payload_layout.addWidget(QtWidgets.QLabel("Payload:"))
         payload_layout.addWidget(self.load_payload_button)
         payload_layout.addWidget(self.unload_payload_button)
+        payload_layout.addStretch()
+        payload_layout.addWidget(QtWidgets.QLabel("Max Loaded:"))
+        self.max_loaded_spin = QtWidgets.QSpinBox()
+        self.max_loaded_spin.setRange(0, 100000)
+        self.max_loaded_spin.setSpecialValueText("Unlimited")
+        payload_layout.addWidget(self.max_loaded_spin)
         layout.addLayout(payload_layout)
 
+        policy_layout = QtWidgets.QHBoxLayout()
+        self.payload_pattern_edit = QtWidgets.QLineEdit()
+        self.payload_pattern_edit.setPlaceholderText("Path pattern, e.g. /World/*/Car*")
+        self.payload_kinds_edit = QtWidgets.QLineEdit()
+        self.payload_kinds_edit.setPlaceholderText("Kinds, e.g. component")
+        self.load_matching_button = QtWidgets.QPushButton("Load Matching")
+        self.payload_depth_spin = QtWidgets.QSpinBox()
+        self.payload_depth_spin.setRange(1, 64)
+        self.payload_depth_spin.setValue(2)
+        self.load_to_depth_button = QtWidgets.QPushButton("Load to Depth")
+        self.payload_report_label = QtWidgets.QLabel()
+        policy_layout.addWidget(self.payload_pattern_edit)
+        policy_layout.addWidget(self.payload_kinds_edit)
+        policy_layout.addWidget(self.load_matching_button)
+        policy_layout.addWidget(self.payload_depth_spin)
+        policy_layout.addWidget(self.load_to_depth_button)
+        policy_layout.addWidget(self.payload_report_label)
+        layout.addLayout(policy_layout)
+
+    def setup_profiling_panel(self, layout):
+        self.profiling_toggle = QtWidgets.QPushButton("Show Profiler")
+        self.profiling_toggle.setCheckable(True)
+        self.profiling_layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.profiling_toggle)
+        layout.addLayout(self.profiling_layout)
+
+    def toggle_profiling_panel(self, visible):
+        if visible and not self.profiling_panel:
+            from .usdProfilingPanel import ProfilingPanel
+            self.profiling_panel = ProfilingPanel()
+            self.profiling_layout.addWidget(self.profiling_panel)
+        if self.profiling_panel:
+            self.profiling_panel.setVisible(visible)
+
     def setup_attr_primvar_editor(self, layout):
-        self.attr_primvar_tree = QtWidgets.QTreeWidget()
-        self.attr_primvar_tree.setHeaderLabels(["Name", "Value"])
+        self.attr_model = UsdAttributeModel(self)
+        self.attr_primvar_tree = QtWidgets.QTreeView()
+        self.attr_primvar_tree.setModel(self.attr_model)
+        self.attr_primvar_tree.setUniformRowHeights(True)
         self.attr_primvar_tree.setItemDelegate(ColorCodedItemDelegate())
 
         attr_primvar_layout = QtWidgets.QVBoxLayout()
@@ -117,87 +398,268 @@ class UsdPrimEditor(QtWidgets.QWidget):
         self.add_attr_button = QtWidgets.QPushButton("Add Attribute")
         self.add_primvar_button = QtWidgets.QPushButton("Add Primvar")
         self.edit_button = QtWidgets.QPushButton("Edit")
+        self.inspect_array_button = QtWidgets.QPushButton("Inspect Array")
         self.remove_button = QtWidgets.QPushButton("Remove")
         button_layout.addWidget(self.add_attr_button)
         button_layout.addWidget(self.add_primvar_button)
         button_layout.addWidget(self.edit_button)
+        button_layout.addWidget(self.inspect_array_button)
         button_layout.addWidget(self.remove_button)
 
         attr_primvar_layout.addLayout(button_layout)
         layout.addLayout(attr_primvar_layout)
 
     def setup_time_samples_editor(self, layout):
-        self.time_samples_tree = QtWidgets.QTreeWidget()
-        self.time_samples_tree.setHeaderLabels(["Attribute", "Time", "Value"])
+        self.time_samples_toggle = QtWidgets.QPushButton("Show Time Samples")
+        self.time_samples_toggle.setCheckable(True)
+        self.time_samples_container = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.time_samples_toggle)
+        layout.addLayout(self.time_samples_container)
+
+    def build_time_samples_panel(self):
+        from .usdTimeSampleModel import UsdTimeSampleModel
+        self.time_sample_model = UsdTimeSampleModel(self)
+        self.time_samples_tree = QtWidgets.QTreeView()
+        self.time_samples_tree.setModel(self.time_sample_model)
+        self.time_samples_tree.setUniformRowHeights(True)
+        self.time_samples_tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.time_samples_tree.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+
+        window_layout = QtWidgets.QHBoxLayout()
+        self.sample_start_spin = QtWidgets.QDoubleSpinBox()
+        self.sample_end_spin = QtWidgets.QDoubleSpinBox()
+        for spin in (self.sample_start_spin, self.sample_end_spin):
+            spin.setRange(-1e6, 1e6)
+            spin.setDecimals(2)
+        self.sample_end_spin.setValue(self.sample_end_spin.maximum())
+        self.sample_start_spin.setValue(self.sample_start_spin.minimum())
+        window_layout.addWidget(QtWidgets.QLabel("Frames:"))
+        window_layout.addWidget(self.sample_start_spin)
+        window_layout.addWidget(self.sample_end_spin)
+
+        bulk_layout = QtWidgets.QHBoxLayout()
+        self.sample_offset_spin = QtWidgets.QDoubleSpinBox()
+        self.sample_offset_spin.setRange(-1e6, 1e6)
+        self.sample_scale_spin = QtWidgets.QDoubleSpinBox()
+        self.sample_scale_spin.setRange(-1e3, 1e3)
+        self.sample_scale_spin.setDecimals(3)
+        self.sample_scale_spin.setValue(1.0)
+        self.retime_button = QtWidgets.QPushButton("Retime")
+        self.delete_samples_button = QtWidgets.QPushButton("Delete in Range")
+        bulk_layout.addWidget(QtWidgets.QLabel("Offset:"))
+        bulk_layout.addWidget(self.sample_offset_spin)
+        bulk_layout.addWidget(QtWidgets.QLabel("Scale:"))
+        bulk_layout.addWidget(self.sample_scale_spin)
+        bulk_layout.addWidget(self.retime_button)
+        bulk_layout.addWidget(self.delete_samples_button)
 
         time_samples_layout = QtWidgets.QVBoxLayout()
         time_samples_layout.addWidget(QtWidgets.QLabel("Time Samples:"))
+        time_samples_layout.addLayout(window_layout)
         time_samples_layout.addWidget(self.time_samples_tree)
+        time_samples_layout.addLayout(bulk_layout)
+
+        self.time_samples_group = QtWidgets.QGroupBox()
+        self.time_samples_group.setLayout(time_samples_layout)
+        self.time_samples_container.addWidget(self.time_samples_group)
+
+        self.time_samples_tree.doubleClicked.connect(self.edit_time_sample)
+        self.sample_start_spin.editingFinished.connect(self.update_sample_window)
+        self.sample_end_spin.editingFinished.connect(self.update_sample_window)
+        self.retime_button.clicked.connect(self.retime_selected_samples)
+        self.delete_samples_button.clicked.connect(self.delete_selected_samples)
+
+        if self.stage:
+            self.reset_sample_window()
+        prim = self.get_selected_prim()
+        if prim:
+            self.update_time_samples(prim)
 
-        time_samples_group = QtWidgets.QGroupBox()
-        time_samples_group.setLayout(time_samples_layout)
-        layout.addWidget(time_samples_group)
+    def toggle_time_samples_panel(self, visible):
+        if visible and not self.time_sample_model:
+            self.build_time_samples_panel()
+        if self.time_sample_model:
+            self.time_samples_group.setVisible(visible)
+
+    def setup_composition_panel(self, layout):
+        self.composition_toggle = QtWidgets.QPushButton("Show Composition")
+        self.composition_toggle.setCheckable(True)
+        self.composition_layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.composition_toggle)
+        layout.addLayout(self.composition_layout)
+
+    def toggle_composition_panel(self, visible):
+        if visible and not self.composition_panel:
+            from .usdCompositionPanel import CompositionPanel
+            self.composition_panel = CompositionPanel()
+            self.composition_layout.addWidget(self.composition_panel)
+            if self.session:
+                self.composition_panel.set_stage(self.stage, self.session.composition_cache)
+            self.update_composition_panel()
+        if self.composition_panel:
+            self.composition_panel.setVisible(visible)
+
+    def setup_instances_panel(self, layout):
+        self.instances_toggle = QtWidgets.QPushButton("Show Instances")
+        self.instances_toggle.setCheckable(True)
+        self.instances_layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.instances_toggle)
+        layout.addLayout(self.instances_layout)
+
+    def toggle_instances_panel(self, visible):
+        if visible and not self.instance_model:
+            self.instance_model = InstanceListModel(self)
+            self.instances_widget = QtWidgets.QWidget()
+            instances_layout = QtWidgets.QVBoxLayout(self.instances_widget)
+            instances_layout.setContentsMargins(0, 0, 0, 0)
+            self.instances_label = QtWidgets.QLabel()
+            self.instances_view = QtWidgets.QListView()
+            self.instances_view.setUniformItemSizes(True)
+            self.instances_view.setModel(self.instance_model)
+            instances_layout.addWidget(self.instances_label)
+            instances_layout.addWidget(self.instances_view)
+            self.instances_layout.addWidget(self.instances_widget)
+            self.instances_view.doubleClicked.connect(
+                lambda index: self.select_path(self.instance_model.path(index)))
+            self.update_instances_panel(self.get_selected_prim())
+        if self.instance_model:
+            self.instances_widget.setVisible(visible)
+
+    def update_instances_panel(self, prim):
+        if not self.instance_model:
+            return
+        prototype = None
+        if prim and prim.IsPrototype():
+            prototype = prim
+        elif prim and prim.IsInstance():
+            prototype = prim.GetPrototype()
+        self.instance_model.set_prototype(prototype)
+        if prototype:
+            self.instances_label.setText(f"{self.instance_model.instance_count()} instances of {prototype.GetPath()}")
+        else:
+            self.instances_label.setText("Select an instance or a prototype.")
+
+    def select_path(self, path):
+        if path is None:
+            return
+        index = self.proxy_index_for_path(path)
+        if index.isValid():
+            flags = QtCore.QItemSelectionModel.ClearAndSelect | QtCore.QItemSelectionModel.Rows
+            self.tree_view.selectionModel().select(index, flags)
+            self.tree_view.scrollTo(index)
+
+    def update_composition_panel(self):
+        if self.composition_panel:
+            self.composition_panel.set_prim(self.get_selected_prim(),
+                                            self.attr_model.attribute(self.attr_primvar_tree.currentIndex()))
 
     def connect_signals(self):
         self.refresh_button.clicked.connect(self.refresh_tree_view)
+        self.tree_view.selectionModel().selectionChanged.connect(self.update_property_editors)
+        self.filter_edit.textChanged.connect(lambda _: self.filter_timer.start())
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.cancel_traversal_button.clicked.connect(self.cancel_traversal)
         self.apply_button.clicked.connect(self.apply_changes)
-        self.update_stage_button.clicked.connect(self.update_stage_from_text)
+        self.stage_text_toggle.toggled.connect(self.toggle_stage_text_panel)
+        self.time_samples_toggle.toggled.connect(self.toggle_time_samples_panel)
+        self.profiling_toggle.toggled.connect(self.toggle_profiling_panel)
+        self.composition_toggle.toggled.connect(self.toggle_composition_panel)
+        self.instances_toggle.toggled.connect(self.toggle_instances_panel)
+        self.scope_from_selection_button.clicked.connect(self.use_selection_as_scope)
+        self.stats_toggle.toggled.connect(self.toggle_geometry_stats)
+        self.stats_time_spin.valueChanged.connect(lambda _: self.compute_geometry_stats())
+        self.stats_timer.timeout.connect(self.compute_geometry_stats)
+        self.apply_scope_button.clicked.connect(self.apply_scope)
+        self.scope_mask_edit.returnPressed.connect(self.apply_scope)
+        self.variant_explorer_toggle.toggled.connect(self.toggle_variant_explorer)
+        self.attr_primvar_tree.selectionModel().currentChanged.connect(lambda *_: self.update_composition_panel())
         self.load_payload_button.clicked.connect(self.load_selected_payload)
         self.unload_payload_button.clicked.connect(self.unload_selected_payload)
+        self.load_matching_button.clicked.connect(self.load_matching_payloads)
+        self.load_to_depth_button.clicked.connect(self.load_payloads_to_depth)
+        self.max_loaded_spin.valueChanged.connect(self.set_payload_budget)
         self.add_attr_button.clicked.connect(self.add_attribute)
         self.add_primvar_button.clicked.connect(self.add_primvar)
         self.edit_button.clicked.connect(self.edit_attr_primvar)
+        self.inspect_array_button.clicked.connect(self.inspect_array)
+        self.attr_primvar_tree.doubleClicked.connect(self.on_attr_primvar_double_clicked)
         self.remove_button.clicked.connect(self.remove_attr_primvar)
-        self.time_samples_tree.itemDoubleClicked.connect(self.edit_time_sample)
 
     def update_property_editors(self):
-        selected_indexes = self.tree_view.selectedIndexes()
-        if not selected_indexes:
-            self.clear_editors()
-            return
-
-        model = self.tree_view.model()
-        row = selected_indexes[0].row()
-
-        kind_item = model.item(row, 2)
-        purpose_item = model.item(row, 3)
+        with measure('editor.update_property_editors'):
+            selection_model = self.tree_view.selectionModel()
+            selected_rows = selection_model.selectedRows(0) if selection_model else []
+            if not selected_rows:
+                self.clear_editors()
+                return
 
-        self.kind_combo.setCurrentText(kind_item.text() if kind_item else "")
-        self.purpose_combo.setCurrentText(purpose_item.text() if purpose_item else "")
+            index = selected_rows[0]
+            self.kind_combo.setCurrentText(index.sibling(index.row(), 2).data() or "")
+            self.purpose_combo.setCurrentText(index.sibling(index.row(), 3).data() or "")
 
-        prim = self.get_selected_prim()
-        if not prim:
-            return
+            prim = self.get_selected_prim()
+            if not prim:
+                return
 
-        self.update_variant_sets(prim)
-        self.update_payload_controls(prim)
-        self.update_attr_primvar_list(prim)
-        self.update_time_samples(prim)
+            if self.stage_text_panel:
+                self.stage_text_panel.set_prim_path(prim.GetPath())
+            if self.payload_manager:
+                self.payload_manager.touch(prim.GetPath())
+            self.update_variant_sets(prim)
+            self.update_payload_controls(prim)
+            self.update_attr_primvar_list(prim)
+            self.update_time_samples(prim)
+            self.update_composition_panel()
+            self.update_instances_panel(prim)
 
     def clear_editors(self):
         self.kind_combo.setCurrentText("")
         self.purpose_combo.setCurrentText("")
-        self.attr_primvar_tree.clear()
+        self.attr_model.set_prim(None)
         self.clear_variant_sets()
         self.load_payload_button.setEnabled(False)
         self.unload_payload_button.setEnabled(False)
-        self.time_samples_tree.clear()
+        if self.time_sample_model:
+            self.time_sample_model.set_prim(None)
+        if self.stage_text_panel:
+            self.stage_text_panel.set_prim_path(None)
+        self.update_instances_panel(None)
 
     def update_variant_sets(self, prim):
-        self.clear_variant_sets()
-        for vs_info in get_variant_sets(prim):
-            vs_layout = QtWidgets.QHBoxLayout()
-            vs_layout.addWidget(QtWidgets.QLabel(vs_info.name))
-            vs_combo = QtWidgets.QComboBox()
-            vs_combo.addItems(vs_info.variants)
+        variant_sets = get_variant_sets(prim)
+        # Prims of the same asset share their variant sets, so the combos are refilled rather than rebuilt.
+        if [vs_info.name for vs_info in variant_sets] != list(self.variant_combos):
+            self.clear_variant_sets()
+            for vs_info in variant_sets:
+                row = QtWidgets.QWidget()
+                vs_layout = QtWidgets.QHBoxLayout(row)
+                vs_layout.setContentsMargins(0, 0, 0, 0)
+                vs_layout.addWidget(QtWidgets.QLabel(vs_info.name))
+                vs_combo = QtWidgets.QComboBox()
+                vs_combo.currentTextChanged.connect(
+                    lambda text, name=vs_info.name: self.set_variant(self.get_selected_prim(), name, text))
+                vs_layout.addWidget(vs_combo)
+                self.variant_rows_layout.addWidget(row)
+                self.variant_combos[vs_info.name] = vs_combo
+
+        for vs_info in variant_sets:
+            vs_combo = self.variant_combos[vs_info.name]
+            vs_combo.blockSignals(True)
+            if [vs_combo.itemText(i) for i in range(vs_combo.count())] != vs_info.variants:
+                vs_combo.clear()
+                vs_combo.addItems(vs_info.variants)
             vs_combo.setCurrentText(vs_info.current_selection)
-            vs_combo.currentTextChanged.connect(lambda text, name=vs_info.name: self.set_variant(prim, name, text))
-            vs_layout.addWidget(vs_combo)
-            self.variant_set_layout.addLayout(vs_layout)
+            vs_combo.blockSignals(False)
+
+        if self.variant_explorer_panel:
+            self.variant_explorer_panel.set_prim(prim)
 
     def clear_variant_sets(self):
-        for i in reversed(range(1, self.variant_set_layout.count())):
-            self.variant_set_layout.itemAt(i).widget().setParent(None)
+        while self.variant_rows_layout.count():
+            self.variant_rows_layout.takeAt(0).widget().deleteLater()
+        self.variant_combos = {}
+        if self.variant_explorer_panel:
+            self.variant_explorer_panel.set_prim(None)
 
     def update_payload_controls(self, prim):
         has_payload_value = has_payload(prim)
@@ -205,67 +667,76 @@ class UsdPrimEditor(QtWidgets.QWidget):
         self.unload_payload_button.setEnabled(has_payload_value)
 
     def update_attr_primvar_list(self, prim):
-        self.attr_primvar_tree.clear()
-        for attr in prim.GetAttributes():
-            self.add_attribute_to_tree(attr)
-        if prim.IsA(UsdGeom.Imageable):
-            primvar_api = UsdGeom.PrimvarsAPI(prim)
-            for primvar in primvar_api.GetPrimvars():
-                self.add_primvar_to_tree(primvar)
+        self.attr_model.set_prim(prim)
 
     def update_time_samples(self, prim):
-        self.time_samples_tree.clear()
-        for attr in prim.GetAttributes():
-            if attr.GetNumTimeSamples() > 0:
-                parent_item = QtWidgets.QTreeWidgetItem(self.time_samples_tree)
-                parent_item.setText(0, attr.GetName())
-                for time in attr.GetTimeSamples():
-                    child_item = QtWidgets.QTreeWidgetItem(parent_item)
-                    child_item.setText(1, str(time))
-                    child_item.setText(2, str(attr.Get(time)))
-        self.time_samples_tree.expandAll()
-
-    def add_attribute_to_tree(self, attr):
-        item = QtWidgets.QTreeWidgetItem(self.attr_primvar_tree)
-        item.setText(0, attr.GetName())
-        item.setText(1, str(attr.Get()))
-
-        color = self.get_attribute_color(attr)
-        item.setData(0, QtCore.Qt.UserRole, {'color': color})
-        item.setData(1, QtCore.Qt.UserRole, {'color': color})
-
-    def get_attribute_color(self, attr):
-        if attr.IsCustom():
-            return QtGui.QColor(255, 255, 0)  # Yellow for custom attributes
-        elif attr.GetName().startswith('xformOp:'):
-            return QtGui.QColor(200, 200, 255)  # Light blue for transform attributes
-        elif isinstance(attr.Get(), Usd.TimeCode):
-            return QtGui.QColor(0, 255, 0)  # Green for time samples
-        elif attr.GetTypeName() == 'token':
-            return QtGui.QColor(217, 157, 52)  # Orange for tokens
-        return QtGui.QColor(142, 211, 245)  # Default color
-
-    def add_primvar_to_tree(self, primvar):
-        item = QtWidgets.QTreeWidgetItem(self.attr_primvar_tree)
-        item.setText(0, primvar.GetName())
-        item.setText(1, str(primvar.Get()))
-
-        color = QtGui.QColor(0, 255, 255)  # Cyan for primvars
-        item.setData(0, QtCore.Qt.UserRole, {'color': color})
-        item.setData(1, QtCore.Qt.UserRole, {'color': color})
+        if self.time_sample_model:
+            self.time_sample_model.set_prim(prim)
+
+    def update_sample_window(self):
+        self.time_sample_model.set_window(self.sample_start_spin.value(), self.sample_end_spin.value())
+
+    def reset_sample_window(self):
+        if self.stage.HasAuthoredTimeCodeRange():
+            self.sample_start_spin.setValue(self.stage.GetStartTimeCode())
+            self.sample_end_spin.setValue(self.stage.GetEndTimeCode())
+        else:
+            self.sample_start_spin.setValue(self.sample_start_spin.minimum())
+            self.sample_end_spin.setValue(self.sample_end_spin.maximum())
+        self.update_sample_window()
+
+    def get_selected_sample_attr_paths(self):
+        selected_rows = self.time_samples_tree.selectionModel().selectedRows(0)
+        attrs = [self.time_sample_model.attribute(index) for index in selected_rows]
+        attrs = attrs or self.time_sample_model.attributes()
+        return list(dict.fromkeys(attr.GetPath() for attr in attrs))
+
+    def retime_selected_samples(self):
+        attr_paths = self.get_selected_sample_attr_paths()
+        if not attr_paths:
+            return
+
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                count = self.journal.retime_samples(self.stage, attr_paths, self.sample_start_spin.value(),
+                                                    self.sample_end_spin.value(), self.sample_scale_spin.value(),
+                                                    self.sample_offset_spin.value())
+            print(f"Retimed {count} samples on {len(attr_paths)} attributes.")
+        except Exception as e:
+            print(f"Error retiming samples: {str(e)}")
+
+    def delete_selected_samples(self):
+        attr_paths = self.get_selected_sample_attr_paths()
+        if not attr_paths:
+            return
+
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                count = self.journal.delete_samples_in_range(self.stage, attr_paths, self.sample_start_spin.value(),
+                                                             self.sample_end_spin.value())
+            print(f"Deleted {count} samples on {len(attr_paths)} attributes.")
+        except Exception as e:
+            print(f"Error deleting samples: {str(e)}")
 
     def edit_attr_primvar(self):
-        item = self.attr_primvar_tree.currentItem()
-        if not item:
+        index = self.attr_primvar_tree.currentIndex()
+        selected_attr = self.attr_model.attribute(index)
+        if not selected_attr:
+            return
+        if self.attr_model.is_array_index(index):
+            self.inspect_array()
             return
 
         prim = self.get_selected_prim()
-        name = item.text(0)
-        current_value = item.text(1)
+        name = selected_attr.GetName()
+        current_value = str(selected_attr.Get())
         new_value, ok = QtWidgets.QInputDialog.getText(self, "Edit", f"Enter new value for {name}:", text=current_value)
         if not ok or not prim:
             return
 
+        self.prepare_stage_edit()
         try:
             attr = UsdGeom.PrimvarsAPI(prim).GetPrimvar(name).GetAttr() if UsdGeom.Primvar.IsPrimvarName(
                 name) else prim.GetAttribute(name)
@@ -274,11 +745,38 @@ class UsdPrimEditor(QtWidgets.QWidget):
                 return
 
             typed_value = self.convert_to_attr_type(new_value, attr.GetTypeName())
-            attr.Set(typed_value)
-            self.update_attr_primvar_list(prim)
+            with self.edit_context():
+                self.journal.set_attribute_value(attr, typed_value)
         except Exception as e:
             print(f"Error setting value: {str(e)}")
 
+    def on_attr_primvar_double_clicked(self, index):
+        if self.attr_model.is_array_index(index):
+            self.inspect_array()
+
+    def inspect_array(self):
+        index = self.attr_primvar_tree.currentIndex()
+        selected_attr = self.attr_model.attribute(index)
+        if not selected_attr or not self.attr_model.is_array_index(index):
+            return
+
+        try:
+            # NumPy is only needed once an array is actually inspected.
+            from .usdArrayInspector import ArrayInspectorDialog
+        except ImportError as e:
+            print(f"Warning: Array inspector unavailable: {str(e)}")
+            return
+
+        dialog = ArrayInspectorDialog(selected_attr, self.edit_context, self.write_array_value, self)
+        dialog.aboutToEdit.connect(self.prepare_stage_edit)
+        dialog.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        dialog.show()
+
+    def write_array_value(self, attr, array, time):
+        from .usdArrayUtils import to_vt_array
+        self.journal.set_attribute_value(attr, to_vt_array(attr, array), None if time.IsDefault() else time.GetValue())
+        return True
+
     def convert_to_attr_type(self, value_str, type_name):
         type_converters = {
             Sdf.ValueTypeNames.Bool: lambda x: x.lower() in ('true', '1', 'yes', 'on'),
@@ -313,8 +811,12 @@ class UsdPrimEditor(QtWidgets.QWidget):
         if not ok:
             return
 
-        prim.CreateAttribute(name, Sdf.ValueTypeNames.String).Set(value)
-        self.update_attr_primvar_list(prim)
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                self.journal.add_attribute(prim, name, Sdf.ValueTypeNames.String, value)
+        except Exception as e:
+            print(f"Error adding attribute: {str(e)}")
 
     def add_primvar(self):
         prim = self.get_selected_prim()
@@ -329,32 +831,39 @@ class UsdPrimEditor(QtWidgets.QWidget):
         if not ok:
             return
 
-        UsdGeom.PrimvarsAPI(prim).CreatePrimvar(name, Sdf.ValueTypeNames.String).Set(value)
-        self.update_attr_primvar_list(prim)
+        if not UsdGeom.Primvar.IsPrimvarName(name):
+            name = f"primvars:{name}"
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                self.journal.add_attribute(prim, name, Sdf.ValueTypeNames.String, value, custom=False)
+        except Exception as e:
+            print(f"Error adding primvar: {str(e)}")
 
     def remove_attr_primvar(self):
-        item = self.attr_primvar_tree.currentItem()
-        if not item:
+        selected_attr = self.attr_model.attribute(self.attr_primvar_tree.currentIndex())
+        if not selected_attr:
             return
 
         prim = self.get_selected_prim()
-        name = item.text(0)
-
-        if UsdGeom.Primvar.IsPrimvarName(name):
-            UsdGeom.PrimvarsAPI(prim).RemovePrimvar(name)
-        else:
-            prim.RemoveProperty(name)
+        name = selected_attr.GetName()
 
-        self.update_attr_primvar_list(prim)
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                if not self.journal.remove_property(prim, name):
+                    print(f"Warning: {name} is not authored on the edit target")
+        except Exception as e:
+            print(f"Error removing {name}: {str(e)}")
 
-    def edit_time_sample(self, item, column):
-        if not item.parent():  # Ensure it's a child item (time sample)
+    def edit_time_sample(self, index):
+        time = self.time_sample_model.sample_time(index)
+        if time is None:  # Ensure it's a sample row
             return
 
         prim = self.get_selected_prim()
-        attr_name = item.parent().text(0)
-        time = float(item.text(1))
-        current_value = item.text(2)
+        attr_name = self.time_sample_model.attribute(index).GetName()
+        current_value = index.sibling(index.row(), 2).data()
 
         new_value, ok = QtWidgets.QInputDialog.getText(
             self, "Edit Time Sample",
@@ -365,6 +874,7 @@ class UsdPrimEditor(QtWidgets.QWidget):
         if not ok or not prim:
             return
 
+        self.prepare_stage_edit()
         try:
             attr = prim.GetAttribute(attr_name)
             if not attr:
@@ -372,93 +882,467 @@ class UsdPrimEditor(QtWidgets.QWidget):
                 return
 
             typed_value = self.convert_to_attr_type(new_value, attr.GetTypeName())
-            attr.Set(typed_value, time)
-            self.update_time_samples(prim)
+            with self.edit_context():
+                self.journal.set_attribute_value(attr, typed_value, time)
         except Exception as e:
             print(f"Error setting time sample: {str(e)}")
 
+    def get_selected_paths(self):
+        selection_model = self.tree_view.selectionModel()
+        if not selection_model or not self.stage:
+            return []
+        return [Sdf.Path(index.data(QtCore.Qt.UserRole)) for index in selection_model.selectedRows(0)]
+
     def get_selected_prim(self):
-        selected_indexes = self.tree_view.selectedIndexes()
-        if not selected_indexes:
+        selected_paths = self.get_selected_paths()
+        if not selected_paths:
             return None
-
-        prim_path_str = selected_indexes[0].data(QtCore.Qt.UserRole)
-        prim_path = Sdf.Path(prim_path_str)
-        return self.stage.GetPrimAtPath(prim_path)
+        return self.stage.GetPrimAtPath(selected_paths[0])
 
     def set_variant(self, prim, variant_set, variant):
-        set_variant_selection(prim, variant_set, variant)
-        self.refresh_tree_view()
+        if not prim or not variant:
+            return
+        paths = [path for path in self.get_selected_paths()
+                 if self.stage.GetPrimAtPath(path).GetVariantSets().HasVariantSet(variant_set)]
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                self.journal.set_variant_selections(self.stage, paths or [prim.GetPath()], variant_set, variant)
+        except Exception as e:
+            print(f"Error setting variant: {str(e)}")
+
+    def get_selected_payload_paths(self):
+        return [path for path in self.get_selected_paths() if has_payload(self.stage.GetPrimAtPath(path))]
 
     def load_selected_payload(self):
-        prim = self.get_selected_prim()
-        if prim:
-            load_payload(prim)
-            self.refresh_tree_view()
+        paths = self.get_selected_payload_paths()
+        if paths:
+            self.run_payload_policy(self.payload_manager.load, paths)
 
     def unload_selected_payload(self):
-        prim = self.get_selected_prim()
-        if prim:
-            unload_payload(prim)
-            self.refresh_tree_view()
+        paths = self.get_selected_payload_paths()
+        if paths:
+            self.run_payload_policy(self.payload_manager.unload, paths)
 
-    def refresh_tree_view(self):
-        selected = cmds.ls(sl=1, ufe=1)
-        if not selected:
-            cmds.warning("No USD prim selected.")
+    def load_matching_payloads(self):
+        pattern = self.payload_pattern_edit.text().strip() or None
+        kinds = [kind.strip() for kind in self.payload_kinds_edit.text().split(',') if kind.strip()]
+        self.run_payload_policy(self.payload_manager.load_matching, pattern, kinds or None)
+
+    def load_payloads_to_depth(self):
+        self.run_payload_policy(self.payload_manager.load_to_depth, self.payload_depth_spin.value())
+
+    def set_payload_budget(self, max_loaded):
+        if self.payload_manager:
+            self.payload_manager.max_loaded = max_loaded
+            self.run_payload_policy(self.payload_manager.enforce_budget)
+
+    def run_payload_policy(self, policy, *args):
+        if not self.payload_manager:
             return
 
+        self.prepare_stage_edit()
+        stages = [self.payload_manager.stage]
+        if self.payload_manager.mirror_stage:
+            stages.append(self.payload_manager.mirror_stage)
         try:
-            proxy_shape, _ = selected[0].split(',')
-            self.stage = mayaUsd.ufe.getStage(proxy_shape)
-            model = UsdTreeModel(self.stage)
-            self.tree_view.setModel(model)
+            with self.journal.load_rules_change("Change Payloads", stages):
+                report = policy(*args)
+            text = f"Loaded {report.loaded}, unloaded {report.unloaded}"
+            if report.skipped:
+                text += f", skipped {len(report.skipped)} over the budget"
+                self.payload_report_label.setToolTip("\n".join(str(path) for path in report.skipped))
+            else:
+                self.payload_report_label.setToolTip("")
+            self.payload_report_label.setText(text)
+        except Exception as e:
+            print(f"Error updating payloads: {str(e)}")
+
+    def selected_proxy_shape(self):
+        return usdMayaBridge.selected_proxy_shape()
+
+    def refresh_tree_view(self):
+        with measure('editor.refresh_tree_view'):
+            proxy_shape = self.selected_proxy_shape()
+            if not proxy_shape:
+                usdMayaBridge.warning("No USD prim selected.")
+                return
+
+            try:
+                stage = usdMayaBridge.get_stage(proxy_shape)
+                self.proxy_shape = proxy_shape
+                self.watch_maya_selection()
+                # Refreshing the stage already shown rebuilds it; any other stage is reused from the cache.
+                self.activate_stage(stage, rebuild=self.is_active_stage(stage))
+            except Exception as e:
+                print(f"Error refreshing tree view: {str(e)}")
+
+    def is_active_stage(self, stage):
+        return self.session is not None and self.session.source_stage == stage and self.session.scope == self.scope
+
+    def activate_stage(self, stage, rebuild=False):
+        # `stage` is the proxy shape's stage; the session works on its scoped view.
+        if self.is_active_stage(stage) and not rebuild:
+            return
+
+        self.cancel_traversal()
+        self.resume_traversal = False
+        if self.session:
+            self.store_view_state(self.session)
+            self.session.active = False
+            self.session.watcher.stageChanged.disconnect(self.on_stage_changed)
+
+        session = None if rebuild else self.sessions.get(stage, self.scope)
+        if session is None:
+            session = StageSession(stage, self.max_loaded_spin.value(), self.scope)
+        session.active = True
+        self.sessions.add(session)
+
+        self.session = session
+        self.stage = session.stage
+        self.tree_model = session.tree_model
+        self.search_index = session.search_index
+        self.payload_manager = session.payload_manager
+        self.payload_manager.max_loaded = self.max_loaded_spin.value()
+        session.watcher.stageChanged.connect(self.on_stage_changed)
+
+        self.clear_editors()
+        self.filter_model.setSourceModel(self.tree_model)
+        self.filter_model.set_visible_paths(None)
+        self.update_stats_columns()
+        self.compute_geometry_stats()
+        self.restore_view_state(session)
+
+        if not session.indexed and not self.load_cached_traversal():
+            self.start_traversal()
+        self.update_edit_targets()
+        if self.stage_text_panel:
+            self.stage_text_panel.set_stage(self.stage, self.scope.root_path())
+        if self.time_sample_model:
+            self.reset_sample_window()
+        if self.composition_panel:
+            self.composition_panel.set_stage(self.stage, session.composition_cache)
+        if self.variant_explorer_panel:
+            self.variant_explorer_panel.set_explorer(session.variant_explorer)
+
+    def proxy_index_for_path(self, path):
+        node = self.tree_model.materialize_path(path)
+        if node is None:
+            return QtCore.QModelIndex()
+        return self.filter_model.mapFromSource(self.tree_model.index_for_node(node))
+
+    def collect_expanded_paths(self):
+        # Only expanded rows are descended into, so this stays proportional to what is on screen.
+        paths = []
+        pending = [QtCore.QModelIndex()]
+        while pending:
+            parent = pending.pop()
+            for row in range(self.filter_model.rowCount(parent)):
+                index = self.filter_model.index(row, 0, parent)
+                if self.tree_view.isExpanded(index):
+                    paths.append(Sdf.Path(index.data(QtCore.Qt.UserRole)))
+                    pending.append(index)
+        return paths
+
+    def store_view_state(self, session):
+        session.expanded_paths = self.collect_expanded_paths()
+        session.selected_paths = self.get_selected_paths()
+        session.filter_text = self.filter_edit.text()
+
+    def restore_view_state(self, session):
+        self.filter_edit.blockSignals(True)
+        self.filter_edit.setText(session.filter_text)
+        self.filter_edit.blockSignals(False)
+        self.filter_status_label.clear()
+        if session.filter_text:
+            self.apply_filter()
+
+        if self.expand_all_on_refresh:
             self.tree_view.expandAll()
+        elif session.expanded_paths:
+            for path in session.expanded_paths:
+                index = self.proxy_index_for_path(path)
+                if index.isValid():
+                    self.tree_view.expand(index)
+        elif self.scope.is_masked():
+            # Open the tree down to the scoped subtrees.
+            for mask_path in self.scope.mask_paths:
+                for path in mask_path.GetPrefixes()[:-1]:
+                    index = self.proxy_index_for_path(path)
+                    if index.isValid():
+                        self.tree_view.expand(index)
+            self.tree_view.expand(self.filter_model.index(0, 0))
+        else:
+            self.tree_view.expand(self.filter_model.index(0, 0))
+
+        selection = QtCore.QItemSelection()
+        for path in session.selected_paths:
+            index = self.proxy_index_for_path(path)
+            if index.isValid():
+                selection.select(index, index)
+        if not selection.isEmpty():
+            flags = QtCore.QItemSelectionModel.ClearAndSelect | QtCore.QItemSelectionModel.Rows
+            self.tree_view.selectionModel().select(selection, flags)
+            self.tree_view.scrollTo(selection.indexes()[0])
+
+    def load_cached_traversal(self):
+        if not self.traversal_cache_check.isChecked():
+            return False
+        data = load_traversal_cache(cache_file_path(self.stage, self.session.scope))
+        if data is None:
+            return False
+
+        with measure('editor.load_cached_traversal', len(data.records)):
+            self.tree_model.add_records(data.records)
+            self.search_index.add_records(data.records)
+        self.session.indexed = True
+        self.sessions.evict(keep=self.session)
+
+        # Shown right away; a background check of the layer stamps decides whether it has to be redone.
+        validator = TraversalCacheValidator(self.stage, data.stamps, self)
+        validator.validated.connect(self.on_traversal_cache_validated, QtCore.Qt.QueuedConnection)
+        validator.finished.connect(validator.deleteLater)
+        self.cache_validator = (validator, self.session)
+        validator.start()
+        return True
+
+    def on_traversal_cache_validated(self, validator, valid):
+        if not self.cache_validator or self.cache_validator[0] is not validator:
+            return
+        session = self.cache_validator[1]
+        self.cache_validator = None
+        if valid:
+            return
 
-            # Connect the selection changed signal after setting the model
-            self.tree_view.selectionModel().selectionChanged.connect(self.update_property_editors)
+        print("Warning: traversal cache is out of date, reading the stage again.")
+        session.tree_model.prim_info.clear()
+        session.search_index = PrimSearchIndex(session.predicate)
+        session.indexed = False
+        if session is self.session:
+            self.search_index = session.search_index
+            self.tree_view.viewport().update()
+            self.start_traversal()
+
+    def start_traversal(self):
+        self.cancel_traversal()
+        self.resume_traversal = False
+        self.traversal_records = None
+        if self.traversal_cache_check.isChecked():
+            self.traversal_stamps = layer_stamps(self.stage)
+            if self.traversal_stamps is not None:
+                self.traversal_records = []
+                self.traversal_cache_path = cache_file_path(self.stage, self.session.scope)
+        self.traversal_thread = PrimTraversalThread(self.stage, predicate=self.session.predicate,
+                                                    include_prototypes=self.session.scope.instancing, parent=self)
+        self.traversal_thread.batchReady.connect(self.on_traversal_batch, QtCore.Qt.QueuedConnection)
+        self.traversal_thread.progress.connect(self.on_traversal_progress, QtCore.Qt.QueuedConnection)
+        self.traversal_thread.completed.connect(self.on_traversal_completed, QtCore.Qt.QueuedConnection)
+        self.traversal_thread.finished.connect(self.on_traversal_finished, QtCore.Qt.QueuedConnection)
+        self.traversal_thread.finished.connect(self.traversal_thread.deleteLater)
+        self.traversal_label.setText("Reading stage...")
+        self.traversal_widget.setVisible(True)
+        self.traversal_started = time.perf_counter()
+        self.traversal_thread.start()
+
+    def cancel_traversal(self, wait=False):
+        thread = self.traversal_thread
+        if not thread:
+            return
+        thread.cancel()
+        if wait:
+            thread.wait()
+        self.traversal_thread = None
+        self.traversal_widget.setVisible(False)
+
+    def prepare_stage_edit(self):
+        # USD does not allow authoring while another thread reads the stage.
+        if self.traversal_thread and self.traversal_thread.isRunning():
+            self.cancel_traversal(wait=True)
+            self.resume_traversal = True
+        self.wait_for_cache_validator()
+
+    def wait_for_cache_validator(self):
+        # Stamping exports anonymous layers; it is short, so it is waited for rather than cancelled. Its result is
+        # still delivered.
+        if self.cache_validator and self.cache_validator[0].isRunning():
+            self.cache_validator[0].wait()
+
+    def on_traversal_batch(self, thread, records):
+        if thread is not self.traversal_thread or thread.is_cancelled():
+            return
+        with measure('editor.on_traversal_batch', len(records)):
+            self.tree_model.add_records(records)
+            self.search_index.add_records(records)
+            if self.traversal_records is not None:
+                self.traversal_records.extend(records)
+
+    def on_traversal_progress(self, thread, count):
+        if thread is self.traversal_thread:
+            self.traversal_label.setText(f"Reading stage: {count} prims")
+
+    def on_traversal_completed(self, thread, count):
+        if thread is not self.traversal_thread:
+            return
+        # The traversal spans threads and event-loop ticks, so it is recorded as a whole once it completes.
+        PROFILER.record('editor.traversal', time.perf_counter() - self.traversal_started, count)
+        self.session.indexed = True
+        self.sessions.evict(keep=self.session)
+        self.save_cached_traversal()
+
+    def save_cached_traversal(self):
+        records, stamps, path = self.traversal_records, self.traversal_stamps, self.traversal_cache_path
+        self.traversal_records = None
+        # Layers edited during the traversal would make the stamps lie about what was read.
+        if records is None or layer_stamps(self.stage) != stamps:
+            return
 
-            self.update_stage_text()
-        except Exception as e:
-            print(f"Error refreshing tree view: {str(e)}")
+        def save():
+            try:
+                save_traversal_cache(path, stamps, records)
+            except Exception as e:
+                print(f"Error saving traversal cache: {str(e)}")
+
+        threading.Thread(target=save, daemon=True).start()
+
+    def on_traversal_finished(self):
+        thread = self.traversal_thread
+        if thread and not thread.isRunning():
+            self.traversal_thread = None
+            self.traversal_widget.setVisible(False)
+            if self.filter_model.is_filtering():
+                self.apply_filter()
+
+    def apply_filter(self):
+        with measure('editor.apply_filter'):
+            query = self.filter_edit.text().strip()
+            if not query or not self.tree_model:
+                self.filter_model.set_visible_paths(None)
+                self.filter_status_label.clear()
+                return
 
-    def apply_changes(self):
-        prim = self.get_selected_prim()
-        if not prim or not self.stage:
-            cmds.warning("No prim selected or stage not available.")
+            matches = self.search_index.query(query, limit=self.MAX_FILTER_RESULTS + 1)
+            truncated = len(matches) > self.MAX_FILTER_RESULTS
+            matches = matches[:self.MAX_FILTER_RESULTS]
+
+            visible_paths = set()
+            for path in matches:
+                if self.tree_model.materialize_path(path) is None:
+                    continue
+                while path not in visible_paths:
+                    visible_paths.add(path)
+                    if path == Sdf.Path.absoluteRootPath:
+                        break
+                    path = path.GetParentPath()
+
+            self.filter_model.set_visible_paths(visible_paths)
+            self.tree_view.expandAll()
+
+            status = f"{len(matches)}{'+' if truncated else ''} matches"
+            if self.traversal_thread:
+                status += " (indexing...)"
+            self.filter_status_label.setText(status)
+
+    def watch_maya_selection(self):
+        if self.selection_job is None:
+            self.selection_job = usdMayaBridge.watch_selection(self.on_maya_selection_changed)
+
+    def on_maya_selection_changed(self):
+        proxy_shape = self.selected_proxy_shape()
+        if not proxy_shape or proxy_shape == self.proxy_shape:
             return
 
+        # Stages seen before are switched to right away; anything else waits for an explicit refresh.
         try:
-            new_kind = self.kind_combo.currentText()
-            if new_kind:
-                set_prim_kind(prim, new_kind)
+            stage = usdMayaBridge.get_stage(proxy_shape)
+        except Exception:
+            stage = None
+        if stage and self.sessions.get(stage, self.scope):
+            self.proxy_shape = proxy_shape
+            self.activate_stage(stage)
+        else:
+            self.cancel_traversal()
+
+    def on_stage_changed(self, resynced_paths, info_changed_paths):
+        with measure('editor.on_stage_changed', len(resynced_paths) + len(info_changed_paths)):
+            if self.tree_model:
+                self.tree_model.apply_stage_changes(resynced_paths, info_changed_paths)
+            if self.search_index:
+                self.search_index.apply_stage_changes(self.stage, resynced_paths, info_changed_paths)
+                if self.filter_model.is_filtering():
+                    self.apply_filter()
+
+            prim = self.get_selected_prim()
+            if prim:
+                prim_path = prim.GetPath()
+                if (any(prim_path.HasPrefix(path.GetPrimPath()) for path in resynced_paths)
+                        or any(path.GetPrimPath() == prim_path for path in info_changed_paths)):
+                    self.update_property_editors()
+
+            if self.resume_traversal:
+                self.start_traversal()
+
+            if self.stats_toggle.isChecked():
+                self.stats_timer.start()
+            self.update_stage_text()
 
-            new_purpose = self.purpose_combo.currentText()
-            if new_purpose:
-                set_prim_purpose(prim, PrimPurpose(new_purpose))
+    def apply_changes(self):
+        paths = self.get_selected_paths()
+        if not paths or not self.stage:
+            usdMayaBridge.warning("No prim selected or stage not available.")
+            return
 
-            self.refresh_tree_view()
+        self.prepare_stage_edit()
+        try:
+            with self.edit_context():
+                new_kind = self.kind_combo.currentText()
+                new_purpose = self.purpose_combo.currentText()
+                # Kind and purpose together are one undo step.
+                with self.journal.transaction("Apply Changes"):
+                    if new_kind:
+                        self.journal.set_prims_kind(self.stage, paths, new_kind)
+                    if new_purpose:
+                        self.journal.set_prims_purpose(self.stage, paths, PrimPurpose(new_purpose))
         except Exception as e:
             print(f"Error applying changes: {str(e)}")
 
     def update_stage_text(self):
-        if self.stage:
-            self.stage_text_edit.setPlainText(get_stage_as_text(self.stage))
+        with measure('editor.update_stage_text'):
+            if self.stage_text_panel:
+                self.stage_text_panel.refresh()
 
     def update_stage_from_text(self):
-        if not self.stage:
+        text = self.stage_text_panel.text()
+        if not self.stage or not text:
             return
 
+        self.prepare_stage_edit()
         try:
-            update_stage_from_text(self.stage, self.stage_text_edit.toPlainText())
-            self.refresh_tree_view()
+            diff = self.journal.update_stage_from_text(self.stage, text, self.stage_text_panel.text_root_path())
+            print(f"Updated stage: {diff.edit_count()} spec edits applied.")
         except Exception as e:
             print(f"Error updating stage: {str(e)}")
 
-    def showEvent(self, event):
-        if self.stage:
-            self.refresh_tree_view()
-        super().showEvent(event)
+    def register_undo_chunk(self, transaction):
+        try:
+            # Transactions older than Maya keeps would leave undo steps that do nothing.
+            self.journal.set_max_transactions(usdMayaBridge.undo_queue_length())
+            usdMayaBridge.register_undo_chunk(self.journal, transaction)
+        except ImportError:
+            # Outside Maya the journal is the only undo history.
+            pass
+        except Exception as e:
+            print(f"Warning: Could not add {transaction.label} to Maya's undo queue: {str(e)}")
+
+    def shutdown(self):
+        self.cancel_traversal(wait=True)
+        self.wait_for_cache_validator()
+        self.journal.clear()
+        self.sessions.clear()
+        if self.stage_text_panel:
+            self.stage_text_panel.set_stage(None)
+        if self.selection_job is not None:
+            usdMayaBridge.kill_job(self.selection_job)
+            self.selection_job = None
 
 
 class UsdPrimEditorWindow(QtWidgets.QMainWindow):
@@ -466,6 +1350,10 @@ class UsdPrimEditorWindow(QtWidgets.QMainWindow):
         super().__init__(parent)
         self.setCentralWidget(UsdPrimEditor())
 
+    def closeEvent(self, event):
+        self.centralWidget().shutdown()
+        super().closeEvent(event)
+
 
 def show_usd_prim_editor():
     global usd_prim_editor
@@ -0,0 +1,147 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from collections import deque, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class TimingRecord:
+    operation: str
+    seconds: float
+    count: int
+    allocated: int
+    timestamp: float
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Profiler:
+    # Opt-in: while disabled, a decorated call costs one attribute check.
+    CAPACITY = 10000
+    PROFILE_LINES = 40
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.enabled = False
+        self.track_allocations = False
+        # Whether tracemalloc was started here; tracing started by another tool is left running.
+        self._started_tracing = False
+        self.records = deque(maxlen=capacity)
+        self.last_profile = ""
+        self._profile_operation: Optional[str] = None
+
+    def enable(self, track_allocations: bool = False) -> None:
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self.track_allocations = False
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def capture_next(self, operation: str) -> None:
+        # The next call of this operation runs under cProfile; the report lands in last_profile.
+        self._profile_operation = operation
+
+    @contextmanager
+    def measure(self, operation: str, count: int = 0):
+        if not self.enabled:
+            yield None
+            return
+
+        record = TimingRecord(operation, 0.0, count, 0, time.time())
+        profile = None
+        if self._profile_operation == operation:
+            self._profile_operation = None
+            profile = cProfile.Profile()
+        allocated_before = tracemalloc.get_traced_memory()[0] if self.track_allocations else 0
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile:
+                profile.disable()
+                self.last_profile = self._format_profile(operation, profile)
+            record.seconds = time.perf_counter() - start
+            if self.track_allocations:
+                record.allocated = tracemalloc.get_traced_memory()[0] - allocated_before
+            self.records.append(record)
+
+    def record(self, operation: str, seconds: float, count: int = 0) -> None:
+        if self.enabled:
+            self.records.append(TimingRecord(operation, seconds, count, 0, time.time()))
+
+    def timed(self, operation: Optional[str] = None, count: Optional[Callable[[object], int]] = None):
+        # `count` maps the return value to the number of prims (or items) the call handled.
+        def decorator(func):
+            name = operation or f"{func.__module__.rpartition('.')[2]}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.measure(name) as record:
+                    result = func(*args, **kwargs)
+                    if count is not None and result is not None:
+                        record.count = count(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def summary(self) -> Dict[str, dict]:
+        by_operation = defaultdict(list)
+        for record in list(self.records):
+            by_operation[record.operation].append(record)
+
+        summary = {}
+        for operation, records in sorted(by_operation.items()):
+            seconds = sorted(record.seconds for record in records)
+            summary[operation] = {
+                'calls': len(records),
+                'p50': _percentile(seconds, 0.5),
+                'p95': _percentile(seconds, 0.95),
+                'max': seconds[-1],
+                'total': sum(seconds),
+                'count': sum(record.count for record in records),
+                'allocated': sum(record.allocated for record in records),
+            }
+        return summary
+
+    def dump_json(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'records': [asdict(record) for record in self.records],
+                       'profile': self.last_profile}, f, indent=2)
+
+    def _format_profile(self, operation: str, profile: cProfile.Profile) -> str:
+        stream = io.StringIO()
+        stream.write(f"{operation}\n")
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.PROFILE_LINES)
+        return stream.getvalue()
+
+
+PROFILER = Profiler()
+timed = PROFILER.timed
+measure = PROFILER.measure
+
+if os.environ.get('USD_VIEWER_CHANGER_PROFILE'):
+    PROFILER.enable(track_allocations=os.environ['USD_VIEWER_CHANGER_PROFILE'] == 'alloc')
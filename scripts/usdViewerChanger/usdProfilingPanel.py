@@ -0,0 +1,92 @@
+from PySide2 import QtWidgets, QtCore
+from .usdProfiling import PROFILER
+
+
+class ProfilingPanel(QtWidgets.QWidget):
+    HEADERS = ['Operation', 'Calls', 'p50 ms', 'p95 ms', 'Max ms', 'Items', 'Alloc KB']
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.enable_check = QtWidgets.QCheckBox("Record")
+        self.enable_check.setChecked(PROFILER.enabled)
+        self.allocations_check = QtWidgets.QCheckBox("Track Allocations")
+        self.allocations_check.setChecked(PROFILER.track_allocations)
+        self.profile_combo = QtWidgets.QComboBox()
+        self.profile_combo.addItems(['editor.refresh_tree_view', 'editor.update_property_editors',
+                                     'editor.update_stage_text', 'editor.apply_filter'])
+        self.profile_button = QtWidgets.QPushButton("Profile Next")
+        self.clear_button = QtWidgets.QPushButton("Clear")
+        self.dump_button = QtWidgets.QPushButton("Dump JSON...")
+
+        header_layout = QtWidgets.QHBoxLayout()
+        header_layout.addWidget(self.enable_check)
+        header_layout.addWidget(self.allocations_check)
+        header_layout.addStretch()
+        header_layout.addWidget(self.profile_combo)
+        header_layout.addWidget(self.profile_button)
+        header_layout.addWidget(self.clear_button)
+        header_layout.addWidget(self.dump_button)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.profile_text = QtWidgets.QPlainTextEdit()
+        self.profile_text.setReadOnly(True)
+        self.profile_text.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.table)
+        layout.addWidget(self.profile_text)
+
+        # Polls only while visible.
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+        self.enable_check.toggled.connect(self.set_recording)
+        self.allocations_check.toggled.connect(lambda _: self.set_recording(self.enable_check.isChecked()))
+        self.profile_button.clicked.connect(lambda: PROFILER.capture_next(self.profile_combo.currentText()))
+        self.clear_button.clicked.connect(self.clear)
+        self.dump_button.clicked.connect(self.dump_json)
+
+    def set_recording(self, enabled):
+        PROFILER.disable()
+        if enabled:
+            PROFILER.enable(self.allocations_check.isChecked())
+
+    def clear(self):
+        PROFILER.clear()
+        self.refresh()
+
+    def dump_json(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Dump Timings", "usdPrimEditorTimings.json",
+                                                        "JSON (*.json)")
+        if path:
+            PROFILER.dump_json(path)
+
+    def refresh(self):
+        summary = PROFILER.summary()
+        self.table.setRowCount(len(summary))
+        for row, (operation, stats) in enumerate(summary.items()):
+            values = [operation, str(stats['calls']), f"{stats['p50'] * 1000:.2f}", f"{stats['p95'] * 1000:.2f}",
+                      f"{stats['max'] * 1000:.2f}", str(stats['count']), f"{stats['allocated'] / 1024:.1f}"]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+        if PROFILER.last_profile != self.profile_text.toPlainText():
+            self.profile_text.setPlainText(PROFILER.last_profile)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from PySide2 import QtCore
+from pxr import Usd, Sdf
+from .usdTreeModel import UsdTreeModel
+from .usdStageWatcher import UsdStageWatcher
+from .usdUtils import (
+    CompositionQueryCache, GeometryStatsCache, PayloadManager, PrimSearchIndex, StageScope, VariantExplorer,
+    open_scoped_stage
+)
+
+
+class StageSession(QtCore.QObject):
+    # Everything the editor builds for one stage. Inactive sessions keep listening to their stage, so switching
+    # back only has to restore the view.
+    def __init__(self, stage: Usd.Stage, max_loaded: int = 0, scope: StageScope = StageScope(), parent=None):
+        super().__init__(parent)
+        # source_stage is the proxy shape's stage; stage is what the editor works on, masked when the scope is.
+        self.source_stage = stage
+        self.scope = scope
+        self.predicate = scope.predicate()
+        stage = open_scoped_stage(stage, scope)
+        self.stage = stage
+        self.tree_model = UsdTreeModel(stage, self.predicate, scope.instancing)
+        self.search_index = PrimSearchIndex(self.predicate)
+        self.geometry_stats = GeometryStatsCache(stage, self.predicate)
+        self.tree_model.stats = self.geometry_stats
+        self.payload_manager = PayloadManager(stage, max_loaded, self.source_stage)
+        self.composition_cache = CompositionQueryCache(stage)
+        self.variant_explorer = VariantExplorer(stage)
+        self.watcher = UsdStageWatcher(stage, self)
+        self.watcher.stageChanged.connect(self.on_stage_changed)
+        self.expanded_paths: List[Sdf.Path] = []
+        self.selected_paths: List[Sdf.Path] = []
+        self.filter_text = ""
+        # True once a traversal has fed every prim into the model and the search index.
+        self.indexed = False
+        self.active = False
+
+    def on_stage_changed(self, resynced_paths, info_changed_paths):
+        self.composition_cache.invalidate(resynced_paths)
+        self.variant_explorer.invalidate(resynced_paths)
+        self.geometry_stats.invalidate(resynced_paths, info_changed_paths)
+        # The editor updates the active session's model and index itself.
+        if not self.active:
+            self.tree_model.apply_stage_changes(resynced_paths, info_changed_paths)
+            self.search_index.apply_stage_changes(self.stage, resynced_paths, info_changed_paths)
+
+    def prim_count(self) -> int:
+        return max(len(self.tree_model.prim_info), len(self.search_index))
+
+    def close(self):
+        self.watcher.revoke()
+        self.variant_explorer.clear()
+        self.deleteLater()
+
+
+def stage_key(stage: Usd.Stage, scope: StageScope = StageScope()) -> Tuple:
+    return stage.GetRootLayer().identifier, stage.GetSessionLayer().identifier, scope.key()
+
+
+class StageSessionCache:
+    # LRU over sessions, bounded by session count and by the total number of cached prim records.
+    MAX_SESSIONS = 4
+    MAX_CACHED_PRIMS = 2000000
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, max_cached_prims: int = MAX_CACHED_PRIMS):
+        self.max_sessions = max_sessions
+        self.max_cached_prims = max_cached_prims
+        self._sessions: "OrderedDict[Tuple, StageSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, stage: Usd.Stage, scope: StageScope = StageScope()) -> Optional[StageSession]:
+        key = stage_key(stage, scope)
+        session = self._sessions.get(key)
+        if session is None:
+            return None
+        if session.source_stage != stage:
+            # Same layers, different stage (e.g. the proxy shape reloaded it): nothing cached is valid.
+            del self._sessions[key]
+            session.close()
+            return None
+        self._sessions.move_to_end(key)
+        return session
+
+    def add(self, session: StageSession) -> None:
+        key = stage_key(session.source_stage, session.scope)
+        previous = self._sessions.pop(key, None)
+        if previous is not None and previous is not session:
+            previous.close()
+        self._sessions[key] = session
+        self.evict(keep=session)
+
+    def evict(self, keep: Optional[StageSession] = None) -> None:
+        def over_budget():
+            total = sum(session.prim_count() for session in self._sessions.values())
+            return len(self._sessions) > self.max_sessions or total > self.max_cached_prims
+
+        for key in list(self._sessions):
+            if not over_budget():
+                break
+            session = self._sessions[key]
+            if session is keep or session.active:
+                continue
+            del self._sessions[key]
+            session.close()
+
+    def clear(self) -> None:
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
@@ -0,0 +1,140 @@
+from typing import Optional
+
+from PySide2 import QtWidgets
+from pxr import Usd, Sdf
+from .usdUtils import LayerTextCache
+
+
+class StageTextPanel(QtWidgets.QWidget):
+    MODE_LAYER = "Root Layer"
+    MODE_PRIM = "Selected Prim"
+    # Pages are cut at the first line break after this many characters.
+    PAGE_SIZE = 200000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stage = None
+        self.text_cache = None
+        self.prim_path = None
+        # With a scoped editor, "Root Layer" shows only the specs under the scope root.
+        self.scope_root = Sdf.Path.absoluteRootPath
+        self._text = ""
+        self._text_root_path = Sdf.Path.absoluteRootPath
+        self._page = 0
+        self._displayed_key = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.mode_combo = QtWidgets.QComboBox()
+        self.mode_combo.addItems([self.MODE_LAYER, self.MODE_PRIM])
+        self.prev_page_button = QtWidgets.QPushButton("<")
+        self.next_page_button = QtWidgets.QPushButton(">")
+        self.page_label = QtWidgets.QLabel()
+
+        header_layout = QtWidgets.QHBoxLayout()
+        header_layout.addWidget(self.mode_combo)
+        header_layout.addStretch()
+        header_layout.addWidget(self.prev_page_button)
+        header_layout.addWidget(self.page_label)
+        header_layout.addWidget(self.next_page_button)
+
+        self.text_edit = QtWidgets.QPlainTextEdit()
+        self.text_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.update_stage_button = QtWidgets.QPushButton("Update Stage")
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header_layout)
+        layout.addWidget(self.text_edit)
+        layout.addWidget(self.update_stage_button)
+
+        self.mode_combo.currentTextChanged.connect(lambda _: self.refresh())
+        self.prev_page_button.clicked.connect(lambda: self.show_page(self._page - 1))
+        self.next_page_button.clicked.connect(lambda: self.show_page(self._page + 1))
+
+    def set_stage(self, stage: Usd.Stage, scope_root: Sdf.Path = Sdf.Path.absoluteRootPath):
+        if self.text_cache:
+            self.text_cache.revoke()
+        self.stage = stage
+        self.scope_root = scope_root
+        self.text_cache = LayerTextCache(stage.GetRootLayer()) if stage else None
+        self._displayed_key = None
+        self.refresh()
+
+    def set_prim_path(self, prim_path: Optional[Sdf.Path]):
+        self.prim_path = prim_path
+        if self.is_prim_mode():
+            self.refresh()
+
+    def is_prim_mode(self) -> bool:
+        return self.mode_combo.currentText() == self.MODE_PRIM
+
+    def text(self) -> str:
+        # The full text, with edits made on the shown page.
+        self.store_page_edits()
+        return self._text
+
+    def store_page_edits(self):
+        document = self.text_edit.document()
+        if not document.isModified():
+            return
+        start, end = self.page_start(self._page), self.page_start(self._page + 1)
+        page_text = self.text_edit.toPlainText()
+        if end < len(self._text) and not page_text.endswith('\n'):
+            # Keeps the next page's first line from being joined onto this page's last one.
+            page_text += '\n'
+        self._text = self._text[:start] + page_text + self._text[end:]
+        document.setModified(False)
+
+    def text_root_path(self) -> Sdf.Path:
+        # The spec subtree the displayed text covers, so applying it leaves the rest of the layer untouched.
+        return self._text_root_path
+
+    def refresh(self):
+        # Exporting is deferred until the panel is actually on screen.
+        if not self.isVisible() or not self.text_cache:
+            return
+
+        if self.is_prim_mode():
+            prim_path = self.prim_path
+        else:
+            prim_path = None if self.scope_root == Sdf.Path.absoluteRootPath else self.scope_root
+        if self.is_prim_mode() and prim_path is None:
+            key = None
+            self._text = ""
+        else:
+            key = (prim_path, self.text_cache.change_count)
+            if key == self._displayed_key:
+                return
+            self._text = self.text_cache.get_text(prim_path)
+
+        # Freshly exported text replaces any unapplied edits.
+        self.text_edit.document().setModified(False)
+        self._displayed_key = key
+        self._text_root_path = prim_path or Sdf.Path.absoluteRootPath
+        self.show_page(0)
+
+    def page_count(self) -> int:
+        return max(1, -(-len(self._text) // self.PAGE_SIZE))
+
+    def page_start(self, page: int) -> int:
+        if page <= 0:
+            return 0
+        if page >= self.page_count():
+            return len(self._text)
+        newline = self._text.find('\n', page * self.PAGE_SIZE)
+        return len(self._text) if newline < 0 else newline + 1
+
+    def show_page(self, page: int):
+        self.store_page_edits()
+        page = max(0, min(page, self.page_count() - 1))
+        self._page = page
+        self.text_edit.setPlainText(self._text[self.page_start(page):self.page_start(page + 1)])
+        self.text_edit.document().setModified(False)
+        self.page_label.setText(f"Page {page + 1} / {self.page_count()}")
+        self.prev_page_button.setEnabled(page > 0)
+        self.next_page_button.setEnabled(page < self.page_count() - 1)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
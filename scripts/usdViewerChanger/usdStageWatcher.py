@@ -0,0 +1,44 @@
+from typing import Set
+
+from PySide2 import QtCore
+from pxr import Usd, Sdf, Tf
+
+
+class UsdStageWatcher(QtCore.QObject):
+    # Emitted at most once per event-loop tick with the batched (resynced, info-only) paths.
+    stageChanged = QtCore.Signal(object, object)
+
+    def __init__(self, stage: Usd.Stage, parent=None):
+        super().__init__(parent)
+        self.stage = stage
+        self._resynced: Set[Sdf.Path] = set()
+        self._info_changed: Set[Sdf.Path] = set()
+        self._flush_pending = False
+        self._listener = Tf.Notice.Register(Usd.Notice.ObjectsChanged, self._on_objects_changed, stage)
+
+    def revoke(self):
+        if self._listener:
+            self._listener.Revoke()
+            self._listener = None
+        self._resynced.clear()
+        self._info_changed.clear()
+
+    def _on_objects_changed(self, notice, sender):
+        self._resynced.update(notice.GetResyncedPaths())
+        self._info_changed.update(notice.GetChangedInfoOnlyPaths())
+        if not self._flush_pending:
+            self._flush_pending = True
+            QtCore.QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        self._flush_pending = False
+        if not self._listener:
+            return
+
+        resynced = Sdf.Path.RemoveDescendentPaths(list(self._resynced))
+        info_changed = [path for path in self._info_changed
+                        if not any(path.HasPrefix(resynced_path) for resynced_path in resynced)]
+        self._resynced.clear()
+        self._info_changed.clear()
+        if resynced or info_changed:
+            self.stageChanged.emit(resynced, info_changed)
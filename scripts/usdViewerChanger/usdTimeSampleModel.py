@@ -0,0 +1,158 @@
+from typing import List, Optional
+
+from PySide2 import QtCore
+from pxr import Usd, Gf
+from .usdUtils import TimeSampleSummary, get_time_sample_summaries
+
+
+class _SampledAttribute:
+    __slots__ = ('row', 'attr', 'summary', 'times', 'fetched', 'samples')
+
+    def __init__(self, row: int, attr: Usd.Attribute, summary: TimeSampleSummary):
+        self.row = row
+        self.attr = attr
+        self.summary = summary
+        # Sample times inside the frame window, listed on first expand.
+        self.times: Optional[List[float]] = None
+        self.fetched = 0
+        self.samples = _SampleRows(self)
+
+
+class _SampleRows:
+    # Internal pointer shared by the sample rows of one attribute.
+    __slots__ = ('owner',)
+
+    def __init__(self, owner: _SampledAttribute):
+        self.owner = owner
+
+
+class UsdTimeSampleModel(QtCore.QAbstractItemModel):
+    HEADERS = ['Attribute', 'Time', 'Value']
+    PAGE_SIZE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.prim = None
+        self.start_time = -float('inf')
+        self.end_time = float('inf')
+        self._rows: List[_SampledAttribute] = []
+
+    def set_prim(self, prim: Optional[Usd.Prim]):
+        self.beginResetModel()
+        self.prim = prim
+        self._rows = []
+        if prim:
+            for summary in get_time_sample_summaries(prim):
+                self._rows.append(_SampledAttribute(len(self._rows), prim.GetAttribute(summary.name), summary))
+        self.endResetModel()
+
+    def set_window(self, start_time: float, end_time: float):
+        self.beginResetModel()
+        self.start_time = start_time
+        self.end_time = end_time
+        for sampled in self._rows:
+            sampled.times = None
+            sampled.fetched = 0
+        self.endResetModel()
+
+    def attribute(self, index: QtCore.QModelIndex) -> Optional[Usd.Attribute]:
+        sampled = self._sampled_attribute(index)
+        return sampled.attr if sampled else None
+
+    def sample_time(self, index: QtCore.QModelIndex) -> Optional[float]:
+        if not index.isValid() or not isinstance(index.internalPointer(), _SampleRows):
+            return None
+        return self._sampled_attribute(index).times[index.row()]
+
+    def attributes(self) -> List[Usd.Attribute]:
+        return [sampled.attr for sampled in self._rows]
+
+    def _sampled_attribute(self, index: QtCore.QModelIndex) -> Optional[_SampledAttribute]:
+        if not index.isValid():
+            return None
+        pointer = index.internalPointer()
+        return pointer.owner if isinstance(pointer, _SampleRows) else pointer
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if column < 0 or column >= len(self.HEADERS):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            if 0 <= row < len(self._rows):
+                return self.createIndex(row, column, self._rows[row])
+            return QtCore.QModelIndex()
+
+        pointer = parent.internalPointer()
+        if isinstance(pointer, _SampledAttribute) and 0 <= row < pointer.fetched:
+            return self.createIndex(row, column, pointer.samples)
+        return QtCore.QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        pointer = index.internalPointer()
+        if isinstance(pointer, _SampleRows):
+            return self.createIndex(pointer.owner.row, 0, pointer.owner)
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._rows)
+        pointer = parent.internalPointer()
+        if parent.column() == 0 and isinstance(pointer, _SampledAttribute):
+            return pointer.fetched
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return bool(self._rows)
+        return isinstance(parent.internalPointer(), _SampledAttribute)
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return False
+        pointer = parent.internalPointer()
+        if not isinstance(pointer, _SampledAttribute):
+            return False
+        if pointer.times is None:
+            interval = Gf.Interval(self.start_time, self.end_time)
+            pointer.times = list(pointer.attr.GetTimeSamplesInInterval(interval))
+        return pointer.fetched < len(pointer.times)
+
+    def fetchMore(self, parent):
+        pointer = parent.internalPointer()
+        first = pointer.fetched
+        last = min(first + self.PAGE_SIZE, len(pointer.times)) - 1
+        if last < first:
+            return
+        self.beginInsertRows(parent, first, last)
+        pointer.fetched = last + 1
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+
+        pointer = index.internalPointer()
+        if isinstance(pointer, _SampleRows):
+            time = pointer.owner.times[index.row()]
+            if index.column() == 1:
+                return str(time)
+            if index.column() == 2:
+                # Values are only resolved for rows that are painted.
+                return str(pointer.owner.attr.Get(time))
+            return ""
+
+        summary = pointer.summary
+        if index.column() == 0:
+            return summary.name
+        if index.column() == 1:
+            return f"{summary.first_time} - {summary.last_time}"
+        return f"{summary.count} samples, {summary.interpolation}"
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pxr import Usd, Sdf
+from .usdProfiling import timed
+from .usdUtils import PrimRecord, StageScope
+
+# File layout, all little-endian:
+#   header, JSON layer stamps, (string count + 1) u32 string offsets, UTF-8 string blob,
+#   records in traversal order (parents before children), variant selection pairs of string ids.
+MAGIC = b'UVTC'
+VERSION = 1
+HEADER = struct.Struct('<4sIIIIII')
+OFFSET = struct.Struct('<I')
+# parent record, name, type, kind, purpose, instancing, first variant pair, variant pair count, has payload
+RECORD = struct.Struct('<iIIIIIIIB')
+PAIR = struct.Struct('<II')
+
+CACHE_DIR_ENV = 'USD_VIEWER_CHANGER_CACHE_DIR'
+
+
+def default_cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser('~'), '.cache', 'usdViewerChanger')
+
+
+def _load_rules_key(stage: Usd.Stage) -> List[Tuple[str, str]]:
+    return [(str(path), str(rule)) for path, rule in stage.GetLoadRules().GetRules()]
+
+
+def cache_file_path(stage: Usd.Stage, scope: StageScope, directory: Optional[str] = None) -> str:
+    # Names the cache by what decides the traversal's result apart from layer contents: the root layer, the load
+    # rules, the population mask and the scope's predicate. Layer contents are checked through the stamps.
+    identity = json.dumps([VERSION, stage.GetRootLayer().identifier, _load_rules_key(stage),
+                           [str(path) for path in stage.GetPopulationMask().GetPaths()], scope.key()])
+    name = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+    return os.path.join(directory or default_cache_dir(), f"{name}.uvtc")
+
+
+def layer_stamps(stage: Usd.Stage) -> Optional[List[list]]:
+    # One [identifier, mtime_ns, size] per used layer, or None when a layer has unsaved edits. Anonymous layers
+    # (usually the session layer) get new identifiers every session, so they are stamped by content instead.
+    stamps = []
+    for layer in stage.GetUsedLayers():
+        if layer.dirty and not layer.anonymous:
+            return None
+        if layer.anonymous:
+            text = layer.ExportToString()
+            stamps.append(['anon:' + layer.GetDisplayName(), -1, zlib.crc32(text.encode('utf-8'))])
+            continue
+        try:
+            stat = os.stat(layer.realPath)
+            stamps.append([layer.identifier, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            stamps.append([layer.identifier, -1, -1])
+    stamps.sort()
+    return stamps
+
+
+@dataclass
+class TraversalCacheData:
+    stamps: List[list]
+    records: List[Tuple[Sdf.Path, PrimRecord]]
+
+
+@timed(count=int)
+def save_traversal_cache(path: str, stamps: List[list], records: Iterable[Tuple[Sdf.Path, PrimRecord]]) -> int:
+    strings: Dict[str, int] = {}
+
+    def string_id(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    record_ids: Dict[Sdf.Path, int] = {}
+    packed_records = bytearray()
+    packed_pairs = bytearray()
+    pair_count = 0
+    for prim_path, record in records:
+        parent = -1 if prim_path == Sdf.Path.absoluteRootPath else record_ids.get(prim_path.GetParentPath())
+        if parent is None:
+            # Only whole hierarchies can be rebuilt from parent links.
+            continue
+        record_ids[prim_path] = len(record_ids)
+        for name, selection in record.variant_selections:
+            packed_pairs += PAIR.pack(string_id(name), string_id(selection))
+        packed_records += RECORD.pack(parent, string_id(record.name), string_id(record.type_name),
+                                      string_id(record.kind), string_id(record.purpose),
+                                      string_id(record.instancing), pair_count, len(record.variant_selections),
+                                      record.has_payload)
+        pair_count += len(record.variant_selections)
+
+    blob = bytearray()
+    offsets = bytearray()
+    for text in strings:
+        offsets += OFFSET.pack(len(blob))
+        blob += text.encode('utf-8')
+    offsets += OFFSET.pack(len(blob))
+
+    stamps_blob = json.dumps(stamps).encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(stamps_blob), len(strings), len(blob), len(record_ids), pair_count))
+        f.write(stamps_blob)
+        f.write(offsets)
+        f.write(blob)
+        f.write(packed_records)
+        f.write(packed_pairs)
+    # Readers see either the old file or the complete new one.
+    os.replace(temp_path, path)
+    return len(record_ids)
+
+
+@timed(count=lambda data: len(data.records))
+def load_traversal_cache(path: str) -> Optional[TraversalCacheData]:
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _read_cache(mapped)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        print(f"Warning: ignoring unreadable traversal cache {path}: {str(e)}")
+        return None
+
+
+def _unpack_all(mapped: mmap.mmap, layout: struct.Struct, position: int, count: int) -> List[tuple]:
+    # Unpacks straight from the mapping; the view is released before the mapping is closed.
+    with memoryview(mapped) as view, view[position:position + count * layout.size] as part:
+        return list(layout.iter_unpack(part))
+
+
+def _read_cache(mapped: mmap.mmap) -> Optional[TraversalCacheData]:
+    magic, version, stamps_size, string_count, blob_size, record_count, pair_count = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    position = HEADER.size
+    stamps = json.loads(mapped[position:position + stamps_size].decode('utf-8'))
+    position += stamps_size
+
+    offsets = [offset for offset, in _unpack_all(mapped, OFFSET, position, string_count + 1)]
+    position += (string_count + 1) * OFFSET.size
+    blob = mapped[position:position + blob_size]
+    position += blob_size
+    strings = [sys.intern(blob[offsets[i]:offsets[i + 1]].decode('utf-8')) for i in range(string_count)]
+
+    packed_records = _unpack_all(mapped, RECORD, position, record_count)
+    position += record_count * RECORD.size
+    pairs = [(strings[name], strings[selection]) for name, selection in _unpack_all(mapped, PAIR, position, pair_count)]
+
+    paths: List[Sdf.Path] = []
+    records = []
+    for parent, name, type_name, kind, purpose, instancing, first_pair, pair_total, has_payload in packed_records:
+        prim_path = Sdf.Path.absoluteRootPath if parent < 0 else paths[parent].AppendChild(strings[name])
+        paths.append(prim_path)
+        records.append((prim_path, PrimRecord(strings[name], strings[type_name], strings[kind], strings[purpose],
+                                              tuple(pairs[first_pair:first_pair + pair_total]),
+                                              bool(has_payload), strings[instancing])))
+    return TraversalCacheData(stamps, records)
+
+
+def is_cache_valid(stage: Usd.Stage, stamps: List[list]) -> bool:
+    current = layer_stamps(stage)
+    return current is not None and current == stamps
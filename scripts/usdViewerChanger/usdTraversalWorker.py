@@ -0,0 +1,71 @@
+import threading
+
+from PySide2 import QtCore
+from pxr import Usd, Sdf
+from .usdUtils import CHILD_PRIM_PREDICATE, extract_prim_record, iter_stage_prims
+from .usdTraversalCache import is_cache_valid
+
+
+class PrimTraversalThread(QtCore.QThread):
+    # Signals carry the emitting thread so receivers can drop batches from a superseded traversal.
+    batchReady = QtCore.Signal(object, object)
+    progress = QtCore.Signal(object, int)
+    completed = QtCore.Signal(object, int)
+
+    BATCH_SIZE = 2000
+
+    def __init__(self, stage: Usd.Stage, root_path: Sdf.Path = Sdf.Path.absoluteRootPath,
+                 predicate=CHILD_PRIM_PREDICATE, include_prototypes=False, parent=None):
+        super().__init__(parent)
+        self.stage = stage
+        self.root_path = root_path
+        self.predicate = predicate
+        self.include_prototypes = include_prototypes
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self):
+        if not self.stage.GetPrimAtPath(self.root_path):
+            return
+
+        batch = []
+        count = 0
+        for prim in iter_stage_prims(self.stage, self.predicate, self.root_path, self.include_prototypes):
+            if self._cancelled.is_set():
+                return
+            batch.append((prim.GetPath(), extract_prim_record(prim)))
+            if len(batch) >= self.BATCH_SIZE:
+                count += len(batch)
+                self.batchReady.emit(self, batch)
+                self.progress.emit(self, count)
+                batch = []
+
+        if self._cancelled.is_set():
+            return
+        if batch:
+            count += len(batch)
+            self.batchReady.emit(self, batch)
+        self.completed.emit(self, count)
+
+
+class TraversalCacheValidator(QtCore.QThread):
+    # Re-stamps the stage's layers off the main thread while the editor already shows the cached traversal.
+    validated = QtCore.Signal(object, bool)
+
+    def __init__(self, stage: Usd.Stage, stamps, parent=None):
+        super().__init__(parent)
+        self.stage = stage
+        self.stamps = stamps
+
+    def run(self):
+        try:
+            valid = is_cache_valid(self.stage, self.stamps)
+        except Exception as e:
+            print(f"Error validating traversal cache: {str(e)}")
+            valid = False
+        self.validated.emit(self, valid)
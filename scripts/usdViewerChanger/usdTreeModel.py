@@ -1,43 +1,396 @@
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
 
-from PySide2 import QtGui, QtCore
-from pxr import Usd
-from .usdUtils import get_prim_info, get_child_prims, PrimInfo, get_variant_sets, has_payload
+from PySide2 import QtCore
+from pxr import Usd, Sdf
+from .usdUtils import (
+    CHILD_PRIM_PREDICATE, PRIM_COLUMNS, STATS_COLUMNS, GeometryStatsCache, PrimInfoCache, PrimRecord,
+    get_child_prim_paths
+)
 
 
-class UsdTreeModel(QtGui.QStandardItemModel):
-    def __init__(self, stage: Usd.Stage):
-        super().__init__()
+class _PrimNode:
+    __slots__ = ('path', 'parent', 'row', 'children', 'child_paths', 'child_rows')
+
+    def __init__(self, path: Sdf.Path, parent: Optional['_PrimNode'], row: int):
+        self.path = path
+        self.parent = parent
+        self.row = row
+        self.children: List['_PrimNode'] = []
+        # None until the children of this prim have been listed.
+        self.child_paths: Optional[List[Sdf.Path]] = None
+        # Path -> row lookup over child_paths, built only when a specific child has to be located.
+        self.child_rows: Optional[Dict[Sdf.Path, int]] = None
+
+
+class UsdTreeModel(QtCore.QAbstractItemModel):
+    HEADERS = list(PRIM_COLUMNS) + list(STATS_COLUMNS)
+    FIRST_STATS_COLUMN = len(PRIM_COLUMNS)
+    # Numeric value of a cell, used by the proxy model to sort stats columns.
+    SORT_ROLE = QtCore.Qt.UserRole + 1
+    FETCH_BATCH_SIZE = 500
+
+    def __init__(self, stage: Usd.Stage, predicate=CHILD_PRIM_PREDICATE, instancing=False, parent=None):
+        super().__init__(parent)
         self.stage = stage
-        self.setHorizontalHeaderLabels(['Prim Name', 'Type', 'Kind', 'Purpose', 'Variant Sets', 'Has Payload'])
-        self.populate_model()
-
-    def populate_model(self):
-        root_prim = self.stage.GetPseudoRoot()
-        self.populate_prim(root_prim, self.invisibleRootItem())
-
-    def populate_prim(self, prim: Usd.Prim, parent_item: QtGui.QStandardItem):
-        prim_info = get_prim_info(prim)
-        items = self.create_row(prim_info, prim)
-        parent_item.appendRow(items)
-
-        for child_prim in get_child_prims(prim):
-            self.populate_prim(child_prim, items[0])
-
-    def create_row(self, prim_info: PrimInfo, prim: Usd.Prim) -> List[QtGui.QStandardItem]:
-        name_item = QtGui.QStandardItem(prim_info.name)
-        name_item.setData(str(prim_info.path), QtCore.Qt.UserRole)
-
-        variant_sets = get_variant_sets(prim)
-        variant_sets_str = ", ".join([f"{vs.name}: {vs.current_selection}" for vs in variant_sets])
-
-        has_payload_str = "Yes" if has_payload(prim) else "No"
-
-        return [
-            name_item,
-            QtGui.QStandardItem(prim_info.type_name),
-            QtGui.QStandardItem(prim_info.kind),
-            QtGui.QStandardItem(prim_info.purpose),
-            QtGui.QStandardItem(variant_sets_str),
-            QtGui.QStandardItem(has_payload_str)
-        ]
+        self.predicate = predicate
+        # Prototypes are listed once as extra top-level rows, and instances expand into their proxies on demand.
+        self.instancing = instancing
+        self.proxy_predicate = Usd.TraverseInstanceProxies(predicate)
+        self.prim_info = PrimInfoCache(stage, predicate)
+        # Subtree geometry stats, only read here; the owner decides when to compute them.
+        self.stats: Optional[GeometryStatsCache] = None
+        self._root = _PrimNode(Sdf.Path.emptyPath, None, 0)
+        self._root.child_paths = self._query_child_paths(self._root)
+        self._nodes = {}
+
+    def node_from_index(self, index: QtCore.QModelIndex) -> _PrimNode:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def index_for_node(self, node: _PrimNode, column: int = 0) -> QtCore.QModelIndex:
+        if node is self._root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, column, node)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self.node_from_index(parent)
+        if row < 0 or row >= len(node.children) or column < 0 or column >= len(self.HEADERS):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.index_for_node(index.internalPointer().parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node_from_index(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        node = self.node_from_index(parent)
+        return bool(node.children) or bool(self._list_children(node))
+
+    def canFetchMore(self, parent):
+        node = self.node_from_index(parent)
+        return len(node.children) < len(self._list_children(node))
+
+    def fetchMore(self, parent):
+        node = self.node_from_index(parent)
+        self._fetch_rows(node, len(node.children) + self.FETCH_BATCH_SIZE)
+
+    def _fetch_rows(self, node: _PrimNode, row_count: int):
+        child_paths = self._list_children(node)
+        first = len(node.children)
+        last = min(row_count, len(child_paths)) - 1
+        if last < first:
+            return
+
+        self.beginInsertRows(self.index_for_node(node), first, last)
+        for row in range(first, last + 1):
+            child = _PrimNode(child_paths[row], node, row)
+            node.children.append(child)
+            self._nodes[child.path] = child
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+        if role == QtCore.Qt.UserRole:
+            return str(node.path)
+        if index.column() >= self.FIRST_STATS_COLUMN:
+            if role == QtCore.Qt.DisplayRole:
+                return self.stats_text(node.path, index.column())
+            if role == self.SORT_ROLE:
+                return self.stats_value(node.path, index.column())
+            if role == QtCore.Qt.TextAlignmentRole:
+                return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+            return None
+        if role not in (QtCore.Qt.DisplayRole, self.SORT_ROLE):
+            return None
+
+        record = self.prim_info.get(node.path)
+        if record is None:
+            return None
+        return self.column_text(record, index.column())
+
+    def column_text(self, record: PrimRecord, column: int) -> str:
+        return record.column_text(column)
+
+    def stats_value(self, path: Sdf.Path, column: int) -> float:
+        stats = self.stats.subtree_stats(path) if self.stats else None
+        if stats is None:
+            return -1
+        column -= self.FIRST_STATS_COLUMN
+        if column == 0:
+            return stats.point_count
+        if column == 1:
+            return stats.face_count
+        if column == 2:
+            return stats.primvar_bytes
+        bounds = self.stats.world_bounds(path)
+        return bounds.GetSize().GetLength() if bounds is not None and not bounds.IsEmpty() else 0
+
+    def stats_text(self, path: Sdf.Path, column: int) -> Optional[str]:
+        stats = self.stats.subtree_stats(path) if self.stats else None
+        if stats is None:
+            return None
+        if column - self.FIRST_STATS_COLUMN == 3:
+            bounds = self.stats.world_bounds(path)
+            if bounds is None or bounds.IsEmpty():
+                return ""
+            return " x ".join(f"{value:.3g}" for value in bounds.GetSize())
+        value = self.stats_value(path, column)
+        if column - self.FIRST_STATS_COLUMN == 2:
+            return f"{value / 1024:,.1f}"
+        return f"{value:,}"
+
+    def stats_changed(self):
+        # One dataChanged per materialized parent, over the stats columns only.
+        first, last = self.FIRST_STATS_COLUMN, len(self.HEADERS) - 1
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            if node.children:
+                self.dataChanged.emit(self.index_for_node(node.children[0], first),
+                                      self.index_for_node(node.children[-1], last))
+                pending.extend(node.children)
+
+    def node_for_path(self, path: Sdf.Path) -> Optional[_PrimNode]:
+        return self._nodes.get(path)
+
+    def materialize_path(self, path: Sdf.Path) -> Optional[_PrimNode]:
+        node = self._nodes.get(path)
+        if node is not None:
+            return node
+
+        if self._is_top_level(path):
+            parent_node = self._root
+        elif path.IsAbsoluteRootOrPrimPath():
+            parent_node = self.materialize_path(path.GetParentPath())
+        else:
+            return None
+        if parent_node is None:
+            return None
+
+        child_paths = self._list_children(parent_node)
+        if parent_node.child_rows is None:
+            parent_node.child_rows = {child_path: row for row, child_path in enumerate(child_paths)}
+        row = parent_node.child_rows.get(path)
+        if row is None:
+            return None
+        self._fetch_rows(parent_node, row + 1)
+        return parent_node.children[row]
+
+    def add_records(self, records: List[Tuple[Sdf.Path, PrimRecord]]):
+        for path, record in records:
+            self.prim_info.store(path, record)
+            node = self._nodes.get(path)
+            if node is not None:
+                self._emit_row_changed(node)
+
+    def apply_stage_changes(self, resynced_paths: List[Sdf.Path], info_changed_paths: List[Sdf.Path]):
+        self.prim_info.invalidate(resynced_paths, info_changed_paths)
+
+        changed_prim_paths = {path.GetPrimPath() for path in info_changed_paths}
+        for path in resynced_paths:
+            if path.IsAbsoluteRootOrPrimPath():
+                self._resync_path(path)
+            else:
+                # Creating or removing a property only changes the owning row.
+                changed_prim_paths.add(path.GetPrimPath())
+
+        for path in changed_prim_paths:
+            node = self._nodes.get(path)
+            if node is not None:
+                self._emit_row_changed(node)
+
+    def _resync_path(self, path: Sdf.Path):
+        if path == Sdf.Path.absoluteRootPath:
+            # Instancing changes anywhere can add or remove prototypes.
+            parent_node = self._root if self.instancing else None
+        elif self._is_top_level(path):
+            parent_node = self._root
+        else:
+            parent_node = self._nodes.get(path.GetParentPath())
+        if parent_node is not None:
+            self._reconcile_children(parent_node)
+
+        node = self._nodes.get(path)
+        if node is not None:
+            self._emit_row_changed(node)
+            self._resync_subtree(node)
+
+    def _resync_subtree(self, node: _PrimNode):
+        self._reconcile_children(node)
+        for child in list(node.children):
+            self._emit_row_changed(child)
+            self._resync_subtree(child)
+
+    def _reconcile_children(self, node: _PrimNode):
+        if node.child_paths is None:
+            return
+
+        fully_fetched = len(node.children) == len(node.child_paths)
+        new_paths = self._query_child_paths(node)
+        parent_index = self.index_for_node(node)
+
+        new_rows = {path: row for row, path in enumerate(new_paths)}
+        for row in reversed(range(len(node.children))):
+            if node.children[row].path not in new_rows:
+                self.beginRemoveRows(parent_index, row, row)
+                self._forget(node.children.pop(row))
+                self._renumber(node, row)
+                self.endRemoveRows()
+
+        kept_rows = [new_rows[child.path] for child in node.children]
+        if kept_rows != sorted(kept_rows):
+            self._reset_children(node, new_paths)
+            return
+
+        # Keep the materialized children a prefix of child_paths, inserting new siblings in place.
+        row = 0
+        for path in new_paths:
+            if row == len(node.children):
+                if not fully_fetched or row >= len(kept_rows) + self.FETCH_BATCH_SIZE:
+                    break
+            elif node.children[row].path == path:
+                row += 1
+                continue
+
+            self.beginInsertRows(parent_index, row, row)
+            child = _PrimNode(path, node, row)
+            node.children.insert(row, child)
+            self._nodes[path] = child
+            self._renumber(node, row + 1)
+            self.endInsertRows()
+            row += 1
+
+        node.child_paths = new_paths
+        node.child_rows = None
+
+    def _reset_children(self, node: _PrimNode, child_paths: List[Sdf.Path]):
+        if node.children:
+            self.beginRemoveRows(self.index_for_node(node), 0, len(node.children) - 1)
+            for child in node.children:
+                self._forget(child)
+            node.children = []
+            self.endRemoveRows()
+        node.child_paths = child_paths
+        node.child_rows = None
+
+    def _forget(self, node: _PrimNode):
+        self._nodes.pop(node.path, None)
+        for child in node.children:
+            self._forget(child)
+
+    @staticmethod
+    def _renumber(node: _PrimNode, first_row: int):
+        for row in range(first_row, len(node.children)):
+            node.children[row].row = row
+
+    def _emit_row_changed(self, node: _PrimNode):
+        if node is self._root:
+            return
+        self.dataChanged.emit(self.index_for_node(node, 0), self.index_for_node(node, len(self.HEADERS) - 1))
+
+    def _is_top_level(self, path: Sdf.Path) -> bool:
+        return path == Sdf.Path.absoluteRootPath or (self.instancing and Usd.Prim.IsPrototypePath(path))
+
+    def _query_child_paths(self, node: _PrimNode) -> List[Sdf.Path]:
+        if node is self._root:
+            child_paths = [Sdf.Path.absoluteRootPath]
+            if self.instancing:
+                child_paths.extend(prototype.GetPath() for prototype in self.stage.GetPrototypes())
+            return child_paths
+
+        prim = self.stage.GetPrimAtPath(node.path)
+        if not prim:
+            return []
+        if self.instancing and (prim.IsInstance() or prim.IsInstanceProxy()):
+            return get_child_prim_paths(prim, self.proxy_predicate)
+        return get_child_prim_paths(prim, self.predicate)
+
+    def _list_children(self, node: _PrimNode) -> List[Sdf.Path]:
+        if node.child_paths is None:
+            node.child_paths = self._query_child_paths(node)
+        return node.child_paths
+
+
+class PrimFilterProxyModel(QtCore.QSortFilterProxyModel):
+    # Shows only the given prim paths (matches plus their ancestors) while a search is active.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._visible_paths: Optional[Set[Sdf.Path]] = None
+
+    def is_filtering(self) -> bool:
+        return self._visible_paths is not None
+
+    def set_visible_paths(self, paths: Optional[Set[Sdf.Path]]):
+        self._visible_paths = paths
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._visible_paths is None:
+            return True
+        source_model = self.sourceModel()
+        node = source_model.node_from_index(source_model.index(source_row, 0, source_parent))
+        return node.path in self._visible_paths
+
+    def canFetchMore(self, parent):
+        # Fetched rows would be filtered out anyway; don't let the view page in unrelated siblings.
+        if self._visible_paths is not None:
+            return False
+        return super().canFetchMore(parent)
+
+
+class InstanceListModel(QtCore.QAbstractListModel):
+    # The instances of one prototype, listed in pages; paths are only formatted for rows that are fetched.
+    PAGE_SIZE = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._instances: List[Usd.Prim] = []
+        self._fetched = 0
+
+    def set_prototype(self, prototype: Optional[Usd.Prim]):
+        self.beginResetModel()
+        self._instances = list(prototype.GetInstances()) if prototype and prototype.IsPrototype() else []
+        self._fetched = min(self.PAGE_SIZE, len(self._instances))
+        self.endResetModel()
+
+    def instance_count(self) -> int:
+        return len(self._instances)
+
+    def path(self, index: QtCore.QModelIndex) -> Optional[Sdf.Path]:
+        if not index.isValid() or index.row() >= self._fetched:
+            return None
+        return self._instances[index.row()].GetPath()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self._fetched < len(self._instances)
+
+    def fetchMore(self, parent):
+        last = min(self._fetched + self.PAGE_SIZE, len(self._instances))
+        self.beginInsertRows(QtCore.QModelIndex(), self._fetched, last - 1)
+        self._fetched = last
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.UserRole):
+            path = self.path(index)
+            return str(path) if path is not None else None
+        return None
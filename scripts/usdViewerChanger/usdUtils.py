@@ -1,8 +1,17 @@
-from pxr import Usd, UsdGeom, Sdf
-from typing import List, Tuple
-from dataclasses import dataclass
+import fnmatch
+import os
+import re
+import sys
+import time
+from collections import OrderedDict, defaultdict
+
+from pxr import Usd, UsdGeom, Sdf, Gf, Tf
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+from .usdProfiling import timed
+
 
 class PrimPurpose(Enum):
     DEFAULT = "default"
@@ -27,6 +36,7 @@ class VariantSetInfo:
     current_selection: str
 
 
+@timed()
 def get_variant_sets(prim: Usd.Prim) -> List[VariantSetInfo]:
     variant_sets = []
     for vs_name in prim.GetVariantSets().GetNames():
@@ -62,6 +72,7 @@ def get_prim_purpose(prim: Usd.Prim) -> str:
     return UsdGeom.Imageable(prim).GetPurposeAttr().Get() if UsdGeom.Imageable(prim) else ""
 
 
+@timed()
 def get_prim_info(prim: Usd.Prim) -> PrimInfo:
     return PrimInfo(
         name=prim.GetName(),
@@ -72,8 +83,83 @@ def get_prim_info(prim: Usd.Prim) -> PrimInfo:
     )
 
 
-def get_child_prims(prim: Usd.Prim) -> List[Usd.Prim]:
-    return list(prim.GetFilteredChildren(predicate=Usd.PrimIsActive & ~Usd.PrimIsAbstract))
+CHILD_PRIM_PREDICATE = Usd.PrimIsActive & ~Usd.PrimIsAbstract
+
+
+@dataclass(frozen=True)
+class StageScope:
+    # What the editor shows of a stage: the subtrees in mask_paths (all of it when empty), filtered by a predicate.
+    mask_paths: Tuple[Sdf.Path, ...] = ()
+    include_inactive: bool = False
+    instance_proxies: bool = False
+    loaded_only: bool = False
+    defined_only: bool = False
+    # Instances are shown collapsed, with each prototype listed once; their proxies are browsed on demand.
+    instancing: bool = False
+
+    def predicate(self):
+        predicate = ~Usd.PrimIsAbstract
+        if not self.include_inactive:
+            predicate = Usd.PrimIsActive & predicate
+        if self.loaded_only:
+            predicate = predicate & Usd.PrimIsLoaded
+        if self.defined_only:
+            predicate = predicate & Usd.PrimIsDefined
+        if self.instance_proxies and not self.instancing:
+            predicate = Usd.TraverseInstanceProxies(predicate)
+        return predicate
+
+    def is_masked(self) -> bool:
+        return bool(self.mask_paths)
+
+    def root_path(self) -> Sdf.Path:
+        # Deepest path containing every masked subtree.
+        if not self.mask_paths:
+            return Sdf.Path.absoluteRootPath
+        root = self.mask_paths[0]
+        for path in self.mask_paths[1:]:
+            root = root.GetCommonPrefix(path)
+        return root
+
+    def key(self) -> Tuple:
+        return (tuple(str(path) for path in self.mask_paths), self.include_inactive, self.instance_proxies,
+                self.loaded_only, self.defined_only, self.instancing)
+
+    @staticmethod
+    def parse_mask(text: str) -> Tuple[Sdf.Path, ...]:
+        paths = []
+        for token in re.split(r'[\s,]+', text.strip()):
+            if token and Sdf.Path.IsValidPathString(token):
+                path = Sdf.Path(token).MakeAbsolutePath(Sdf.Path.absoluteRootPath)
+                if path.IsPrimPath():
+                    paths.append(path)
+            elif token:
+                print(f"Warning: ignoring invalid mask path '{token}'")
+        return tuple(Usd.StagePopulationMask(paths).GetPaths()) if paths else ()
+
+
+@timed()
+def open_scoped_stage(stage: Usd.Stage, scope: StageScope) -> Usd.Stage:
+    # A masked stage on the same root and session layers: it only composes the masked subtrees, and edits made
+    # through it land in the layers the full stage uses.
+    if not scope.is_masked():
+        return stage
+    scoped_stage = Usd.Stage.OpenMasked(stage.GetRootLayer(), stage.GetSessionLayer(),
+                                        stage.GetPathResolverContext(), Usd.StagePopulationMask(scope.mask_paths),
+                                        Usd.Stage.LoadNone)
+    scoped_stage.SetLoadRules(stage.GetLoadRules())
+    scoped_stage.SetEditTarget(stage.GetEditTarget())
+    return scoped_stage
+
+
+def get_child_prims(prim: Usd.Prim, predicate=CHILD_PRIM_PREDICATE) -> List[Usd.Prim]:
+    return list(prim.GetFilteredChildren(predicate))
+
+
+def get_child_prim_paths(prim: Usd.Prim, predicate=CHILD_PRIM_PREDICATE) -> List[Sdf.Path]:
+    # Names are much cheaper to list than Usd.Prim handles on wide hierarchies.
+    path = prim.GetPath()
+    return [path.AppendChild(name) for name in prim.GetFilteredChildrenNames(predicate)]
 
 
 def set_prim_kind(prim: Usd.Prim, kind: str) -> None:
@@ -84,9 +170,1324 @@ def set_prim_purpose(prim: Usd.Prim, purpose: PrimPurpose) -> None:
     UsdGeom.Imageable(prim).CreatePurposeAttr().Set(purpose.value)
 
 
+def _edit_target_prim_spec(stage: Usd.Stage, path: Sdf.Path) -> Sdf.PrimSpec:
+    edit_target = stage.GetEditTarget()
+    return Sdf.CreatePrimInLayer(edit_target.GetLayer(), edit_target.MapToSpecPath(path))
+
+
+# Batch edits author directly on the edit target's specs inside one Sdf.ChangeBlock, so the stage recomposes once
+# for the whole selection instead of once per prim.
+@timed(count=int)
+def set_prims_kind(stage: Usd.Stage, paths: Iterable[Sdf.Path], kind: str) -> int:
+    count = 0
+    with Sdf.ChangeBlock():
+        for path in paths:
+            prim_spec = _edit_target_prim_spec(stage, path)
+            if kind:
+                prim_spec.kind = kind
+            else:
+                prim_spec.ClearKind()
+            count += 1
+    return count
+
+
+@timed(count=int)
+def set_prims_purpose(stage: Usd.Stage, paths: Iterable[Sdf.Path], purpose: PrimPurpose) -> int:
+    imageable_paths = [path for path in paths if stage.GetPrimAtPath(path).IsA(UsdGeom.Imageable)]
+    with Sdf.ChangeBlock():
+        for path in imageable_paths:
+            prim_spec = _edit_target_prim_spec(stage, path)
+            attr_spec = prim_spec.layer.GetAttributeAtPath(prim_spec.path.AppendProperty(UsdGeom.Tokens.purpose))
+            if not attr_spec:
+                attr_spec = Sdf.AttributeSpec(prim_spec, UsdGeom.Tokens.purpose, Sdf.ValueTypeNames.Token,
+                                              Sdf.VariabilityUniform)
+            attr_spec.default = purpose.value
+    return len(imageable_paths)
+
+
+@timed(count=int)
+def set_variant_selections(stage: Usd.Stage, paths: Iterable[Sdf.Path], variant_set: str, variant: str) -> int:
+    count = 0
+    with Sdf.ChangeBlock():
+        for path in paths:
+            _edit_target_prim_spec(stage, path).variantSelections[variant_set] = variant
+            count += 1
+    return count
+
+
+@timed(count=int)
+def set_prims_attribute_values(stage: Usd.Stage, paths: Iterable[Sdf.Path], name: str, value,
+                               type_name: Optional[Sdf.ValueTypeName] = None) -> int:
+    # Existing attributes keep their declared type. Without a type_name, prims that do not have the attribute yet
+    # are skipped; the return value only counts edited prims.
+    targets = []
+    for path in paths:
+        attr = stage.GetPrimAtPath(path).GetAttribute(name)
+        if attr:
+            targets.append((path, attr.GetTypeName(), attr.GetVariability()))
+        elif type_name:
+            targets.append((path, type_name, Sdf.VariabilityVarying))
+
+    with Sdf.ChangeBlock():
+        for path, type_name, variability in targets:
+            prim_spec = _edit_target_prim_spec(stage, path)
+            attr_spec = prim_spec.layer.GetAttributeAtPath(prim_spec.path.AppendProperty(name))
+            if not attr_spec:
+                attr_spec = Sdf.AttributeSpec(prim_spec, name, type_name, variability)
+            attr_spec.default = value
+    return len(targets)
+
+
+@timed()
+def load_and_unload_payloads(stage: Usd.Stage, load_paths: Iterable[Sdf.Path],
+                             unload_paths: Iterable[Sdf.Path]) -> None:
+    stage.LoadAndUnload(list(load_paths), list(unload_paths))
+
+
+def load_payloads(stage: Usd.Stage, paths: Iterable[Sdf.Path]) -> None:
+    load_and_unload_payloads(stage, paths, [])
+
+
+def unload_payloads(stage: Usd.Stage, paths: Iterable[Sdf.Path]) -> None:
+    load_and_unload_payloads(stage, [], paths)
+
+
+@dataclass
+class TimeSampleSummary:
+    name: str
+    count: int
+    first_time: float
+    last_time: float
+    interpolation: str
+
+
+@timed(count=len)
+def get_time_sample_summaries(prim: Usd.Prim) -> List[TimeSampleSummary]:
+    interpolation = str(prim.GetStage().GetInterpolationType())
+    summaries = []
+    for attr in prim.GetAttributes():
+        count = attr.GetNumTimeSamples()
+        if not count:
+            continue
+        # Bracketing the infinite ends finds the first and last sample without listing them all.
+        first_time = attr.GetBracketingTimeSamples(-sys.float_info.max)[0]
+        last_time = attr.GetBracketingTimeSamples(sys.float_info.max)[1]
+        summaries.append(TimeSampleSummary(attr.GetName(), count, first_time, last_time, interpolation))
+    return summaries
+
+
+def edit_target_sample_times(stage: Usd.Stage, attr_path: Sdf.Path, start: float,
+                             end: float) -> Tuple[Sdf.Layer, Sdf.Path, Sdf.LayerOffset, List[float]]:
+    # start and end are stage times; the returned times are the edit target layer's own, with the offset that maps
+    # them to stage time (e.g. for a sublayer authored with an offset or scale).
+    edit_target = stage.GetEditTarget()
+    layer = edit_target.GetLayer()
+    spec_path = edit_target.MapToSpecPath(attr_path)
+    layer_to_stage = edit_target.GetMapFunction().timeOffset
+    stage_to_layer = layer_to_stage.GetInverse()
+    layer_start, layer_end = sorted((stage_to_layer * start, stage_to_layer * end))
+    times = [time for time in layer.ListTimeSamplesForPath(spec_path) if layer_start <= time <= layer_end]
+    return layer, spec_path, layer_to_stage, times
+
+
+def retimed_layer_time(layer_to_stage: Sdf.LayerOffset, time: float, start: float, scale: float,
+                       offset: float) -> float:
+    # Retimes a layer time in stage time and maps the result back into the layer.
+    stage_time = layer_to_stage * time
+    return layer_to_stage.GetInverse() * (start + (stage_time - start) * scale + offset)
+
+
+# Bulk sample edits work on the edit target's samples at the Sdf level, inside one Sdf.ChangeBlock.
+@timed(count=int)
+def retime_samples(stage: Usd.Stage, attr_paths: Iterable[Sdf.Path], start: float, end: float,
+                   scale: float = 1.0, offset: float = 0.0) -> int:
+    # Stage times in [start, end] map to start + (time - start) * scale + offset. Moved samples replace any sample
+    # already authored at their new time.
+    edits = []
+    for attr_path in attr_paths:
+        layer, spec_path, layer_to_stage, times = edit_target_sample_times(stage, attr_path, start, end)
+        samples = [(time, layer.QueryTimeSample(spec_path, time)) for time in times]
+        edits.append((layer, spec_path, layer_to_stage, samples))
+
+    count = 0
+    with Sdf.ChangeBlock():
+        for layer, spec_path, layer_to_stage, samples in edits:
+            for time, _ in samples:
+                layer.EraseTimeSample(spec_path, time)
+            for time, value in samples:
+                layer.SetTimeSample(spec_path, retimed_layer_time(layer_to_stage, time, start, scale, offset), value)
+            count += len(samples)
+    return count
+
+
+@timed(count=int)
+def delete_samples_in_range(stage: Usd.Stage, attr_paths: Iterable[Sdf.Path], start: float, end: float) -> int:
+    count = 0
+    with Sdf.ChangeBlock():
+        for attr_path in attr_paths:
+            layer, spec_path, _, times = edit_target_sample_times(stage, attr_path, start, end)
+            for time in times:
+                layer.EraseTimeSample(spec_path, time)
+            count += len(times)
+    return count
+
+
+@timed()
 def get_stage_as_text(stage: Usd.Stage) -> str:
     return stage.GetRootLayer().ExportToString()
 
 
-def update_stage_from_text(stage: Usd.Stage, text: str) -> None:
-    stage.GetRootLayer().ImportFromString(text)
+@timed()
+def get_prim_spec_as_text(layer: Sdf.Layer, prim_path: Sdf.Path) -> str:
+    if prim_path == Sdf.Path.absoluteRootPath:
+        return layer.ExportToString()
+    if not layer.GetPrimAtPath(prim_path):
+        return ""
+
+    # Copy just this prim's spec (under "over" ancestors) into a scratch layer to export it.
+    export_layer = Sdf.Layer.CreateAnonymous('primSpec.usda')
+    Sdf.CreatePrimInLayer(export_layer, prim_path)
+    Sdf.CopySpec(layer, prim_path, export_layer, prim_path)
+    return export_layer.ExportToString()
+
+
+@dataclass
+class LayerDiff:
+    removed: List[Sdf.Path] = field(default_factory=list)
+    added: List[Sdf.Path] = field(default_factory=list)
+    # Specs whose nested variant/target/connection specs changed are copied over whole.
+    replaced: List[Sdf.Path] = field(default_factory=list)
+    field_changes: List[Tuple[Sdf.Path, str, object]] = field(default_factory=list)
+    field_clears: List[Tuple[Sdf.Path, str]] = field(default_factory=list)
+
+    def edit_count(self) -> int:
+        return (len(self.removed) + len(self.added) + len(self.replaced)
+                + len(self.field_changes) + len(self.field_clears))
+
+    def is_empty(self) -> bool:
+        return self.edit_count() == 0
+
+
+# Fields ListInfoKeys() may not report but that still have to match between two specs.
+_REQUIRED_SPEC_FIELDS = (
+    (Sdf.PrimSpec, ('specifier', 'typeName')),
+    (Sdf.AttributeSpec, ('typeName', 'variability', 'custom')),
+    (Sdf.RelationshipSpec, ('variability', 'custom')),
+)
+
+
+def parse_layer_text(text: str) -> Sdf.Layer:
+    layer = Sdf.Layer.CreateAnonymous('edited.usda')
+    if not layer.ImportFromString(text):
+        raise ValueError("Could not parse the edited USD text.")
+    return layer
+
+
+def _collect_spec_paths(layer: Sdf.Layer, root_path: Sdf.Path) -> List[Sdf.Path]:
+    paths = []
+    if layer.GetObjectAtPath(root_path):
+        layer.Traverse(root_path, paths.append)
+    return paths
+
+
+def _owning_spec_path(path: Sdf.Path) -> Sdf.Path:
+    # Prims and properties are diffed field by field; anything nested in them is attributed to its owner.
+    if path.ContainsPrimVariantSelection():
+        path = path.GetPrimPath()
+        while path.ContainsPrimVariantSelection():
+            path = path.GetParentPath()
+        return path
+    while not (path.IsAbsoluteRootOrPrimPath() or path.IsPrimPropertyPath()):
+        path = path.GetParentPath()
+    return path
+
+
+def _spec_fields(layer: Sdf.Layer, path: Sdf.Path) -> Dict[str, object]:
+    spec = layer.GetObjectAtPath(path)
+    keys = set(spec.ListInfoKeys())
+    if path != Sdf.Path.absoluteRootPath:
+        for spec_class, required_keys in _REQUIRED_SPEC_FIELDS:
+            if isinstance(spec, spec_class):
+                keys.update(required_keys)
+                break
+    return {key: spec.GetInfo(key) for key in keys}
+
+
+@timed(count=lambda diff: diff.edit_count())
+def compute_layer_diff(current: Sdf.Layer, edited: Sdf.Layer,
+                       root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> LayerDiff:
+    current_paths = set(_collect_spec_paths(current, root_path))
+    edited_paths = set(_collect_spec_paths(edited, root_path))
+    diff = LayerDiff()
+
+    replaced = set()
+    for path in current_paths ^ edited_paths:
+        owner = _owning_spec_path(path)
+        if owner == path:
+            (diff.removed if path in current_paths else diff.added).append(path)
+        elif owner in current_paths and owner in edited_paths:
+            replaced.add(owner)
+
+    for path in current_paths & edited_paths:
+        owner = _owning_spec_path(path)
+        if owner != path:
+            if owner not in replaced and _spec_fields(current, path) != _spec_fields(edited, path):
+                replaced.add(owner)
+            continue
+
+        current_fields = _spec_fields(current, path)
+        edited_fields = _spec_fields(edited, path)
+        for key, value in edited_fields.items():
+            if key not in current_fields or current_fields[key] != value:
+                diff.field_changes.append((path, key, value))
+        for key in current_fields.keys() - edited_fields.keys():
+            diff.field_clears.append((path, key))
+
+    diff.replaced = sorted(Sdf.Path.RemoveDescendentPaths(list(replaced)))
+    diff.removed = sorted(_outside(Sdf.Path.RemoveDescendentPaths(diff.removed), diff.replaced))
+    diff.added = sorted(_outside(Sdf.Path.RemoveDescendentPaths(diff.added), diff.replaced))
+    diff.field_changes = [change for change in diff.field_changes if _outside([change[0]], diff.replaced)]
+    diff.field_clears = [clear for clear in diff.field_clears if _outside([clear[0]], diff.replaced)]
+    return diff
+
+
+def _outside(paths: List[Sdf.Path], roots: List[Sdf.Path]) -> List[Sdf.Path]:
+    return [path for path in paths if not any(path.HasPrefix(root) for root in roots)]
+
+
+@timed()
+def apply_layer_diff(layer: Sdf.Layer, source_layer: Sdf.Layer, diff: LayerDiff) -> None:
+    with Sdf.ChangeBlock():
+        removals = diff.removed + diff.replaced
+        if removals:
+            namespace_edit = Sdf.BatchNamespaceEdit()
+            for path in removals:
+                namespace_edit.Add(Sdf.NamespaceEdit.Remove(path))
+            if not layer.Apply(namespace_edit):
+                raise RuntimeError(f"Could not remove specs from {layer.identifier}")
+
+        for path in diff.replaced + diff.added:
+            owner_prim_path = path.GetPrimPath() if path.IsPrimPropertyPath() else path.GetParentPath()
+            if owner_prim_path != Sdf.Path.absoluteRootPath:
+                Sdf.CreatePrimInLayer(layer, owner_prim_path)
+            Sdf.CopySpec(source_layer, path, layer, path)
+
+        for path, key, value in diff.field_changes:
+            layer.GetObjectAtPath(path).SetInfo(key, value)
+        for path, key in diff.field_clears:
+            layer.GetObjectAtPath(path).ClearInfo(key)
+
+
+@timed(count=lambda diff: diff.edit_count())
+def update_stage_from_text(stage: Usd.Stage, text: str,
+                           root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> LayerDiff:
+    layer = stage.GetRootLayer()
+    edited_layer = parse_layer_text(text)
+    diff = compute_layer_diff(layer, edited_layer, root_path)
+    if not diff.is_empty():
+        apply_layer_diff(layer, edited_layer, diff)
+    return diff
+
+
+PRIM_COLUMNS = ('Prim Name', 'Type', 'Kind', 'Purpose', 'Variant Sets', 'Has Payload', 'Instancing')
+
+
+class PrimRecord:
+    # Compact, cache-friendly counterpart of PrimInfo/VariantSetInfo used by PrimInfoCache.
+    __slots__ = ('name', 'type_name', 'kind', 'purpose', 'variant_selections', 'has_payload', 'instancing')
+
+    def __init__(self, name: str, type_name: str, kind: str, purpose: str,
+                 variant_selections: Tuple[Tuple[str, str], ...], has_payload: bool, instancing: str = ""):
+        self.name = name
+        self.type_name = type_name
+        self.kind = kind
+        self.purpose = purpose
+        self.variant_selections = variant_selections
+        self.has_payload = has_payload
+        # Prototype of an instance, or the instance count of a prototype.
+        self.instancing = instancing
+
+    def variant_sets_text(self) -> str:
+        return ", ".join([f"{name}: {selection}" for name, selection in self.variant_selections])
+
+    def column_text(self, column: int) -> str:
+        # Column order follows PRIM_COLUMNS.
+        if column == 0:
+            return self.name
+        if column == 1:
+            return self.type_name
+        if column == 2:
+            return self.kind
+        if column == 3:
+            return self.purpose
+        if column == 4:
+            return self.variant_sets_text()
+        if column == 5:
+            return "Yes" if self.has_payload else "No"
+        return self.instancing
+
+
+def extract_prim_record(prim: Usd.Prim) -> PrimRecord:
+    variant_selections = ()
+    if prim.HasVariantSets():
+        variant_sets = prim.GetVariantSets()
+        variant_selections = tuple((name, variant_sets.GetVariantSelection(name))
+                                   for name in variant_sets.GetNames())
+
+    purpose = ""
+    if prim.IsA(UsdGeom.Imageable):
+        purpose = prim.GetAttribute(UsdGeom.Tokens.purpose).Get() or ""
+
+    instancing = ""
+    if prim.IsInstance():
+        instancing = str(prim.GetPrototype().GetPath())
+    elif prim.IsPrototype():
+        instancing = f"{len(prim.GetInstances())} instances"
+
+    # Type names, kinds and purposes repeat across the stage, so share one string per value.
+    return PrimRecord(
+        name=prim.GetName(),
+        type_name=sys.intern(prim.GetTypeName()),
+        kind=sys.intern(prim.GetMetadata('kind') or ""),
+        purpose=sys.intern(purpose),
+        variant_selections=variant_selections,
+        has_payload=prim.HasPayload(),
+        instancing=sys.intern(instancing)
+    )
+
+
+def iter_stage_prims(stage: Usd.Stage, predicate=CHILD_PRIM_PREDICATE, root_path: Sdf.Path = Sdf.Path.absoluteRootPath,
+                     include_prototypes: bool = False) -> Iterable[Usd.Prim]:
+    # With include_prototypes, each instancing prototype is visited once after the stage itself, instead of once
+    # per instance through instance proxies.
+    root_prim = stage.GetPrimAtPath(root_path)
+    if root_prim:
+        yield from Usd.PrimRange(root_prim, predicate)
+    if include_prototypes and root_path == Sdf.Path.absoluteRootPath:
+        for prototype in stage.GetPrototypes():
+            yield from Usd.PrimRange(prototype, predicate)
+
+
+class PrimInfoCache:
+    # Instance proxies share the record of the prototype prim they stand for; only the proxy -> prototype path
+    # mapping is stored per proxy.
+    def __init__(self, stage: Usd.Stage, predicate=CHILD_PRIM_PREDICATE):
+        self.stage = stage
+        self.predicate = predicate
+        self._records: Dict[Sdf.Path, PrimRecord] = {}
+        self._proxy_prototypes: Dict[Sdf.Path, Sdf.Path] = {}
+        # Parent -> cached child paths (and the ancestors linking them), so a resync only walks its own subtree.
+        self._children: Dict[Sdf.Path, Set[Sdf.Path]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _link(self, path: Sdf.Path) -> None:
+        while path != Sdf.Path.absoluteRootPath:
+            parent_path = path.GetParentPath()
+            children = self._children.get(parent_path)
+            if children is None:
+                children = self._children[parent_path] = set()
+            elif path in children:
+                return
+            children.add(path)
+            path = parent_path
+
+    def _drop_subtree(self, path: Sdf.Path) -> None:
+        siblings = self._children.get(path.GetParentPath())
+        if siblings is not None:
+            siblings.discard(path)
+        pending = [path]
+        while pending:
+            path = pending.pop()
+            self._records.pop(path, None)
+            self._proxy_prototypes.pop(path, None)
+            pending.extend(self._children.pop(path, ()))
+
+    def __contains__(self, path: Sdf.Path) -> bool:
+        return path in self._records
+
+    def get(self, path: Sdf.Path) -> Optional[PrimRecord]:
+        record = self._records.get(path)
+        if record is None:
+            prototype_path = self._proxy_prototypes.get(path)
+            if prototype_path is not None:
+                return self.get(prototype_path)
+            prim = self.stage.GetPrimAtPath(path)
+            if not prim:
+                return None
+            self._link(path)
+            if prim.IsInstanceProxy():
+                prototype_path = self._proxy_prototypes[path] = prim.GetPrimInPrototype().GetPath()
+                return self.get(prototype_path)
+            record = self._records[path] = extract_prim_record(prim)
+        return record
+
+    def store(self, path: Sdf.Path, record: PrimRecord) -> None:
+        self._records[path] = record
+        self._link(path)
+
+    @timed(count=int)
+    def populate(self, root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> int:
+        root_prim = self.stage.GetPrimAtPath(root_path)
+        if not root_prim:
+            return 0
+
+        records = self._records
+        count = 0
+        for prim in Usd.PrimRange(root_prim, self.predicate):
+            path = prim.GetPath()
+            records[path] = extract_prim_record(prim)
+            self._link(path)
+            count += 1
+        return count
+
+    @timed()
+    def invalidate(self, resynced_paths: Iterable[Sdf.Path], info_changed_paths: Iterable[Sdf.Path]) -> None:
+        for path in info_changed_paths:
+            self._records.pop(path.GetPrimPath(), None)
+
+        resynced_prim_paths = []
+        for path in resynced_paths:
+            if path.IsAbsoluteRootOrPrimPath():
+                resynced_prim_paths.append(path)
+            else:
+                self._records.pop(path.GetPrimPath(), None)
+
+        if not resynced_prim_paths:
+            return
+        if Sdf.Path.absoluteRootPath in resynced_prim_paths:
+            self.clear()
+            return
+
+        # Also drops proxy mappings: resyncing an instance may point its proxies at another prototype.
+        for path in resynced_prim_paths:
+            self._drop_subtree(path)
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._proxy_prototypes.clear()
+        self._children.clear()
+
+
+class LayerTextCache:
+    # Exported layer/prim text, reused until the layer reports a change.
+    def __init__(self, layer: Sdf.Layer):
+        self.layer = layer
+        self.change_count = 0
+        self._layer_text: Optional[Tuple[int, str]] = None
+        self._prim_text: Optional[Tuple[int, Sdf.Path, str]] = None
+        self._listener = Tf.Notice.Register(Sdf.Notice.LayersDidChangeSentPerLayer, self._on_layer_changed, layer)
+
+    def _on_layer_changed(self, notice, sender):
+        self.change_count += 1
+
+    @timed()
+    def get_text(self, prim_path: Optional[Sdf.Path] = None) -> str:
+        if prim_path is None:
+            if self._layer_text is None or self._layer_text[0] != self.change_count:
+                self._layer_text = (self.change_count, self.layer.ExportToString())
+            return self._layer_text[1]
+
+        if (self._prim_text is None or self._prim_text[0] != self.change_count
+                or self._prim_text[1] != prim_path):
+            self._prim_text = (self.change_count, prim_path, get_prim_spec_as_text(self.layer, prim_path))
+        return self._prim_text[2]
+
+    def revoke(self) -> None:
+        if self._listener:
+            self._listener.Revoke()
+            self._listener = None
+        self._layer_text = None
+        self._prim_text = None
+
+
+@dataclass
+class LayerInfo:
+    identifier: str
+    display_name: str
+    file_size: Optional[int]
+    is_session: bool
+
+
+@dataclass
+class SpecOpinion:
+    layer_identifier: str
+    spec_path: Sdf.Path
+    has_default: bool = False
+    time_sample_count: int = 0
+
+
+@dataclass
+class CompositionArcInfo:
+    arc_type: str
+    target_layer: str
+    target_path: Sdf.Path
+    introducing_layer: str
+
+
+def layer_file_size(layer: Sdf.Layer) -> Optional[int]:
+    real_path = layer.realPath
+    return os.path.getsize(real_path) if real_path and os.path.isfile(real_path) else None
+
+
+def get_layer_stack_info(stage: Usd.Stage) -> List[LayerInfo]:
+    root_layers = set(layer.identifier for layer in stage.GetLayerStack(includeSessionLayers=False))
+    return [LayerInfo(layer.identifier, layer.GetDisplayName(), layer_file_size(layer),
+                      layer.identifier not in root_layers)
+            for layer in stage.GetLayerStack(includeSessionLayers=True)]
+
+
+def measure_layer_load_time(layer: Sdf.Layer) -> Optional[float]:
+    # Re-reads the layer from disk into a throwaway anonymous layer; the layer the stage uses is untouched.
+    if layer.anonymous or not layer.realPath:
+        return None
+    start = time.perf_counter()
+    Sdf.Layer.OpenAsAnonymous(layer.realPath)
+    return time.perf_counter() - start
+
+
+def get_prim_stack(prim: Usd.Prim) -> List[SpecOpinion]:
+    return [SpecOpinion(spec.layer.identifier, spec.path) for spec in prim.GetPrimStack()]
+
+
+def get_property_stack(attr: Usd.Attribute) -> List[SpecOpinion]:
+    opinions = []
+    for spec in attr.GetPropertyStack(Usd.TimeCode.Default()):
+        opinions.append(SpecOpinion(spec.layer.identifier, spec.path, spec.HasDefaultValue(),
+                                    spec.layer.GetNumTimeSamplesForPath(spec.path)))
+    return opinions
+
+
+@timed(count=len)
+def get_composition_arcs(prim: Usd.Prim) -> List[CompositionArcInfo]:
+    arcs = []
+    for arc in Usd.PrimCompositionQuery(prim).GetCompositionArcs():
+        target_node = arc.GetTargetNode()
+        introducing_layer = arc.GetIntroducingLayer()
+        arcs.append(CompositionArcInfo(
+            str(arc.GetArcType()).rpartition('.')[2],
+            target_node.layerStack.identifier.rootLayer.identifier,
+            target_node.path,
+            introducing_layer.identifier if introducing_layer else ""))
+    return arcs
+
+
+class CompositionQueryCache:
+    # Usd.PrimCompositionQuery is expensive; results are kept per prim path until a resync under that path.
+    def __init__(self, stage: Usd.Stage):
+        self.stage = stage
+        self._arcs: Dict[Sdf.Path, List[CompositionArcInfo]] = {}
+
+    def __len__(self) -> int:
+        return len(self._arcs)
+
+    def get_arcs(self, path: Sdf.Path) -> List[CompositionArcInfo]:
+        arcs = self._arcs.get(path)
+        if arcs is None:
+            prim = self.stage.GetPrimAtPath(path)
+            arcs = get_composition_arcs(prim) if prim else []
+            self._arcs[path] = arcs
+        return arcs
+
+    def invalidate(self, resynced_paths: Iterable[Sdf.Path]) -> None:
+        resynced_prim_paths = [path.GetPrimPath() for path in resynced_paths]
+        if not resynced_prim_paths:
+            return
+        if Sdf.Path.absoluteRootPath in resynced_prim_paths:
+            self._arcs.clear()
+            return
+        for path in [path for path in self._arcs if any(path.HasPrefix(root) for root in resynced_prim_paths)]:
+            del self._arcs[path]
+
+    def clear(self) -> None:
+        self._arcs.clear()
+
+
+@dataclass
+class VariantOutcome:
+    variant_set: str
+    variant: str
+    child_count: int
+    descendant_count: int
+    payload_count: int
+    bounds_min: Optional[Tuple[float, float, float]] = None
+    bounds_max: Optional[Tuple[float, float, float]] = None
+    error: str = ""
+
+    def bounds_size(self) -> Optional[Tuple[float, float, float]]:
+        if self.bounds_min is None or self.bounds_max is None:
+            return None
+        return tuple(high - low for low, high in zip(self.bounds_min, self.bounds_max))
+
+
+class VariantExplorer:
+    # Composes variants in a sandbox stage masked to the explored prim, so trying a variant never touches the real
+    # stage. The sandbox session layer sublayers the real one and holds only the trial variant selection. Outcomes
+    # are cached per (prim, variant set, variant, other selections on the prim).
+    BBOX_PURPOSES = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render]
+
+    def __init__(self, stage: Usd.Stage):
+        self.stage = stage
+        self._outcomes: Dict[Tuple, VariantOutcome] = {}
+        self._sandbox: Optional[Usd.Stage] = None
+        self._sandbox_path: Optional[Sdf.Path] = None
+        self._sandbox_layer: Optional[Sdf.Layer] = None
+
+    def __len__(self) -> int:
+        return len(self._outcomes)
+
+    def _cache_key(self, prim: Usd.Prim, variant_set: str, variant: str) -> Tuple:
+        selections = prim.GetVariantSets().GetAllVariantSelections()
+        others = tuple(sorted((name, value) for name, value in selections.items() if name != variant_set))
+        return prim.GetPath(), variant_set, variant, others
+
+    def _sandbox_for(self, path: Sdf.Path) -> Usd.Stage:
+        if self._sandbox is None or self._sandbox_path != path:
+            self._sandbox_layer = Sdf.Layer.CreateAnonymous('variantSandbox')
+            self._sandbox_layer.subLayerPaths.append(self.stage.GetSessionLayer().identifier)
+            self._sandbox = Usd.Stage.OpenMasked(self.stage.GetRootLayer(), self._sandbox_layer,
+                                                 self.stage.GetPathResolverContext(),
+                                                 Usd.StagePopulationMask([path]), Usd.Stage.LoadNone)
+            self._sandbox_path = path
+        # Mirror what the user has loaded, so bounds match the real stage.
+        self._sandbox.SetLoadRules(self.stage.GetLoadRules())
+        return self._sandbox
+
+    def get_outcome(self, prim: Usd.Prim, variant_set: str, variant: str) -> VariantOutcome:
+        key = self._cache_key(prim, variant_set, variant)
+        outcome = self._outcomes.get(key)
+        if outcome is None:
+            outcome = self._compose(prim, variant_set, variant)
+            self._outcomes[key] = outcome
+        return outcome
+
+    @timed(count=len)
+    def get_outcomes(self, prim: Usd.Prim) -> List[VariantOutcome]:
+        outcomes = []
+        for vs_info in get_variant_sets(prim):
+            for variant in vs_info.variants:
+                outcomes.append(self.get_outcome(prim, vs_info.name, variant))
+        return outcomes
+
+    def _compose(self, prim: Usd.Prim, variant_set: str, variant: str) -> VariantOutcome:
+        path = prim.GetPath()
+        try:
+            sandbox = self._sandbox_for(path)
+            spec = Sdf.CreatePrimInLayer(self._sandbox_layer, path)
+            spec.variantSelections[variant_set] = variant
+            try:
+                sandbox_prim = sandbox.GetPrimAtPath(path)
+                if not sandbox_prim:
+                    return VariantOutcome(variant_set, variant, 0, 0, 0, error="Prim not found in sandbox")
+                descendants = [p for p in Usd.PrimRange(sandbox_prim, CHILD_PRIM_PREDICATE)][1:]
+                child_count = len(sandbox_prim.GetFilteredChildren(CHILD_PRIM_PREDICATE))
+                payload_count = sum(1 for p in descendants if p.HasAuthoredPayloads())
+                if sandbox_prim.HasAuthoredPayloads():
+                    payload_count += 1
+                outcome = VariantOutcome(variant_set, variant, child_count, len(descendants), payload_count)
+                bbox_cache = UsdGeom.BBoxCache(Usd.TimeCode.Default(), self.BBOX_PURPOSES)
+                box = bbox_cache.ComputeWorldBound(sandbox_prim).ComputeAlignedRange()
+                if not box.IsEmpty():
+                    outcome.bounds_min = tuple(box.GetMin())
+                    outcome.bounds_max = tuple(box.GetMax())
+                return outcome
+            finally:
+                del spec.variantSelections[variant_set]
+        except Exception as e:
+            print(f"Error composing variant {variant_set}={variant} on {path}: {str(e)}")
+            return VariantOutcome(variant_set, variant, 0, 0, 0, error=str(e))
+
+    def invalidate(self, resynced_paths: Iterable[Sdf.Path]) -> None:
+        # A change below an explored prim changes its counts, a change above it may change what it composes.
+        resynced_prim_paths = [path.GetPrimPath() for path in resynced_paths]
+        if not resynced_prim_paths:
+            return
+        if Sdf.Path.absoluteRootPath in resynced_prim_paths:
+            self._outcomes.clear()
+            return
+        for key in [key for key in self._outcomes
+                    if any(key[0].HasPrefix(root) or root.HasPrefix(key[0]) for root in resynced_prim_paths)]:
+            del self._outcomes[key]
+
+    def clear(self) -> None:
+        self._outcomes.clear()
+        self._sandbox = None
+        self._sandbox_path = None
+        self._sandbox_layer = None
+
+
+STATS_COLUMNS = ('Points', 'Faces', 'Primvar KB', 'Bounds')
+
+
+@dataclass
+class GeometryStats:
+    point_count: int = 0
+    face_count: int = 0
+    # Bytes held by points and authored array primvars at the cache's time code.
+    primvar_bytes: int = 0
+
+    def add(self, other: 'GeometryStats') -> None:
+        self.point_count += other.point_count
+        self.face_count += other.face_count
+        self.primvar_bytes += other.primvar_bytes
+
+
+def _array_bytes(value) -> int:
+    if value is None:
+        return 0
+    try:
+        # Vt arrays of numeric types expose a buffer, so this does not copy.
+        return memoryview(value).nbytes
+    except TypeError:
+        return len(value) * 8 if hasattr(value, '__len__') and not isinstance(value, str) else 0
+
+
+def compute_local_geometry_stats(prim: Usd.Prim, time_code: Usd.TimeCode) -> GeometryStats:
+    stats = GeometryStats()
+    if not prim.IsA(UsdGeom.Gprim):
+        return stats
+
+    if prim.IsA(UsdGeom.PointBased):
+        points = UsdGeom.PointBased(prim).GetPointsAttr().Get(time_code)
+        if points is not None:
+            stats.point_count = len(points)
+            stats.primvar_bytes += _array_bytes(points)
+    if prim.IsA(UsdGeom.Mesh):
+        face_counts = UsdGeom.Mesh(prim).GetFaceVertexCountsAttr().Get(time_code)
+        stats.face_count = len(face_counts) if face_counts is not None else 0
+
+    for primvar in UsdGeom.PrimvarsAPI(prim).GetPrimvarsWithAuthoredValues():
+        if primvar.GetTypeName().isArray:
+            stats.primvar_bytes += _array_bytes(primvar.Get(time_code))
+            if primvar.IsIndexed():
+                stats.primvar_bytes += _array_bytes(primvar.GetIndices(time_code))
+    return stats
+
+
+class GeometryStatsCache:
+    # Per-prim and per-subtree geometry statistics plus world bounds, computed in one pass per subtree with a
+    # single shared BBoxCache and kept per time code. Lookups never compute, so views can read them while painting.
+    MAX_TIME_CODES = 8
+    BBOX_PURPOSES = [UsdGeom.Tokens.default_, UsdGeom.Tokens.render, UsdGeom.Tokens.proxy]
+    # Properties whose edits can change stats or bounds; edits of anything else (kind, custom data, ...) are ignored.
+    GEOMETRY_PROPERTIES = frozenset(['points', 'extent', 'extentsHint', 'faceVertexCounts', 'visibility', 'purpose'])
+    GEOMETRY_PREFIXES = ('xformOp', 'primvars:')
+    # Of those, the ones that also move or hide every descendant.
+    INHERITED_PROPERTIES = frozenset(['visibility', 'purpose'])
+
+    def __init__(self, stage: Usd.Stage, predicate=CHILD_PRIM_PREDICATE,
+                 time_code: Usd.TimeCode = Usd.TimeCode.Default()):
+        self.stage = stage
+        self.predicate = predicate
+        self._by_time: "OrderedDict[float, tuple]" = OrderedDict()
+        self.set_time(time_code)
+
+    def set_time(self, time_code: Usd.TimeCode) -> None:
+        key = time_code.GetValue() if not time_code.IsDefault() else None
+        entry = self._by_time.get(key)
+        if entry is None:
+            entry = (UsdGeom.BBoxCache(time_code, self.BBOX_PURPOSES, useExtentsHint=True), {}, {}, {})
+            self._by_time[key] = entry
+            while len(self._by_time) > self.MAX_TIME_CODES:
+                self._by_time.popitem(last=False)
+        self._by_time.move_to_end(key)
+        self.time_code = time_code
+        self._bbox_cache, self._local, self._subtree, self._bounds = entry
+
+    def __len__(self) -> int:
+        return len(self._subtree)
+
+    def local_stats(self, path: Sdf.Path) -> Optional[GeometryStats]:
+        return self._local.get(path)
+
+    def subtree_stats(self, path: Sdf.Path) -> Optional[GeometryStats]:
+        return self._subtree.get(path)
+
+    def world_bounds(self, path: Sdf.Path) -> Optional[Gf.Range3d]:
+        return self._bounds.get(path)
+
+    @timed(count=int)
+    def compute(self, root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> int:
+        # Bottom-up over a pre/post-order range; subtrees whose stats and bounds are still cached are pruned and
+        # reused. A cached subtree whose bounds were dropped (e.g. by a transform edit) keeps its stats but is walked
+        # again for bounds.
+        root_prim = self.stage.GetPrimAtPath(root_path)
+        if not root_prim:
+            return 0
+
+        count = 0
+        pending: List[Optional[GeometryStats]] = []
+        prim_range = iter(Usd.PrimRange.PreAndPostVisit(root_prim, self.predicate))
+        for prim in prim_range:
+            path = prim.GetPath()
+            if not prim_range.IsPostVisit():
+                if path in self._subtree:
+                    if path in self._bounds:
+                        prim_range.PruneChildren()
+                    pending.append(None)
+                else:
+                    pending.append(GeometryStats())
+                continue
+
+            if path not in self._bounds:
+                self._bounds[path] = self._bbox_cache.ComputeWorldBound(prim).ComputeAlignedRange()
+
+            subtree = pending.pop()
+            if subtree is None:
+                subtree = self._subtree[path]
+            else:
+                local = self._local.get(path)
+                if local is None:
+                    local = self._local[path] = compute_local_geometry_stats(prim, self.time_code)
+                    count += 1
+                subtree.add(local)
+                if prim.IsInstance() and not prim.GetFilteredChildren(self.predicate):
+                    # Instances not traversed through their proxies count their prototype, computed once.
+                    prototype_path = prim.GetPrototype().GetPath()
+                    if prototype_path not in self._subtree:
+                        count += self.compute(prototype_path)
+                    subtree.add(self._subtree.get(prototype_path, GeometryStats()))
+                self._subtree[path] = subtree
+            if pending and pending[-1] is not None:
+                pending[-1].add(subtree)
+        return count
+
+    def _affects_geometry(self, path: Sdf.Path) -> bool:
+        return path.IsPropertyPath() and (path.name in self.GEOMETRY_PROPERTIES
+                                          or path.name.startswith(self.GEOMETRY_PREFIXES))
+
+    def _moves_descendants(self, path: Sdf.Path) -> bool:
+        return path.name in self.INHERITED_PROPERTIES or path.name.startswith('xformOp')
+
+    def invalidate(self, resynced_paths: Iterable[Sdf.Path], info_changed_paths: Iterable[Sdf.Path]) -> None:
+        changed_properties = [path for path in info_changed_paths if self._affects_geometry(path)]
+        resynced_prim_paths = []
+        for path in resynced_paths:
+            if path.IsAbsoluteRootOrPrimPath():
+                resynced_prim_paths.append(path)
+            elif self._affects_geometry(path):
+                changed_properties.append(path)
+        if not changed_properties and not resynced_prim_paths:
+            return
+        if Sdf.Path.absoluteRootPath in resynced_prim_paths:
+            self.clear()
+            return
+
+        changed_prim_paths = {path.GetPrimPath() for path in changed_properties}
+        # Subtrees whose bounds all change: resynced prims and prims with transform/visibility edits.
+        moved_roots = resynced_prim_paths + [path.GetPrimPath() for path in changed_properties
+                                             if self._moves_descendants(path)]
+        stale_roots = list(changed_prim_paths) + resynced_prim_paths
+        in_prototype = any(Usd.Prim.IsPrototypePath(root.GetPrefixes()[0]) for root in stale_roots)
+        for bbox_cache, local, subtree, bounds in self._by_time.values():
+            # BBoxCache has no partial invalidation.
+            bbox_cache.Clear()
+            for path in changed_prim_paths:
+                local.pop(path, None)
+            if resynced_prim_paths:
+                for path in [path for path in local if any(path.HasPrefix(root) for root in resynced_prim_paths)]:
+                    del local[path]
+
+            # Stats and bounds of every ancestor include the changed prims.
+            for root in stale_roots:
+                for path in root.GetPrefixes():
+                    subtree.pop(path, None)
+                    bounds.pop(path, None)
+                subtree.pop(Sdf.Path.absoluteRootPath, None)
+                bounds.pop(Sdf.Path.absoluteRootPath, None)
+            if in_prototype:
+                # Every instance of a changed prototype includes its totals.
+                subtree.clear()
+                bounds.clear()
+                continue
+            if resynced_prim_paths:
+                for path in [path for path in subtree if any(path.HasPrefix(root) for root in resynced_prim_paths)]:
+                    del subtree[path]
+            if moved_roots:
+                for path in [path for path in bounds if any(path.HasPrefix(root) for root in moved_roots)]:
+                    del bounds[path]
+
+    def clear(self) -> None:
+        time_code = self.time_code
+        self._by_time.clear()
+        self.set_time(time_code)
+
+
+@dataclass
+class PayloadChangeReport:
+    loaded: int
+    unloaded: int
+    # Requested payload roots left unloaded because the request exceeded max_loaded.
+    skipped: List[Sdf.Path] = field(default_factory=list)
+
+
+class PayloadManager:
+    # Load policies applied as one Usd.StageLoadRules update each. The working set is bounded by max_loaded payload
+    # roots (0 means unbounded); when it is exceeded the least recently inspected roots are unloaded.
+    # With a mirror_stage (the full stage behind a masked one), the same rule changes are applied to it as well.
+    def __init__(self, stage: Usd.Stage, max_loaded: int = 0, mirror_stage: Optional[Usd.Stage] = None):
+        self.stage = stage
+        self.max_loaded = max_loaded
+        self.mirror_stage = mirror_stage if mirror_stage is not stage else None
+        self._recent: "OrderedDict[Sdf.Path, None]" = OrderedDict()
+        self._sync_loaded_roots()
+
+    def payload_prim_paths(self, root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> List[Sdf.Path]:
+        root_prim = self.stage.GetPrimAtPath(root_path)
+        if not root_prim:
+            return []
+        predicate = Usd.PrimIsActive & Usd.PrimIsDefined & ~Usd.PrimIsAbstract
+        return [prim.GetPath() for prim in Usd.PrimRange(root_prim, predicate) if prim.HasAuthoredPayloads()]
+
+    def loaded_roots(self) -> List[Sdf.Path]:
+        return list(self._recent)
+
+    def touch(self, path: Sdf.Path) -> None:
+        for root in self._recent:
+            if path.HasPrefix(root):
+                self._recent.move_to_end(root)
+                return
+
+    def load(self, paths: Iterable[Sdf.Path]) -> PayloadChangeReport:
+        return self._apply(load_paths=list(paths))
+
+    def unload(self, paths: Iterable[Sdf.Path]) -> PayloadChangeReport:
+        return self._apply(unload_paths=list(paths))
+
+    def load_matching(self, pattern: Optional[str] = None, kinds: Optional[Iterable[str]] = None,
+                      root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> PayloadChangeReport:
+        kinds = set(kinds) if kinds else None
+        matches = []
+        for path in self.payload_prim_paths(root_path):
+            if pattern and not fnmatch.fnmatchcase(str(path), pattern):
+                continue
+            if kinds is not None and get_prim_kind(self.stage.GetPrimAtPath(path)) not in kinds:
+                continue
+            matches.append(path)
+        return self._apply(load_paths=matches)
+
+    def load_to_depth(self, depth: int, root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> PayloadChangeReport:
+        # Loads exactly the payloads that are at most `depth` path elements deep, without their nested payloads.
+        candidates = self.payload_prim_paths(root_path)
+        load_paths = [path for path in candidates if path.pathElementCount <= depth]
+        unload_paths = [path for path in self._recent if path.pathElementCount > depth]
+        return self._apply(load_paths, unload_paths, with_descendants=False)
+
+    def enforce_budget(self) -> PayloadChangeReport:
+        return self._apply()
+
+    def _sync_loaded_roots(self) -> None:
+        loaded = Sdf.Path.RemoveDescendentPaths(list(self.stage.GetLoadSet()))
+        loaded_set = set(loaded)
+        for path in [path for path in self._recent if path not in loaded_set]:
+            del self._recent[path]
+        # Payloads loaded outside the manager count as the least recently inspected.
+        for path in reversed(loaded):
+            if path not in self._recent:
+                self._recent[path] = None
+                self._recent.move_to_end(path, last=False)
+
+    @timed('PayloadManager.apply', count=lambda report: report.loaded + report.unloaded)
+    def _apply(self, load_paths: Optional[List[Sdf.Path]] = None, unload_paths: Optional[List[Sdf.Path]] = None,
+               with_descendants: bool = True) -> PayloadChangeReport:
+        load_paths = Sdf.Path.RemoveDescendentPaths(load_paths or [])
+        unload_paths = unload_paths or []
+        skipped = []
+        if self.max_loaded > 0 and len(load_paths) > self.max_loaded:
+            load_paths, skipped = load_paths[:self.max_loaded], load_paths[self.max_loaded:]
+
+        self._sync_loaded_roots()
+        before = set(self.stage.GetLoadSet())
+        all_rules = [self.stage.GetLoadRules()]
+        if self.mirror_stage:
+            all_rules.append(self.mirror_stage.GetLoadRules())
+
+        for path in unload_paths:
+            for rules in all_rules:
+                rules.Unload(path)
+            self._recent.pop(path, None)
+        for path in load_paths:
+            for rules in all_rules:
+                if with_descendants:
+                    rules.LoadWithDescendants(path)
+                else:
+                    rules.LoadWithoutDescendants(path)
+            self._recent[path] = None
+            self._recent.move_to_end(path)
+
+        if self.max_loaded > 0:
+            protected = set(load_paths)
+            for path in list(self._recent):
+                if len(self._recent) <= self.max_loaded:
+                    break
+                if path not in protected:
+                    for rules in all_rules:
+                        rules.Unload(path)
+                    del self._recent[path]
+
+        for rules in all_rules:
+            rules.Minimize()
+        self.stage.SetLoadRules(all_rules[0])
+        if self.mirror_stage:
+            self.mirror_stage.SetLoadRules(all_rules[1])
+        after = set(self.stage.GetLoadSet())
+        return PayloadChangeReport(loaded=len(after - before), unloaded=len(before - after), skipped=skipped)
+
+
+class PrimSearchIndex:
+    # Inverted maps over PrimRecords. Names are indexed by trigram over the *unique* lower-cased names, which stay
+    # few even on huge stages, so wildcard name queries only fnmatch a handful of candidate names.
+    FIELDS = ('type', 'kind', 'purpose', 'variant', 'payload', 'name', 'path')
+
+    def __init__(self, predicate=CHILD_PRIM_PREDICATE):
+        self.predicate = predicate
+        self._paths: List[Optional[Sdf.Path]] = []
+        self._records: List[Optional[PrimRecord]] = []
+        self._ids: Dict[Sdf.Path, int] = {}
+        self._children: Dict[int, Set[int]] = defaultdict(set)
+        self._free_ids: List[int] = []
+        self._by_name: Dict[str, Set[int]] = defaultdict(set)
+        self._name_trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._by_type: Dict[str, Set[int]] = defaultdict(set)
+        self._by_kind: Dict[str, Set[int]] = defaultdict(set)
+        self._by_purpose: Dict[str, Set[int]] = defaultdict(set)
+        self._by_variant_set: Dict[str, Set[int]] = defaultdict(set)
+        self._with_payload: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, path: Sdf.Path) -> bool:
+        return path in self._ids
+
+    @timed(count=int)
+    def build(self, stage: Usd.Stage, root_path: Sdf.Path = Sdf.Path.absoluteRootPath) -> int:
+        root_prim = stage.GetPrimAtPath(root_path)
+        if not root_prim:
+            return 0
+        count = 0
+        for prim in Usd.PrimRange(root_prim, self.predicate):
+            self.add(prim.GetPath(), extract_prim_record(prim))
+            count += 1
+        return count
+
+    def add_records(self, records: Iterable[Tuple[Sdf.Path, PrimRecord]]) -> None:
+        for path, record in records:
+            self.add(path, record)
+
+    def add(self, path: Sdf.Path, record: PrimRecord) -> None:
+        prim_id = self._ids.get(path)
+        if prim_id is None:
+            prim_id = self._free_ids.pop() if self._free_ids else len(self._paths)
+            if prim_id == len(self._paths):
+                self._paths.append(path)
+                self._records.append(None)
+            else:
+                self._paths[prim_id] = path
+            self._ids[path] = prim_id
+            parent_id = self._ids.get(path.GetParentPath())
+            if parent_id is not None:
+                self._children[parent_id].add(prim_id)
+        else:
+            self._unindex(prim_id)
+
+        self._records[prim_id] = record
+        name = record.name.lower()
+        if name not in self._by_name:
+            for trigram in _trigrams(name):
+                self._name_trigrams[trigram].add(name)
+        self._by_name[name].add(prim_id)
+        self._by_type[record.type_name].add(prim_id)
+        self._by_kind[record.kind].add(prim_id)
+        self._by_purpose[record.purpose].add(prim_id)
+        for variant_set, _ in record.variant_selections:
+            self._by_variant_set[variant_set].add(prim_id)
+        if record.has_payload:
+            self._with_payload.add(prim_id)
+
+    def remove_subtree(self, path: Sdf.Path) -> None:
+        prim_id = self._ids.get(path)
+        if prim_id is None:
+            return
+        parent_id = self._ids.get(path.GetParentPath())
+        if parent_id is not None:
+            self._children[parent_id].discard(prim_id)
+
+        pending = [prim_id]
+        while pending:
+            prim_id = pending.pop()
+            pending.extend(self._children.pop(prim_id, ()))
+            self._unindex(prim_id)
+            del self._ids[self._paths[prim_id]]
+            self._paths[prim_id] = None
+            self._records[prim_id] = None
+            self._free_ids.append(prim_id)
+
+    @timed()
+    def apply_stage_changes(self, stage: Usd.Stage, resynced_paths: Iterable[Sdf.Path],
+                            info_changed_paths: Iterable[Sdf.Path]) -> None:
+        changed_prim_paths = {path.GetPrimPath() for path in info_changed_paths}
+        for path in resynced_paths:
+            if not path.IsAbsoluteRootOrPrimPath():
+                changed_prim_paths.add(path.GetPrimPath())
+                continue
+            self.remove_subtree(path)
+            prim = stage.GetPrimAtPath(path)
+            if prim and (path == Sdf.Path.absoluteRootPath or path.GetParentPath() in self._ids):
+                for descendant in Usd.PrimRange(prim, self.predicate):
+                    self.add(descendant.GetPath(), extract_prim_record(descendant))
+
+        for path in changed_prim_paths:
+            prim = stage.GetPrimAtPath(path)
+            if path in self._ids and prim:
+                self.add(path, extract_prim_record(prim))
+
+    @timed(count=len)
+    def query(self, text: str, limit: Optional[int] = None) -> List[Sdf.Path]:
+        terms = parse_search_query(text)
+        if not terms:
+            return []
+
+        candidate_sets = []
+        path_patterns = []
+        for key, value in terms:
+            if key == 'path':
+                path_patterns.append(value)
+            elif key == 'name':
+                candidate_sets.append(self._match_names(value))
+            elif key == 'payload':
+                wants_payload = value.lower() in ('1', 'yes', 'true', 'on')
+                candidate_sets.append(self._with_payload if wants_payload
+                                      else set(self._ids.values()) - self._with_payload)
+            else:
+                postings = {'type': self._by_type, 'kind': self._by_kind,
+                            'purpose': self._by_purpose, 'variant': self._by_variant_set}[key]
+                candidate_sets.append(_match_postings(postings, value))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            matches = set(candidate_sets[0])
+            for candidates in candidate_sets[1:]:
+                matches &= candidates
+                if not matches:
+                    break
+            paths = [self._paths[prim_id] for prim_id in matches]
+        else:
+            paths = list(self._ids)
+
+        for pattern in path_patterns:
+            paths = [path for path in paths if fnmatch.fnmatchcase(str(path), pattern)]
+        paths.sort()
+        return paths[:limit] if limit else paths
+
+    def _match_names(self, pattern: str) -> Set[int]:
+        pattern = pattern.lower()
+        if not _has_wildcards(pattern):
+            return set(self._by_name.get(pattern, ()))
+
+        candidate_names = None
+        for literal in _required_literals(pattern):
+            for trigram in _trigrams(literal) if len(literal) >= 3 else ():
+                names = self._name_trigrams.get(trigram, set())
+                candidate_names = set(names) if candidate_names is None else candidate_names & names
+        if candidate_names is None:
+            candidate_names = self._by_name.keys()
+
+        matches = set()
+        for name in candidate_names:
+            if fnmatch.fnmatchcase(name, pattern):
+                matches |= self._by_name[name]
+        return matches
+
+    def _unindex(self, prim_id: int) -> None:
+        record = self._records[prim_id]
+        if record is None:
+            return
+        name = record.name.lower()
+        _discard_posting(self._by_name, name, prim_id)
+        if name not in self._by_name:
+            for trigram in _trigrams(name):
+                _discard_posting(self._name_trigrams, trigram, name)
+        _discard_posting(self._by_type, record.type_name, prim_id)
+        _discard_posting(self._by_kind, record.kind, prim_id)
+        _discard_posting(self._by_purpose, record.purpose, prim_id)
+        for variant_set, _ in record.variant_selections:
+            _discard_posting(self._by_variant_set, variant_set, prim_id)
+        self._with_payload.discard(prim_id)
+
+
+def parse_search_query(text: str) -> List[Tuple[str, str]]:
+    # "type:Mesh kind:component name:*door*"; bare words match anywhere in the prim name.
+    terms = []
+    for token in text.split():
+        key, separator, value = token.partition(':')
+        if separator and key.lower() in PrimSearchIndex.FIELDS:
+            if value:
+                terms.append((key.lower(), value))
+        elif _has_wildcards(token):
+            terms.append(('name', token))
+        else:
+            terms.append(('name', f"*{token}*"))
+    return terms
+
+
+def _has_wildcards(pattern: str) -> bool:
+    return any(char in pattern for char in '*?[')
+
+
+def _required_literals(pattern: str) -> List[str]:
+    # Literal runs every fnmatch match must contain. Character classes are found the way fnmatch.translate finds them
+    # ("[]a]" and "[!]a]" include the "]"; an unclosed "[" is literal), and the runs touching a class are dropped
+    # too, so a misread class boundary can only cost filtering, never matches.
+    runs = []
+    current = []
+    touches_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char in '*?':
+            runs.append((''.join(current), touches_class))
+            current, touches_class = [], False
+            i += 1
+            continue
+        if char == '[':
+            j = i + 1
+            if j < len(pattern) and pattern[j] == '!':
+                j += 1
+            if j < len(pattern) and pattern[j] == ']':
+                j += 1
+            end = pattern.find(']', j)
+            if end >= 0:
+                runs.append((''.join(current), True))
+                current, touches_class = [], True
+                i = end + 1
+                continue
+        current.append(char)
+        i += 1
+    runs.append((''.join(current), touches_class))
+    return [run for run, near_class in runs if run and not near_class]
+
+
+def _trigrams(text: str) -> Set[str]:
+    if len(text) < 3:
+        return {text}
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _match_postings(postings: Dict[str, Set[int]], pattern: str) -> Set[int]:
+    if not _has_wildcards(pattern):
+        return set(postings.get(pattern, ()))
+    matches = set()
+    for value, ids in postings.items():
+        if fnmatch.fnmatchcase(value, pattern):
+            matches |= ids
+    return matches
+
+
+def _discard_posting(postings: Dict, key, value) -> None:
+    values = postings.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del postings[key]
@@ -0,0 +1,81 @@
+from typing import Optional
+
+from PySide2 import QtWidgets, QtCore, QtGui
+from pxr import Usd
+from .usdUtils import VariantExplorer, get_variant_sets
+
+
+class VariantExplorerPanel(QtWidgets.QWidget):
+    HEADERS = ['Set', 'Variant', 'Children', 'Descendants', 'Payloads', 'Bounds']
+
+    variantChosen = QtCore.Signal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.explorer: Optional[VariantExplorer] = None
+        self.prim = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.apply_button = QtWidgets.QPushButton("Apply Variant")
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.table)
+        layout.addWidget(self.apply_button)
+
+        self.apply_button.clicked.connect(self.apply_selected)
+        self.table.doubleClicked.connect(lambda _: self.apply_selected())
+
+    def set_explorer(self, explorer: Optional[VariantExplorer]):
+        self.explorer = explorer
+        self.prim = None
+        self.refresh()
+
+    def set_prim(self, prim: Optional[Usd.Prim]):
+        self.prim = prim
+        self.refresh()
+
+    def refresh(self):
+        if not self.isVisible():
+            return
+
+        self.table.setRowCount(0)
+        if not self.explorer or not self.prim:
+            return
+
+        current = {vs_info.name: vs_info.current_selection for vs_info in get_variant_sets(self.prim)}
+        outcomes = self.explorer.get_outcomes(self.prim)
+        self.table.setRowCount(len(outcomes))
+        bold = QtGui.QFont()
+        bold.setBold(True)
+        for row, outcome in enumerate(outcomes):
+            size = outcome.bounds_size()
+            values = [outcome.variant_set, outcome.variant, str(outcome.child_count), str(outcome.descendant_count),
+                      str(outcome.payload_count),
+                      " x ".join(f"{value:.3g}" for value in size) if size else "-"]
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if outcome.error:
+                    item.setToolTip(outcome.error)
+                if current.get(outcome.variant_set) == outcome.variant:
+                    item.setFont(bold)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+
+    def apply_selected(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return
+        row = rows[0].row()
+        self.variantChosen.emit(self.table.item(row, 0).text(), self.table.item(row, 1).text())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()